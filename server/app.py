@@ -13,6 +13,8 @@ from flask import Flask, jsonify, request
 from flask_cors import CORS
 from datetime import datetime, timedelta
 from routes import register_routes
+from services.files.models import db as peewee_db
+from utils import success_response
 from dotenv import load_dotenv
 
 # 加载环境变量
@@ -25,6 +27,12 @@ CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=True)
 # 注册所有路由
 register_routes(app)
 
+# 请求结束后将 peewee 连接归还连接池
+@app.teardown_request
+def _close_peewee_connection(exc):
+    if not peewee_db.is_closed():
+        peewee_db.close()
+
 # 从环境变量获取配置
 ADMIN_USERNAME = os.getenv('MANAGEMENT_ADMIN_USERNAME', 'admin')
 ADMIN_PASSWORD = os.getenv('MANAGEMENT_ADMIN_PASSWORD', '12345678')
@@ -69,5 +77,31 @@ def login():
     return {"code": 0, "data": {"token": token}, "message": "登录成功"}
 
 
+# 数据库连接池监控
+@app.route('/api/v1/system/db_pool', methods=['GET'])
+def get_db_pool_stats():
+    return success_response(database.get_db_pool_stats())
+
+
+def start_parse_worker():
+    """
+    按 job_queue 配置在本进程内启动解析 worker（enabled 且 embedded_worker 开启时）
+
+    导入 app 本身不会启动 worker。直接运行 app.py 时自动启动；由 gunicorn 等 WSGI 服务器加载时，
+    在 post_fork 钩子中调用本函数，或设置环境变量 KNOWFLOW_EMBEDDED_WORKER=true。
+    """
+    from services.knowledgebases.job_queue import start_embedded_worker
+    from services.knowledgebases.service import KnowledgebaseService
+    start_embedded_worker(KnowledgebaseService.parse_document)
+
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5001, debug=True)
\ No newline at end of file
+    debug = os.getenv('FLASK_DEBUG', 'true').lower() in ('1', 'true', 'yes')
+    # reloader 先启动一个只负责监控文件变化的父进程，实际提供服务的是设置了 WERKZEUG_RUN_MAIN 的子进程，
+    # 父进程不启动 worker，避免同一节点出现两个 worker
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_parse_worker()
+    app.run(host='0.0.0.0', port=5001, debug=debug)
+elif os.getenv('KNOWFLOW_EMBEDDED_WORKER', 'false').lower() in ('1', 'true', 'yes'):
+    # 由 WSGI 服务器加载且显式开启时，每个服务进程启动自己的 worker；脚本、测试等导入 app 时不启动
+    start_parse_worker()
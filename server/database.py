@@ -1,5 +1,9 @@
 import mysql.connector
 import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 from minio import Minio
 from dotenv import load_dotenv
@@ -33,6 +37,14 @@ DB_CONFIG = {
     "database": "rag_flow",
 }
 
+# MySQL连接池配置
+DB_POOL_CONFIG = {
+    "pool_size": int(os.getenv("MYSQL_POOL_SIZE", "16")),
+    "checkout_timeout": float(os.getenv("MYSQL_POOL_TIMEOUT", "30")),
+    "health_check_interval": float(os.getenv("MYSQL_POOL_HEALTH_CHECK_INTERVAL", "30")),
+    "max_idle_time": float(os.getenv("MYSQL_POOL_MAX_IDLE_TIME", "600")),
+}
+
 # MinIO连接配置
 MINIO_CONFIG = {
     "endpoint": f"{MINIO_HOST}:{os.getenv('MINIO_PORT', '9000')}",
@@ -49,14 +61,190 @@ ES_CONFIG = {
     "use_ssl": os.getenv("ES_USE_SSL", "false").lower() == "true"
 }
 
+class PooledConnection:
+    """
+    连接池中借出的连接代理
+
+    用法与原始 mysql.connector 连接一致，调用 close() 时连接归还连接池而不是真正关闭；
+    未显式 close 的连接在被回收时也会自动归还。
+    """
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def close(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool._release(conn)
+
+    def is_connected(self):
+        return self._conn is not None and self._conn.is_connected()
+
+    def __getattr__(self, name):
+        conn = self.__dict__.get('_conn')
+        if conn is None:
+            raise mysql.connector.errors.OperationalError("连接已归还连接池")
+        return getattr(conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class MySQLConnectionPool:
+    """基于 DB_CONFIG 的线程安全 MySQL 连接池，带健康检查和使用统计"""
+
+    def __init__(self, db_config, pool_size=16, checkout_timeout=30.0,
+                 health_check_interval=30.0, max_idle_time=600.0):
+        self.db_config = db_config
+        self.pool_size = max(1, int(pool_size))
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+        self.max_idle_time = max_idle_time
+
+        self._idle = queue.LifoQueue()  # (conn, last_used)，后进先出让热连接优先复用
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+        self._lock = threading.Lock()
+        self._stats = {
+            "created": 0,
+            "closed": 0,
+            "checkouts": 0,
+            "in_use": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "health_check_failures": 0,
+            "total_wait_time": 0.0,
+            "max_wait_time": 0.0,
+        }
+
+    def _incr(self, key, value=1):
+        with self._lock:
+            self._stats[key] += value
+
+    def _create(self):
+        conn = mysql.connector.connect(**self.db_config)
+        self._incr("created")
+        return conn
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self._incr("closed")
+
+    def _is_healthy(self, conn, last_used):
+        """空闲超过健康检查间隔的连接在借出前 ping 一次"""
+        if time.time() - last_used < self.health_check_interval:
+            return True
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            self._incr("health_check_failures")
+            return False
+
+    def get_connection(self, timeout=None):
+        """借出一个连接，连接池耗尽时最多等待 timeout 秒"""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        start = time.time()
+        if not self._slots.acquire(blocking=False):
+            self._incr("waits")
+            if not self._slots.acquire(timeout=timeout):
+                self._incr("timeouts")
+                raise mysql.connector.errors.PoolError(
+                    f"MySQL连接池已耗尽（大小 {self.pool_size}），等待 {timeout} 秒后超时"
+                )
+        wait_time = time.time() - start
+        with self._lock:
+            self._stats["total_wait_time"] += wait_time
+            self._stats["max_wait_time"] = max(self._stats["max_wait_time"], wait_time)
+
+        try:
+            conn = None
+            while conn is None:
+                try:
+                    candidate, last_used = self._idle.get_nowait()
+                except queue.Empty:
+                    conn = self._create()
+                    break
+                if time.time() - last_used > self.max_idle_time or not self._is_healthy(candidate, last_used):
+                    self._discard(candidate)
+                    continue
+                conn = candidate
+        except Exception as e:
+            self._slots.release()
+            print(f"MySQL连接失败: {str(e)}")
+            raise
+
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["in_use"] += 1
+        return PooledConnection(self, conn)
+
+    def _release(self, conn):
+        """归还连接：回滚未提交的事务，失效连接直接关闭"""
+        try:
+            if conn.is_connected():
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle.put((conn, time.time()))
+            else:
+                self._discard(conn)
+        except Exception:
+            self._discard(conn)
+        finally:
+            with self._lock:
+                self._stats["in_use"] -= 1
+            self._slots.release()
+
+    def stats(self):
+        """返回连接池使用统计"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["pool_size"] = self.pool_size
+        stats["idle"] = self._idle.qsize()
+        stats["avg_wait_time"] = stats["total_wait_time"] / stats["checkouts"] if stats["checkouts"] else 0.0
+        return stats
+
+
+_db_pool = None
+_db_pool_lock = threading.Lock()
+
+def get_db_pool():
+    """获取全局MySQL连接池（首次调用时创建）"""
+    global _db_pool
+    if _db_pool is None:
+        with _db_pool_lock:
+            if _db_pool is None:
+                _db_pool = MySQLConnectionPool(DB_CONFIG, **DB_POOL_CONFIG)
+    return _db_pool
+
 def get_db_connection():
-    """创建MySQL数据库连接"""
+    """从连接池借出MySQL数据库连接，调用 close() 即归还"""
+    return get_db_pool().get_connection()
+
+@contextmanager
+def db_connection():
+    """以上下文管理器方式借出连接，退出时自动归还"""
+    conn = get_db_connection()
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        return conn
-    except Exception as e:
-        print(f"MySQL连接失败: {str(e)}")
-        raise e
+        yield conn
+    finally:
+        conn.close()
+
+def get_db_pool_stats():
+    """获取MySQL连接池统计信息（使用中、等待时间、创建/关闭数量等）"""
+    return get_db_pool().stats()
 
 def get_minio_client():
     """创建MinIO客户端连接"""
@@ -0,0 +1,37 @@
+"""
+独立的文档解析 worker
+
+从 MySQL 持久化队列 (knowflow_parse_job) 领取解析任务并执行，可在多个节点上同时运行以横向扩展解析能力。
+Web 服务节点可在 settings.yaml 中设置 job_queue.embedded_worker: false，只负责提交任务。
+
+用法:
+    python parse_worker.py
+"""
+
+# 解决MySQL驱动问题 - 使用PyMySQL作为MySQLdb的替代
+try:
+    import pymysql
+    pymysql.install_as_MySQLdb()
+except ImportError:
+    pass
+
+import os
+from dotenv import load_dotenv
+
+# 加载环境变量
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.env'))
+
+from services.config import JOB_QUEUE_CONFIG
+from services.knowledgebases.job_queue import create_parse_worker
+from services.knowledgebases.service import KnowledgebaseService
+
+
+def main():
+    if not JOB_QUEUE_CONFIG.enabled:
+        print("⚠️  job_queue.enabled 未开启，解析任务不会写入持久化队列，worker 无任务可执行")
+    worker = create_parse_worker(KnowledgebaseService.parse_document)
+    worker.run_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -196,6 +196,39 @@ def get_parse_progress(doc_id):
         print(f"获取解析进度失败: {str(e)}")
         return error_response("解析进行中，请稍后重试", code=202)
 
+# 获取解析结果缓存统计路由
+@knowledgebase_bp.route('/parse_cache/stats', methods=['GET'])
+def get_parse_cache_stats_route():
+    """获取 MinerU 解析结果缓存命中统计的API端点"""
+    try:
+        stats = KnowledgebaseService.get_parse_cache_stats()
+        return success_response(data=stats)
+    except Exception as e:
+        print(f"获取解析结果缓存统计失败: {str(e)}")
+        return error_response(message=f"获取缓存统计失败: {str(e)}", code=500)
+
+# 获取分块定位缓存统计路由
+@knowledgebase_bp.route('/block_cache/stats', methods=['GET'])
+def get_block_cache_stats_route():
+    """获取分块定位缓存项数、内存占用和命中率的API端点"""
+    try:
+        stats = KnowledgebaseService.get_block_cache_stats()
+        return success_response(data=stats)
+    except Exception as e:
+        print(f"获取分块定位缓存统计失败: {str(e)}")
+        return error_response(message=f"获取缓存统计失败: {str(e)}", code=500)
+
+# 获取 MinerU 服务端点统计路由
+@knowledgebase_bp.route('/mineru_endpoints/stats', methods=['GET'])
+def get_mineru_endpoint_stats_route():
+    """获取各 MinerU 服务端点负载与耗时统计的API端点"""
+    try:
+        stats = KnowledgebaseService.get_mineru_endpoint_stats()
+        return success_response(data=stats)
+    except Exception as e:
+        print(f"获取 MinerU 服务端点统计失败: {str(e)}")
+        return error_response(message=f"获取端点统计失败: {str(e)}", code=500)
+
 # 获取系统 Embedding 配置路由
 @knowledgebase_bp.route('/system_embedding_config', methods=['GET'])
 def get_system_embedding_config_route():
@@ -271,17 +304,44 @@ def start_sequential_batch_parse_route(kb_id):
         return response
 
     try:
-        result = KnowledgebaseService.start_sequential_batch_parse_async(kb_id)
+        data = request.get_json(silent=True) or {}
+        priority = data.get('priority')
+        if priority is None:
+            result = KnowledgebaseService.start_sequential_batch_parse_async(kb_id)
+        else:
+            result = KnowledgebaseService.start_sequential_batch_parse_async(kb_id, priority=int(priority))
         if result.get("success"):
             return success_response(data={"message": result.get("message")})
         else:
             # 如果任务已在运行或启动失败，返回错误信息
             return error_response(result.get("message", "启动失败"), code=409 if "已在运行中" in result.get("message", "") else 500)
+    except ValueError:
+        return error_response("priority 参数类型错误", code=400)
     except Exception as e:
         print(f"启动顺序批量解析路由处理失败 (KB ID: {kb_id}): {str(e)}")
         traceback.print_exc()
         return error_response(f"启动顺序批量解析失败: {str(e)}", code=500)
 
+# 取消批量解析路由
+@knowledgebase_bp.route('/<string:kb_id>/batch_parse_sequential/cancel', methods=['POST'])
+def cancel_sequential_batch_parse_route(kb_id):
+    """取消知识库的批量解析任务"""
+    if request.method == 'OPTIONS':
+        response = success_response({})
+        response.headers.add('Access-Control-Allow-Methods', 'POST')
+        response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
+        return response
+
+    try:
+        result = KnowledgebaseService.cancel_sequential_batch_parse(kb_id)
+        if result.get("success"):
+            return success_response(data={"message": result.get("message")})
+        return error_response(result.get("message", "取消失败"), code=404)
+    except Exception as e:
+        print(f"取消批量解析路由处理失败 (KB ID: {kb_id}): {str(e)}")
+        traceback.print_exc()
+        return error_response(f"取消批量解析失败: {str(e)}", code=500)
+
 # 获取顺序批量解析进度路由
 @knowledgebase_bp.route('/<string:kb_id>/batch_parse_sequential/progress', methods=['GET'])
 def get_sequential_batch_parse_progress_route(kb_id):
@@ -4,13 +4,25 @@ KnowFlow 业务配置管理模块
 将业务逻辑配置与环境部署配置分离，提供统一的配置管理接口。
 """
 
-from .config_loader import CONFIG, APP_CONFIG, EXCEL_CONFIG
-from .business_config import AppConfig, ExcelConfig
+from .config_loader import CONFIG, APP_CONFIG, EXCEL_CONFIG, INGESTION_CONFIG, PROGRESS_CONFIG, PARSE_SCHEDULER_CONFIG, JOB_QUEUE_CONFIG, PARSE_CACHE_CONFIG, BLOCK_CACHE_CONFIG
+from .business_config import AppConfig, ExcelConfig, IngestionConfig, ProgressConfig, ParseSchedulerConfig, JobQueueConfig, ParseCacheConfig, BlockCacheConfig
 
 __all__ = [
     "CONFIG",
     "APP_CONFIG",
     "EXCEL_CONFIG",
+    "INGESTION_CONFIG",
+    "PROGRESS_CONFIG",
+    "PARSE_SCHEDULER_CONFIG",
+    "JOB_QUEUE_CONFIG",
+    "PARSE_CACHE_CONFIG",
+    "BLOCK_CACHE_CONFIG",
     "AppConfig",
-    "ExcelConfig"
+    "ExcelConfig",
+    "IngestionConfig",
+    "ProgressConfig",
+    "ParseSchedulerConfig",
+    "JobQueueConfig",
+    "ParseCacheConfig",
+    "BlockCacheConfig"
 ] 
\ No newline at end of file
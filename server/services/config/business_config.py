@@ -23,6 +23,53 @@ class ExcelConfig(BaseModel):
     preserve_table_structure: bool = Field(True, description="是否保持表格结构")
 
 
+class IngestionConfig(BaseModel):
+    """分块入库配置"""
+    batch_size: int = Field(32, description="每批提交的最大分块数")
+    batch_max_chars: int = Field(200000, description="每批提交的最大字符数")
+    max_workers: int = Field(4, description="并发提交分块的线程数")
+    max_retries: int = Field(3, description="单个分块提交失败后的最大重试次数")
+    retry_backoff: float = Field(0.5, description="重试退避基数（秒），按指数增长")
+
+
+class ProgressConfig(BaseModel):
+    """文档解析进度写入配置"""
+    flush_interval_ms: int = Field(500, description="进度合并写入的刷新间隔（毫秒）")
+    max_batch_size: int = Field(200, description="单条批量 UPDATE 语句包含的最大文档数")
+
+
+class ParseSchedulerConfig(BaseModel):
+    """批量解析调度配置"""
+    max_workers: int = Field(8, description="同时处理的文档数")
+    download_concurrency: int = Field(4, description="文件下载阶段的最大并发数")
+    mineru_concurrency: int = Field(2, description="MinerU 调用阶段的最大并发数")
+    chunking_concurrency: int = Field(4, description="分块阶段的最大并发数")
+    ingestion_concurrency: int = Field(2, description="分块入库阶段的最大并发数")
+    pipeline_buffer: int = Field(4, description="已完成 MinerU 解析、等待分块入库的最大文档数")
+
+
+class JobQueueConfig(BaseModel):
+    """持久化解析任务队列配置"""
+    enabled: bool = Field(True, description="是否将解析任务写入 MySQL 持久化队列")
+    embedded_worker: bool = Field(True, description="是否在 Web 服务进程内启动解析 worker")
+    lease_seconds: int = Field(120, description="worker 领取任务后的租约时长（秒）")
+    heartbeat_interval: int = Field(20, description="worker 续约心跳间隔（秒）")
+    poll_interval: float = Field(2.0, description="worker 空闲时轮询新任务的间隔（秒）")
+    max_attempts: int = Field(3, description="任务因 worker 崩溃被重新排队的最大执行次数")
+
+
+class ParseCacheConfig(BaseModel):
+    """MinerU 解析结果缓存配置"""
+    enabled: bool = Field(True, description="是否缓存 MinerU 解析结果")
+    bucket: str = Field("knowflow-parse-cache", description="存放缓存的 MinIO 存储桶")
+    max_size_mb: int = Field(10240, description="缓存总大小上限（MB），超出后淘汰最久未使用的结果")
+
+
+class BlockCacheConfig(BaseModel):
+    """分块定位所用块列表与匹配索引的内存缓存配置"""
+    max_size_mb: int = Field(256, description="缓存占用内存上限（MB），超出后淘汰最久未使用的文档")
+
+
 class ChunkingConfig(BaseModel):
     """分块预分段配置"""
     regex_pattern: str = Field("", description="正则表达式分段模式")
@@ -38,6 +85,13 @@ class MinerUFastAPIConfig:
     """MinerU FastAPI 客户端配置"""
     url: str = "http://localhost:8888"
     timeout: int = 30
+    image_transport: str = "zip"
+    request_mode: str = "async"
+    shard_pages: int = 100
+    shard_min_pages: int = 200
+    shard_concurrency: int = 4
+    endpoint_max_concurrency: int = 4
+    request_retries: int = 1
 
 @dataclass
 class MinerUPipelineConfig:
@@ -79,4 +133,10 @@ class RootConfig(BaseModel):
     app: AppConfig = Field(default_factory=AppConfig)
     excel: ExcelConfig = Field(default_factory=ExcelConfig)
     chunking: ChunkingConfig = Field(default_factory=ChunkingConfig)
+    ingestion: IngestionConfig = Field(default_factory=IngestionConfig)
+    progress: ProgressConfig = Field(default_factory=ProgressConfig)
+    parse_scheduler: ParseSchedulerConfig = Field(default_factory=ParseSchedulerConfig)
+    job_queue: JobQueueConfig = Field(default_factory=JobQueueConfig)
+    parse_cache: ParseCacheConfig = Field(default_factory=ParseCacheConfig)
+    block_cache: BlockCacheConfig = Field(default_factory=BlockCacheConfig)
     mineru: MinerUConfig = Field(default_factory=MinerUConfig) 
\ No newline at end of file
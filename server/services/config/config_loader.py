@@ -67,6 +67,13 @@ def _load_mineru_env_vars() -> Dict[str, Any]:
         # FastAPI客户端配置
         'MINERU_FASTAPI_URL': 'fastapi.url',
         'MINERU_FASTAPI_TIMEOUT': 'fastapi.timeout',
+        'MINERU_IMAGE_TRANSPORT': 'fastapi.image_transport',
+        'MINERU_REQUEST_MODE': 'fastapi.request_mode',
+        'MINERU_SHARD_PAGES': 'fastapi.shard_pages',
+        'MINERU_SHARD_MIN_PAGES': 'fastapi.shard_min_pages',
+        'MINERU_SHARD_CONCURRENCY': 'fastapi.shard_concurrency',
+        'MINERU_ENDPOINT_MAX_CONCURRENCY': 'fastapi.endpoint_max_concurrency',
+        'MINERU_REQUEST_RETRIES': 'fastapi.request_retries',
         'MINERU_FASTAPI_BACKEND': 'default_backend',
         
         # Pipeline后端配置
@@ -140,6 +147,13 @@ def get_mineru_env_mapping() -> Dict[str, str]:
     return {
         'MINERU_FASTAPI_URL': 'mineru.fastapi.url',
         'MINERU_FASTAPI_TIMEOUT': 'mineru.fastapi.timeout',
+        'MINERU_IMAGE_TRANSPORT': 'mineru.fastapi.image_transport',
+        'MINERU_REQUEST_MODE': 'mineru.fastapi.request_mode',
+        'MINERU_SHARD_PAGES': 'mineru.fastapi.shard_pages',
+        'MINERU_SHARD_MIN_PAGES': 'mineru.fastapi.shard_min_pages',
+        'MINERU_SHARD_CONCURRENCY': 'mineru.fastapi.shard_concurrency',
+        'MINERU_ENDPOINT_MAX_CONCURRENCY': 'mineru.fastapi.endpoint_max_concurrency',
+        'MINERU_REQUEST_RETRIES': 'mineru.fastapi.request_retries',
         'MINERU_FASTAPI_BACKEND': 'mineru.default_backend',
         'MINERU_PARSE_METHOD': 'mineru.pipeline.parse_method',
         'MINERU_LANG': 'mineru.pipeline.lang',
@@ -153,6 +167,12 @@ def get_mineru_env_mapping() -> Dict[str, str]:
 CONFIG = load_configuration()
 APP_CONFIG = CONFIG.app
 EXCEL_CONFIG = CONFIG.excel
+INGESTION_CONFIG = CONFIG.ingestion
+PROGRESS_CONFIG = CONFIG.progress
+PARSE_SCHEDULER_CONFIG = CONFIG.parse_scheduler
+JOB_QUEUE_CONFIG = CONFIG.job_queue
+PARSE_CACHE_CONFIG = CONFIG.parse_cache
+BLOCK_CACHE_CONFIG = CONFIG.block_cache
 MINERU_CONFIG = CONFIG.mineru
 
 # 打印加载的配置（在开发模式下）
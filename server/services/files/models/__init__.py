@@ -1,15 +1,19 @@
 from peewee import *
+from playhouse.pool import PooledMySQLDatabase
 import os
 from datetime import datetime
-from database import DB_CONFIG
+from database import DB_CONFIG, DB_POOL_CONFIG
 
-# 使用MySQL数据库
-db = MySQLDatabase(
+# 使用MySQL数据库（peewee 自带连接池，大小与 MySQL 连接池配置一致）
+db = PooledMySQLDatabase(
     DB_CONFIG["database"],
     host=DB_CONFIG["host"],
     port=DB_CONFIG["port"],
     user=DB_CONFIG["user"],
-    password=DB_CONFIG["password"]
+    password=DB_CONFIG["password"],
+    max_connections=DB_POOL_CONFIG["pool_size"],
+    stale_timeout=DB_POOL_CONFIG["max_idle_time"],
+    timeout=DB_POOL_CONFIG["checkout_timeout"]
 )
 
 class BaseModel(Model):
@@ -1,5 +1,4 @@
 import os
-import mysql.connector
 import re
 import tempfile
 from io import BytesIO
@@ -11,7 +10,7 @@ from .utils import FileType, FileSource, StatusEnum, get_uuid
 from .document_service import DocumentService
 from .file_service import FileService 
 from .file2document_service import File2DocumentService
-from database import DB_CONFIG, MINIO_CONFIG
+from database import MINIO_CONFIG, get_db_connection as _get_pooled_connection
 
 # 加载环境变量
 load_dotenv("../../docker/.env")
@@ -54,8 +53,8 @@ def get_minio_client():
     )
 
 def get_db_connection():
-    """创建数据库连接"""
-    return mysql.connector.connect(**DB_CONFIG)
+    """从连接池借出数据库连接"""
+    return _get_pooled_connection()
 
 def get_files_list(current_page, page_size, parent_id=None, name_filter=""):
     """
@@ -2,60 +2,18 @@ import os
 import tempfile
 import shutil
 import json
-import mysql.connector
 import traceback
 import time 
-from database import DB_CONFIG, get_minio_client
+from database import get_minio_client
+from .progress_writer import update_document_progress
+from .parse_scheduler import parse_stage, raise_if_cancelled, STAGE_DOWNLOAD
+from .object_fetch import download_object_to_path, download_object_to_tempfile, tempfile_from_bytes, write_bytes_to_path
 
 
-def _get_db_connection():
-    """创建数据库连接"""
-    return mysql.connector.connect(**DB_CONFIG)
-
 def _update_document_progress(doc_id, progress=None, message=None, status=None, run=None, chunk_count=None, process_duration=None):
-    """更新数据库中文档的进度和状态"""
-    conn = None
-    cursor = None
-    try:
-        conn = _get_db_connection()
-        cursor = conn.cursor()
-        updates = []
-        params = []
-
-        if progress is not None:
-            updates.append("progress = %s")
-            params.append(float(progress))
-        if message is not None:
-            updates.append("progress_msg = %s")
-            params.append(message)
-        if status is not None:
-            updates.append("status = %s")
-            params.append(status)
-        if run is not None:
-            updates.append("run = %s")
-            params.append(run)
-        if chunk_count is not None:
-             updates.append("chunk_num = %s")
-             params.append(chunk_count)
-        if process_duration is not None:
-            updates.append("process_duation = %s")
-            params.append(process_duration)
-
-
-        if not updates:
-            return
-
-        query = f"UPDATE document SET {', '.join(updates)} WHERE id = %s"
-        params.append(doc_id)
-        cursor.execute(query, params)
-        conn.commit()
-    except Exception as e:
-        print(f"[Parser-ERROR] 更新文档 {doc_id} 进度失败: {e}")
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+    """更新数据库中文档的进度和状态（进度合并写入，状态变更立即写入）"""
+    update_document_progress(doc_id, progress=progress, message=message, status=status, run=run,
+                             chunk_count=chunk_count, process_duration=process_duration)
 
 
 
@@ -73,6 +31,8 @@ def perform_parse(doc_id, doc_info, file_info, embedding_config):
     """
     temp_pdf_path = None
     temp_image_dir = None
+    temp_file_path = None
+    table_buffer = None
     start_time = time.time()
 
     
@@ -118,41 +78,60 @@ def perform_parse(doc_id, doc_info, file_info, embedding_config):
 
         # 进度更新回调 (直接调用内部更新函数)
         def update_progress(prog=None, msg=None):
+            # 批量任务被取消时在进度回调处中止
+            raise_if_cancelled()
             _update_document_progress(doc_id, progress=prog, message=msg)
             print(f"[Parser-PROGRESS] Doc: {doc_id}, Progress: {prog}, Message: {msg}")
 
 
-        minio_client = get_minio_client()
-        file_content = None # 初始化 file_content
-        # 从MinIO下载文件
-        try:
-            if minio_client.bucket_exists(bucket_name):
-                print(f"[Parser-INFO] 从 MinIO 下载文件: {file_location}")
-                response = minio_client.get_object(bucket_name, file_location)
-                file_content = response.read()
-                response.close()
-        except Exception as e:
-            print(f"[Parser-WARNING] MinIO 下载异常: {e}，尝试从 RAGFlow API获取文件")
-       
-        # 从 RAGFlow 系统重查询
-        if not file_content: # 确保此 if 与 minio_client = ... 在同一缩进级别
-            from .utils import get_doc_content     
-            file_content = get_doc_content(kb_id, doc_id)
+        # ======== 文件类型判断 ========
+        is_table_file = file_extension.lower() in ['.xlsx', '.xls', '.csv']
+        if not is_table_file:
+            temp_file_path = os.path.join(tempfile.gettempdir(), f"{doc_id}{file_extension}")
+            print(f"[Parser-INFO] 临时文件路径: {temp_file_path}")
 
-        if not file_content: # 确保此 if 与上一个 if 在同一缩进级别
-           raise ValueError(f"[Parser-ERROR] 无法获取文件内容: {file_location}")
-        
+        # ======== 流式获取文件 ========
+        # PDF 等文件按块写入临时路径，表格文件按块写入匿名临时文件，避免整个文件常驻内存
+        with parse_stage(STAGE_DOWNLOAD):
+            file_size = 0
+            minio_client = get_minio_client()
+            # 从MinIO下载文件
+            try:
+                if minio_client.bucket_exists(bucket_name):
+                    print(f"[Parser-INFO] 从 MinIO 下载文件: {file_location}")
+                    if is_table_file:
+                        table_buffer, file_size = download_object_to_tempfile(minio_client, bucket_name, file_location)
+                    else:
+                        file_size = download_object_to_path(minio_client, bucket_name, file_location, temp_file_path)
+            except Exception as e:
+                print(f"[Parser-WARNING] MinIO 下载异常: {e}，尝试从 RAGFlow API获取文件")
+
+            # 从 RAGFlow 系统重查询
+            if not file_size:
+                if table_buffer is not None:
+                    table_buffer.close()
+                    table_buffer = None
+                from .utils import get_doc_content
+                file_content = get_doc_content(kb_id, doc_id)
+                if not file_content:
+                    raise ValueError(f"[Parser-ERROR] 无法获取文件内容: {file_location}")
+                if is_table_file:
+                    table_buffer = tempfile_from_bytes(file_content)
+                    file_size = len(file_content)
+                else:
+                    file_size = write_bytes_to_path(file_content, temp_file_path)
+                del file_content
+
+        print(f"[Parser-INFO] 文件获取完成: {file_location} ({file_size} 字节)")
         chunk_count = 0
         
         # ======== 文件类型分发处理 ========
-        is_table_file = file_extension.lower() in ['.xlsx', '.xls', '.csv']
-
         if is_table_file:
             # --- 表格文件处理 ---
             from .excel_parse import process_excel_entry
             chunk_count = process_excel_entry(
                 doc_id=doc_id,
-                file_content=file_content,
+                file_content=table_buffer,
                 kb_id=kb_id,
                 parser_config=parser_config,
                 doc_info=doc_info,
@@ -160,12 +139,6 @@ def perform_parse(doc_id, doc_info, file_info, embedding_config):
             )
         else:
             # --- 默认文件处理 (PDF, Markdown等) ---
-            temp_dir = tempfile.gettempdir()
-            temp_file_path = os.path.join(temp_dir, f"{doc_id}{file_extension}")
-            print(f"[Parser-INFO] 临时文件路径: {temp_file_path}")
-            with open(temp_file_path, 'wb') as f:
-                f.write(file_content)
-
             # 初始化进度
             update_progress(0.2, "OCR开始")
 
@@ -229,6 +202,9 @@ def perform_parse(doc_id, doc_info, file_info, embedding_config):
         return {"success": False, "error": error_message}
 
     finally:
+        if table_buffer is not None:
+            table_buffer.close()
+
         # 清理临时文件 - 根据开发模式和环境变量控制
         from .mineru_parse.utils import should_cleanup_temp_files
         
@@ -237,7 +213,7 @@ def perform_parse(doc_id, doc_info, file_info, embedding_config):
         if cleanup_enabled:
             try:
                 # 清理通过temp_file_path变量创建的临时文件
-                if 'temp_file_path' in locals() and temp_file_path and os.path.exists(temp_file_path):
+                if temp_file_path and os.path.exists(temp_file_path):
                     os.remove(temp_file_path)
                     print(f"[Parser-INFO] 已清理临时文件: {temp_file_path}")
                 
@@ -254,7 +230,7 @@ def perform_parse(doc_id, doc_info, file_info, embedding_config):
                 print(f"[Parser-WARNING] 清理临时文件失败: {clean_e}")
         else:
             print(f"[Parser-INFO] 配置为保留临时文件（dev模式或CLEANUP_TEMP_FILES=false）")
-            if 'temp_file_path' in locals() and temp_file_path:
+            if temp_file_path:
                 print(f"[Parser-INFO] 保留临时文件: {temp_file_path}")
             if temp_pdf_path:
                 print(f"[Parser-INFO] 保留临时PDF文件: {temp_pdf_path}")
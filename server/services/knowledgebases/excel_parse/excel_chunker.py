@@ -344,9 +344,12 @@ class EnhancedExcelChunker:
                     return len(text.split('\n'))
             
             else:
-                # 字节流处理
+                # 字节流或文件对象处理
                 if isinstance(file_input, bytes):
                     file_like_object = BytesIO(file_input)
+                else:
+                    file_like_object = file_input
+                    file_like_object.seek(0)
                 
                 wb = load_workbook(file_like_object, data_only=True)
                 total = 0
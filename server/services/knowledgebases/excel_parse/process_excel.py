@@ -2,6 +2,7 @@ import time
 import logging
 from .excel_service import chunk_excel_for_knowledge_base
 from ..mineru_parse.ragflow_build import get_ragflow_doc, add_chunks_to_doc
+from ..parse_scheduler import parse_stage, STAGE_CHUNKING, STAGE_INGESTION
 
 logger = logging.getLogger(__name__)
 
@@ -11,7 +12,7 @@ def process_excel_entry(doc_id, file_content, kb_id, parser_config, doc_info, up
     
     Args:
         doc_id (str): 文档ID.
-        file_content (bytes): 文件内容.
+        file_content (bytes | file-like): 文件内容，可以是字节或可 seek 的文件对象（如 tempfile.TemporaryFile）.
         kb_id (str): 知识库ID.
         parser_config (dict): 解析配置.
         doc_info (dict): 文档信息.
@@ -24,11 +25,12 @@ def process_excel_entry(doc_id, file_content, kb_id, parser_config, doc_info, up
     logger.info(f"检测到表格文件，使用增强分块策略 for doc: {doc_id}")
 
     # 调用表格分块服务
-    result = chunk_excel_for_knowledge_base(
-        file_input=file_content,
-        kb_config=parser_config,
-        filename=doc_info.get('name')
-    )
+    with parse_stage(STAGE_CHUNKING):
+        result = chunk_excel_for_knowledge_base(
+            file_input=file_content,
+            kb_config=parser_config,
+            filename=doc_info.get('name')
+        )
     
     chunks = result.get('chunks', [])
     chunk_count = 0
@@ -38,10 +40,11 @@ def process_excel_entry(doc_id, file_content, kb_id, parser_config, doc_info, up
         # 获取 RAGFlow 文档对象
         doc = get_ragflow_doc(doc_id, kb_id)
         
-        # 批量添加
-        add_chunks_to_doc(doc, chunks, update_progress)
+        # 分批并发添加，仅统计成功写入的分块
+        with parse_stage(STAGE_INGESTION):
+            added_chunks = add_chunks_to_doc(doc, chunks, update_progress, progress_range=(0.4, 0.95))
         
-        chunk_count = len(chunks)
+        chunk_count = sum(1 for chunk in added_chunks if chunk is not None)
         
         # 注意: Excel 分块目前没有位置信息，所以不需要调用 _update_chunks_position
 
@@ -0,0 +1,611 @@
+import os
+import socket
+import threading
+import traceback
+import uuid
+from utils import generate_uuid
+from database import get_db_connection
+from ..config import JOB_QUEUE_CONFIG
+from .parse_scheduler import get_parse_scheduler, PRIORITY_HIGH, PRIORITY_NORMAL
+from .progress_writer import update_document_progress
+
+JOB_TABLE = "knowflow_parse_job"
+BATCH_TABLE = "knowflow_parse_batch"
+
+# 任务状态
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+# 排队或运行中的任务 active_doc_id 等于 doc_id，其余为 NULL；唯一索引保证每个文档最多一个活动任务
+_ACTIVE_DOC_COLUMN_SQL = (
+    f"active_doc_id VARCHAR(32) AS (IF(status IN ('{JOB_QUEUED}', '{JOB_RUNNING}'), doc_id, NULL)) STORED"
+)
+_ACTIVE_DOC_KEY_SQL = "UNIQUE KEY uk_active_doc (active_doc_id)"
+
+_CREATE_TABLE_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {JOB_TABLE} (
+        id BIGINT NOT NULL AUTO_INCREMENT,
+        doc_id VARCHAR(32) NOT NULL,
+        doc_name VARCHAR(255) NULL,
+        kb_id VARCHAR(32) NULL,
+        batch_id VARCHAR(32) NULL,
+        priority INT NOT NULL DEFAULT {PRIORITY_NORMAL},
+        status VARCHAR(16) NOT NULL DEFAULT '{JOB_QUEUED}',
+        attempts INT NOT NULL DEFAULT 0,
+        cancel_requested TINYINT NOT NULL DEFAULT 0,
+        worker_id VARCHAR(128) NULL,
+        lease_expires_at DATETIME NULL,
+        error TEXT NULL,
+        created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        started_at DATETIME NULL,
+        finished_at DATETIME NULL,
+        {_ACTIVE_DOC_COLUMN_SQL},
+        PRIMARY KEY (id),
+        KEY idx_status_priority (status, priority, id),
+        KEY idx_doc_id (doc_id),
+        KEY idx_kb_batch (kb_id, batch_id),
+        {_ACTIVE_DOC_KEY_SQL}
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+"""
+
+# 每个知识库最近一次批量解析的 batch_id；提交批量任务时锁定该行，同一知识库的并发提交依次执行，
+# 没有待解析文档的批量任务也记录在这里，进度查询不会读到上一批
+_CREATE_BATCH_TABLE_SQL = f"""
+    CREATE TABLE IF NOT EXISTS {BATCH_TABLE} (
+        kb_id VARCHAR(32) NOT NULL,
+        batch_id VARCHAR(32) NULL,
+        created_at DATETIME NULL,
+        PRIMARY KEY (kb_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+"""
+
+# 旧版本创建的任务表补充 active_doc_id 列：先结束重复的排队任务，否则唯一索引无法建立
+_DEDUPE_QUEUED_SQL = f"""
+    UPDATE {JOB_TABLE} j
+    JOIN (SELECT doc_id, COALESCE(MIN(IF(status = '{JOB_RUNNING}', id, NULL)), MIN(id)) AS keep_id FROM {JOB_TABLE}
+          WHERE status IN ('{JOB_QUEUED}', '{JOB_RUNNING}') GROUP BY doc_id HAVING COUNT(*) > 1) d
+      ON j.doc_id = d.doc_id
+    SET j.status = '{JOB_CANCELLED}', j.error = '重复的解析任务', j.finished_at = NOW()
+    WHERE j.status = '{JOB_QUEUED}' AND j.id <> d.keep_id
+"""
+_ADD_ACTIVE_DOC_SQL = f"ALTER TABLE {JOB_TABLE} ADD COLUMN {_ACTIVE_DOC_COLUMN_SQL}, ADD {_ACTIVE_DOC_KEY_SQL}"
+
+
+class ParseJobQueue:
+    """
+    基于 MySQL 的持久化解析任务队列
+
+    任务写入 knowflow_parse_job 表，worker 通过条件 UPDATE 抢占任务并持有租约，
+    运行期间定期续约；租约过期（worker 崩溃或重启）的任务会被重新排队，
+    超过最大执行次数后标记为失败。所有时间比较使用数据库时钟，避免多节点时钟偏差。
+    """
+
+    def __init__(self, lease_seconds=120, max_attempts=3):
+        self.lease_seconds = max(10, lease_seconds)
+        self.max_attempts = max(1, max_attempts)
+        self._table_ready = False
+        self._table_lock = threading.Lock()
+
+    def _connect(self):
+        if not self._table_ready:
+            with self._table_lock:
+                if not self._table_ready:
+                    conn = get_db_connection()
+                    try:
+                        cursor = conn.cursor()
+                        cursor.execute(_CREATE_TABLE_SQL)
+                        cursor.execute(_CREATE_BATCH_TABLE_SQL)
+                        cursor.execute(
+                            """SELECT COUNT(*) FROM information_schema.COLUMNS
+                               WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = 'active_doc_id'""",
+                            (JOB_TABLE,)
+                        )
+                        if not cursor.fetchone()[0]:
+                            cursor.execute(_DEDUPE_QUEUED_SQL)
+                            cursor.execute(_ADD_ACTIVE_DOC_SQL)
+                        conn.commit()
+                        cursor.close()
+                    finally:
+                        conn.close()
+                    self._table_ready = True
+        return get_db_connection()
+
+    # ---------- 提交与取消 ----------
+
+    def enqueue_document(self, doc_id, priority=PRIORITY_HIGH):
+        """
+        提交单个文档解析任务
+
+        Returns:
+            bool: 是否已提交（文档已有排队或运行中的任务时返回 False）
+        """
+        conn = self._connect()
+        cursor = None
+        try:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("SELECT name, kb_id FROM document WHERE id = %s", (doc_id,))
+            doc = cursor.fetchone()
+            if not doc:
+                raise Exception("文档不存在")
+
+            # 文档已有活动任务时命中 uk_active_doc，不插入新行，rowcount 为 0
+            cursor.execute(
+                f"""INSERT INTO {JOB_TABLE} (doc_id, doc_name, kb_id, priority) VALUES (%s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE id = id""",
+                (doc_id, doc['name'], doc['kb_id'], priority)
+            )
+            conn.commit()
+            return cursor.rowcount == 1
+        finally:
+            if cursor:
+                cursor.close()
+            conn.close()
+
+    def enqueue_batch(self, kb_id, documents, priority=PRIORITY_NORMAL):
+        """
+        提交知识库批量解析任务
+
+        Args:
+            documents: [{'id': ..., 'name': ...}, ...]
+
+        Returns:
+            dict: 批量任务进度，该知识库已有运行中的批量任务时返回 None
+        """
+        conn = self._connect()
+        cursor = None
+        try:
+            cursor = conn.cursor(dictionary=True)
+            # 锁定知识库的批量任务记录，同一知识库的并发提交在此排队，不会各自创建批量任务
+            cursor.execute(
+                f"INSERT INTO {BATCH_TABLE} (kb_id) VALUES (%s) ON DUPLICATE KEY UPDATE kb_id = kb_id",
+                (kb_id,)
+            )
+            batch_id = self._latest_batch_id(cursor, kb_id, for_update=True)
+            if batch_id:
+                cursor.execute(
+                    f"SELECT id FROM {JOB_TABLE} WHERE batch_id = %s AND status IN (%s, %s) LIMIT 1",
+                    (batch_id, JOB_QUEUED, JOB_RUNNING)
+                )
+                if cursor.fetchone():
+                    conn.rollback()
+                    return None
+
+            # 已在排队或运行中的文档不重复提交
+            cursor.execute(
+                f"SELECT doc_id FROM {JOB_TABLE} WHERE kb_id = %s AND status IN (%s, %s)",
+                (kb_id, JOB_QUEUED, JOB_RUNNING)
+            )
+            active_doc_ids = {row['doc_id'] for row in cursor.fetchall()}
+
+            batch_id = generate_uuid()
+            rows = [
+                (doc['id'], doc.get('name'), kb_id, batch_id, priority)
+                for doc in documents if doc['id'] not in active_doc_ids
+            ]
+            inserted = 0
+            for row in rows:
+                # 查询之后被其他请求提交的文档由 uk_active_doc 拦下，不会重复排队
+                cursor.execute(
+                    f"""INSERT INTO {JOB_TABLE} (doc_id, doc_name, kb_id, batch_id, priority)
+                        VALUES (%s, %s, %s, %s, %s) ON DUPLICATE KEY UPDATE id = id""",
+                    row
+                )
+                inserted += 1 if cursor.rowcount == 1 else 0
+            # 没有插入任何任务时同样记录为最近一批，之后的进度查询返回这个空批次
+            cursor.execute(
+                f"UPDATE {BATCH_TABLE} SET batch_id = %s, created_at = NOW() WHERE kb_id = %s",
+                (batch_id, kb_id)
+            )
+            conn.commit()
+            return self._batch_progress(cursor, batch_id)
+        finally:
+            if cursor:
+                cursor.close()
+            conn.close()
+
+    def cancel_batch(self, kb_id):
+        """取消知识库最近一次批量解析：排队中的任务直接取消，运行中的任务通知 worker 中止"""
+        conn = self._connect()
+        cursor = None
+        try:
+            cursor = conn.cursor(dictionary=True)
+            batch_id = self._latest_batch_id(cursor, kb_id)
+            if not batch_id:
+                return False
+            cursor.execute(
+                f"UPDATE {JOB_TABLE} SET status = %s, finished_at = NOW() WHERE batch_id = %s AND status = %s",
+                (JOB_CANCELLED, batch_id, JOB_QUEUED)
+            )
+            cancelled = cursor.rowcount
+            cursor.execute(
+                f"UPDATE {JOB_TABLE} SET cancel_requested = 1 WHERE batch_id = %s AND status = %s",
+                (batch_id, JOB_RUNNING)
+            )
+            cancelled += cursor.rowcount
+            conn.commit()
+            return cancelled > 0
+        finally:
+            if cursor:
+                cursor.close()
+            conn.close()
+
+    # ---------- 状态查询 ----------
+
+    def get_batch_progress(self, kb_id):
+        conn = self._connect()
+        cursor = None
+        try:
+            cursor = conn.cursor(dictionary=True)
+            batch_id = self._latest_batch_id(cursor, kb_id)
+            return self._batch_progress(cursor, batch_id) if batch_id else None
+        finally:
+            if cursor:
+                cursor.close()
+            conn.close()
+
+    def get_document_status(self, doc_id):
+        """返回文档最近一次解析任务的状态"""
+        conn = self._connect()
+        cursor = None
+        try:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(
+                f"""SELECT id, status, priority, attempts, worker_id, error
+                    FROM {JOB_TABLE} WHERE doc_id = %s ORDER BY id DESC LIMIT 1""",
+                (doc_id,)
+            )
+            return cursor.fetchone()
+        finally:
+            if cursor:
+                cursor.close()
+            conn.close()
+
+    @staticmethod
+    def _latest_batch_id(cursor, kb_id, for_update=False):
+        cursor.execute(
+            f"SELECT batch_id FROM {BATCH_TABLE} WHERE kb_id = %s{' FOR UPDATE' if for_update else ''}",
+            (kb_id,)
+        )
+        row = cursor.fetchone()
+        if row and row['batch_id']:
+            return row['batch_id']
+        # 批量任务表创建之前提交的批次只记录在任务表中
+        cursor.execute(
+            f"SELECT batch_id FROM {JOB_TABLE} WHERE kb_id = %s AND batch_id IS NOT NULL ORDER BY id DESC LIMIT 1",
+            (kb_id,)
+        )
+        row = cursor.fetchone()
+        return row['batch_id'] if row else None
+
+    @staticmethod
+    def _batch_progress(cursor, batch_id):
+        cursor.execute(
+            f"""SELECT doc_id, doc_name, status, priority, worker_id, error, cancel_requested,
+                       UNIX_TIMESTAMP(created_at) AS created_ts, UNIX_TIMESTAMP(finished_at) AS finished_ts
+                FROM {JOB_TABLE} WHERE batch_id = %s ORDER BY id""",
+            (batch_id,)
+        )
+        jobs = cursor.fetchall()
+        counts = {state: 0 for state in (JOB_QUEUED, JOB_RUNNING, JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)}
+        for job in jobs:
+            counts[job['status']] = counts.get(job['status'], 0) + 1
+
+        total = len(jobs)
+        finished = counts[JOB_COMPLETED] + counts[JOB_FAILED] + counts[JOB_CANCELLED]
+        start_time = float(min(job['created_ts'] for job in jobs)) if jobs else None
+        end_time = None
+        cancel_requested = any(job['cancel_requested'] for job in jobs) or counts[JOB_CANCELLED] > 0
+
+        if finished < total:
+            status = "running"
+            message = f"正在解析 {counts[JOB_RUNNING]} 个文档，已完成 {finished}/{total}"
+        elif not total:
+            status = "completed"
+            message = "没有需要解析的文档。"
+        else:
+            status = "cancelled" if cancel_requested else "completed"
+            end_time = max((float(job['finished_ts']) for job in jobs if job['finished_ts'] is not None), default=start_time)
+            duration = round(end_time - start_time, 2) if start_time is not None else 0
+            message = (f"批量解析{'已取消' if cancel_requested else '完成'}。总计 {total} 个，"
+                       f"成功 {counts[JOB_COMPLETED]} 个，失败 {counts[JOB_FAILED]} 个，"
+                       f"取消 {counts[JOB_CANCELLED]} 个。耗时 {duration} 秒。")
+
+        return {
+            "status": status,
+            "total": total,
+            "current": finished,
+            "message": message,
+            "start_time": start_time,
+            "end_time": end_time,
+            "queued": counts[JOB_QUEUED],
+            "running": counts[JOB_RUNNING],
+            "completed": counts[JOB_COMPLETED],
+            "failed": counts[JOB_FAILED],
+            "cancelled": counts[JOB_CANCELLED],
+            "documents": [
+                {
+                    "id": job['doc_id'],
+                    "name": job['doc_name'],
+                    "state": job['status'],
+                    "priority": job['priority'],
+                    "worker": job['worker_id'],
+                    "error": job['error'],
+                }
+                for job in jobs
+            ],
+        }
+
+    # ---------- worker 接口 ----------
+
+    def claim(self, worker_id, limit):
+        """按 (优先级, 提交顺序) 领取最多 limit 个排队中的任务"""
+        if limit <= 0:
+            return []
+        conn = self._connect()
+        cursor = None
+        try:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(
+                f"SELECT id FROM {JOB_TABLE} WHERE status = %s ORDER BY priority, id LIMIT %s",
+                (JOB_QUEUED, limit * 2)
+            )
+            candidate_ids = [row['id'] for row in cursor.fetchall()]
+
+            claimed_ids = []
+            for job_id in candidate_ids:
+                # 条件更新保证同一任务只会被一个 worker 领取
+                cursor.execute(
+                    f"""UPDATE {JOB_TABLE}
+                        SET status = %s, worker_id = %s, attempts = attempts + 1, started_at = NOW(),
+                            lease_expires_at = DATE_ADD(NOW(), INTERVAL %s SECOND)
+                        WHERE id = %s AND status = %s""",
+                    (JOB_RUNNING, worker_id, self.lease_seconds, job_id, JOB_QUEUED)
+                )
+                conn.commit()
+                if cursor.rowcount == 1:
+                    claimed_ids.append(job_id)
+                    if len(claimed_ids) >= limit:
+                        break
+
+            if not claimed_ids:
+                return []
+            placeholders = ", ".join(["%s"] * len(claimed_ids))
+            cursor.execute(
+                f"SELECT id, doc_id, doc_name, kb_id, priority, attempts FROM {JOB_TABLE} WHERE id IN ({placeholders}) ORDER BY priority, id",
+                claimed_ids
+            )
+            return cursor.fetchall()
+        finally:
+            if cursor:
+                cursor.close()
+            conn.close()
+
+    def heartbeat(self, worker_id, job_ids):
+        """
+        为运行中的任务续约
+
+        Returns:
+            tuple: (需要取消的任务ID集合, 已不再属于该 worker 的任务ID集合)
+        """
+        if not job_ids:
+            return set(), set()
+        conn = self._connect()
+        cursor = None
+        try:
+            cursor = conn.cursor(dictionary=True)
+            placeholders = ", ".join(["%s"] * len(job_ids))
+            cursor.execute(
+                f"""UPDATE {JOB_TABLE} SET lease_expires_at = DATE_ADD(NOW(), INTERVAL %s SECOND)
+                    WHERE id IN ({placeholders}) AND worker_id = %s AND status = %s""",
+                [self.lease_seconds, *job_ids, worker_id, JOB_RUNNING]
+            )
+            conn.commit()
+            cursor.execute(
+                f"SELECT id, status, worker_id, cancel_requested FROM {JOB_TABLE} WHERE id IN ({placeholders})",
+                list(job_ids)
+            )
+            rows = {row['id']: row for row in cursor.fetchall()}
+            lost = {job_id for job_id in job_ids
+                    if job_id not in rows or rows[job_id]['status'] != JOB_RUNNING or rows[job_id]['worker_id'] != worker_id}
+            cancel = {job_id for job_id, row in rows.items() if row['cancel_requested']}
+            return cancel | lost, lost
+        finally:
+            if cursor:
+                cursor.close()
+            conn.close()
+
+    def finish(self, job_id, worker_id, status, error=None):
+        """记录任务结束状态（仅当任务仍由该 worker 持有时生效）"""
+        conn = self._connect()
+        cursor = None
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""UPDATE {JOB_TABLE} SET status = %s, error = %s, finished_at = NOW(), lease_expires_at = NULL
+                    WHERE id = %s AND worker_id = %s AND status = %s""",
+                (status, error, job_id, worker_id, JOB_RUNNING)
+            )
+            conn.commit()
+            return cursor.rowcount == 1
+        finally:
+            if cursor:
+                cursor.close()
+            conn.close()
+
+    def requeue_expired(self):
+        """重新排队租约过期的任务，超过最大执行次数或已请求取消的任务直接结束"""
+        conn = self._connect()
+        cursor = None
+        try:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(
+                f"""SELECT id, doc_id, attempts, cancel_requested FROM {JOB_TABLE}
+                    WHERE status = %s AND lease_expires_at < NOW()""",
+                (JOB_RUNNING,)
+            )
+            expired = cursor.fetchall()
+            requeued = 0
+            for job in expired:
+                if job['cancel_requested']:
+                    status, error = JOB_CANCELLED, "解析任务已取消"
+                elif job['attempts'] >= self.max_attempts:
+                    status, error = JOB_FAILED, f"worker 多次中断，已达到最大执行次数 {self.max_attempts}"
+                else:
+                    status, error = JOB_QUEUED, None
+
+                cursor.execute(
+                    f"""UPDATE {JOB_TABLE}
+                        SET status = %s, error = %s, worker_id = NULL, lease_expires_at = NULL,
+                            finished_at = IF(%s = %s, NULL, NOW())
+                        WHERE id = %s AND status = %s AND lease_expires_at < NOW()""",
+                    (status, error, status, JOB_QUEUED, job['id'], JOB_RUNNING)
+                )
+                conn.commit()
+                if cursor.rowcount != 1:
+                    continue
+                if status == JOB_QUEUED:
+                    requeued += 1
+                    print(f"[Parse Queue] 任务 {job['id']} (文档 {job['doc_id']}) 租约过期，已重新排队")
+                else:
+                    print(f"[Parse Queue] 任务 {job['id']} (文档 {job['doc_id']}) 租约过期: {error}")
+                    update_document_progress(job['doc_id'], status='1', run='0', message=f"解析失败: {error}")
+            return requeued
+        finally:
+            if cursor:
+                cursor.close()
+            conn.close()
+
+
+class ParseWorker:
+    """
+    解析任务 worker
+
+    从持久化队列领取任务交给本进程的 ParseScheduler 执行（沿用其阶段并发限制），
+    后台线程定期续约并把取消请求转发给调度器，同时负责回收其他 worker 遗留的过期任务。
+    """
+
+    def __init__(self, job_queue, handler, scheduler=None, worker_id=None,
+                 heartbeat_interval=20, poll_interval=2.0):
+        self.job_queue = job_queue
+        self.handler = handler
+        self.scheduler = scheduler or get_parse_scheduler()
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.heartbeat_interval = max(1, heartbeat_interval)
+        self.poll_interval = max(0.1, poll_interval)
+        self._active = {}
+        self._active_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """在后台线程中运行 worker"""
+        if self._threads:
+            return
+        for target, name in ((self._claim_loop, "parse-queue-claim"), (self._heartbeat_loop, "parse-queue-heartbeat")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"[Parse Queue] worker {self.worker_id} 已启动，最大并发 {self.scheduler.max_workers}")
+
+    def run_forever(self):
+        """在当前线程中运行 worker，直到 stop() 被调用"""
+        self.start()
+        try:
+            while not self._stop_event.wait(1):
+                pass
+        except KeyboardInterrupt:
+            self.stop()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _claim_loop(self):
+        while not self._stop_event.is_set():
+            claimed = []
+            try:
+                with self._active_lock:
+                    free = self.scheduler.max_workers - len(self._active)
+                claimed = self.job_queue.claim(self.worker_id, free)
+                for job in claimed:
+                    self._dispatch(job)
+            except Exception as e:
+                print(f"[Parse Queue ERROR] 领取任务失败: {e}")
+                traceback.print_exc()
+            if not claimed:
+                self._stop_event.wait(self.poll_interval)
+
+    def _dispatch(self, job):
+        job_id = job['id']
+        with self._active_lock:
+            self._active[job_id] = job['doc_id']
+
+        def on_finish(doc_id, state, error):
+            with self._active_lock:
+                self._active.pop(job_id, None)
+            self.job_queue.finish(job_id, self.worker_id, state, error)
+
+        print(f"[Parse Queue] worker {self.worker_id} 领取任务 {job_id} (文档 {job['doc_id']}，第 {job['attempts']} 次执行)")
+        # 文档已在本节点解析中（例如未经队列直接提交）时，任务挂到该次解析上，随其结束
+        self.scheduler.submit_document(
+            job['doc_id'], self.handler, doc_name=job['doc_name'], priority=job['priority'], on_finish=on_finish,
+            attach=True
+        )
+
+    def _heartbeat_loop(self):
+        while not self._stop_event.wait(self.heartbeat_interval):
+            try:
+                with self._active_lock:
+                    active = dict(self._active)
+                cancel_ids, lost_ids = self.job_queue.heartbeat(self.worker_id, list(active))
+                for job_id in cancel_ids:
+                    if job_id in active:
+                        self.scheduler.cancel_document(active[job_id])
+                for job_id in lost_ids:
+                    print(f"[Parse Queue] 任务 {job_id} 已不再由本 worker 持有，停止执行")
+                self.job_queue.requeue_expired()
+            except Exception as e:
+                print(f"[Parse Queue ERROR] 任务续约失败: {e}")
+
+
+_queue = None
+_queue_lock = threading.Lock()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_parse_job_queue():
+    """获取全局持久化解析队列"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = ParseJobQueue(
+                    lease_seconds=JOB_QUEUE_CONFIG.lease_seconds,
+                    max_attempts=JOB_QUEUE_CONFIG.max_attempts
+                )
+    return _queue
+
+
+def create_parse_worker(handler):
+    """按配置创建 worker"""
+    return ParseWorker(
+        get_parse_job_queue(),
+        handler,
+        heartbeat_interval=JOB_QUEUE_CONFIG.heartbeat_interval,
+        poll_interval=JOB_QUEUE_CONFIG.poll_interval
+    )
+
+
+def start_embedded_worker(handler):
+    """在当前进程内启动 worker（job_queue.enabled 且 embedded_worker 开启时）"""
+    global _worker
+    if not (JOB_QUEUE_CONFIG.enabled and JOB_QUEUE_CONFIG.embedded_worker):
+        return None
+    with _worker_lock:
+        if _worker is None:
+            _worker = create_parse_worker(handler)
+            _worker.start()
+    return _worker
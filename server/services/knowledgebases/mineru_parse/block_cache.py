@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分块定位缓存
+
+缓存每个文档的块列表（BlockStore 或从 middle_json 流式提取的列表）及其上建立的 BlockMatcher，
+供同一文档的所有 chunk 复用。缓存按估算的内存占用做 LRU 淘汰；缓存键包含块文件的
+inode、修改时间和大小，临时路径被复用时不会取到旧文档的块；文档解析完成后调用 release 释放。
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .block_matcher import BlockMatcher
+from .block_store import BlockStore, block_store_path
+from .result_stream import load_middle_json_blocks
+from ...config import BLOCK_CACHE_CONFIG
+
+# 从 middle_json 提取的块 dict 除文本外的大致内存占用（字节）
+_BLOCK_DICT_OVERHEAD = 600
+
+
+def _block_file(md_file_path: str) -> Optional[str]:
+    """md 文件对应的块文件：优先块存储文件，其次 middle_json"""
+    for path in (block_store_path(md_file_path), md_file_path.replace('.md', '_middle.json')):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _load_blocks(path: str):
+    """读取块文件，返回 (块列表, 估算内存字节数)"""
+    if path.endswith('.bin'):
+        block_list = BlockStore(path)
+        return block_list, os.path.getsize(path)
+    block_list = load_middle_json_blocks(path)
+    size = sum(sys.getsizeof(block['text']) + _BLOCK_DICT_OVERHEAD for block in block_list)
+    return block_list, size
+
+
+class BlockCache:
+    """按内存上限做 LRU 淘汰的块列表与匹配索引缓存"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'releases': 0}
+
+    @staticmethod
+    def _key(path: str) -> Tuple:
+        stat = os.stat(path)
+        return (path, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _lookup(self, md_file_path: str) -> Optional[Tuple[Tuple, Dict[str, Any]]]:
+        """返回 (缓存键, 缓存项)，块文件不存在时返回 None"""
+        path = _block_file(md_file_path)
+        if path is None:
+            return None
+        key = self._key(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return key, entry
+            self._stats['misses'] += 1
+
+        block_list, size = _load_blocks(path)
+        with self._lock:
+            # 并发加载同一文档时保留先写入的缓存项
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {'md_file_path': md_file_path, 'blocks': block_list, 'matcher': None, 'bytes': size}
+                self._entries[key] = entry
+                self._bytes += size
+                self._evict(keep=key)
+        return key, entry
+
+    def _evict(self, keep: Tuple):
+        """超出内存上限时从最久未使用的文档开始淘汰（调用方持有锁），刚使用的文档保留"""
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            key, entry = next(iter(self._entries.items()))
+            if key == keep:
+                self._entries.move_to_end(key)
+                continue
+            del self._entries[key]
+            self._bytes -= entry['bytes']
+            self._stats['evictions'] += 1
+
+    def get_blocks(self, md_file_path: str):
+        """获取 md 文件对应的块列表，块文件不存在时返回空列表"""
+        found = self._lookup(md_file_path)
+        if found is None:
+            print(f"[WARNING] 块存储和JSON文件均不存在: {block_store_path(md_file_path)}")
+            return []
+        return found[1]['blocks']
+
+    def get_matcher(self, md_file_path: str) -> BlockMatcher:
+        """获取 md 文件对应块列表上的位置匹配索引"""
+        found = self._lookup(md_file_path)
+        if found is None:
+            return BlockMatcher([])
+        key, entry = found
+        matcher = entry['matcher']
+        if matcher is not None:
+            return matcher
+
+        matcher = BlockMatcher(entry['blocks'])
+        with self._lock:
+            if entry['matcher'] is None:
+                entry['matcher'] = matcher
+                extra = matcher.memory_estimate()
+                entry['bytes'] += extra
+                if key in self._entries:
+                    self._bytes += extra
+                    self._evict(keep=key)
+            return entry['matcher']
+
+    def release(self, md_file_path: str) -> int:
+        """文档处理完成后释放其缓存项，返回释放的项数"""
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if entry['md_file_path'] == md_file_path]
+            for key in keys:
+                self._bytes -= self._entries.pop(key)['bytes']
+            self._stats['releases'] += len(keys)
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """缓存项数、估算内存、命中率等统计"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats['max_bytes'] = self.max_bytes
+        return stats
+
+
+_block_cache = BlockCache(BLOCK_CACHE_CONFIG.max_size_mb * 1024 * 1024)
+
+
+def get_block_cache() -> BlockCache:
+    """获取进程内的分块定位缓存"""
+    return _block_cache
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+块位置匹配索引
+
+对 get_blocks_from_md 返回的 block 列表一次性建立 n-gram 倒排索引，
+为每个 chunk 快速定位候选 block，再用 chunk 的后缀自动机线性计算
+最长公共子串，从而替代对所有 block 逐一执行 O(m·n) 动态规划的做法。
+
+匹配语义与原 get_bbox_for_chunk 保持一致：
+- 锚点为与 chunk 最长公共子串最长的 block（同分取靠前的 block）
+- 从锚点向前后扩展，收集文本完整出现在 chunk 中的连续 block
+"""
+
+import sys
+from collections import defaultdict
+
+
+DEFAULT_NGRAM_SIZE = 3
+# 出现在超过该比例 block 中的 n-gram 视为高频词，不参与候选召回
+DEFAULT_MAX_POSTING_RATIO = 0.05
+# 高频判定的最小阈值，避免小文档中所有 n-gram 都被视为高频
+MIN_POSTING_LIMIT = 64
+
+
+class _SuffixAutomaton:
+    """字符串后缀自动机，用于线性时间计算最长公共子串长度"""
+
+    def __init__(self, text):
+        self.next = [{}]
+        self.link = [-1]
+        self.length = [0]
+        last = 0
+        for ch in text:
+            cur = len(self.next)
+            self.next.append({})
+            self.length.append(self.length[last] + 1)
+            self.link.append(0)
+            p = last
+            while p != -1 and ch not in self.next[p]:
+                self.next[p][ch] = cur
+                p = self.link[p]
+            if p != -1:
+                q = self.next[p][ch]
+                if self.length[p] + 1 == self.length[q]:
+                    self.link[cur] = q
+                else:
+                    clone = len(self.next)
+                    self.next.append(dict(self.next[q]))
+                    self.length.append(self.length[p] + 1)
+                    self.link.append(self.link[q])
+                    while p != -1 and self.next[p].get(ch) == q:
+                        self.next[p][ch] = clone
+                        p = self.link[p]
+                    self.link[q] = clone
+                    self.link[cur] = clone
+            last = cur
+
+    def longest_common_substring_length(self, text):
+        """返回 text 与自动机对应字符串的最长公共子串长度"""
+        nxt, link, length = self.next, self.link, self.length
+        state = 0
+        cur_len = 0
+        best = 0
+        for ch in text:
+            if ch in nxt[state]:
+                state = nxt[state][ch]
+                cur_len += 1
+            else:
+                while state != -1 and ch not in nxt[state]:
+                    state = link[state]
+                if state == -1:
+                    state = 0
+                    cur_len = 0
+                    continue
+                cur_len = length[state] + 1
+                state = nxt[state][ch]
+            if cur_len > best:
+                best = cur_len
+        return best
+
+
+class BlockMatcher:
+    """基于 n-gram 倒排索引的 chunk -> block 位置匹配器"""
+
+    def __init__(self, block_list, ngram_size=DEFAULT_NGRAM_SIZE, max_posting_ratio=DEFAULT_MAX_POSTING_RATIO):
+        """
+        Args:
+            block_list: get_blocks_from_md 返回的 block 列表或 BlockStore
+            ngram_size: 建立倒排索引使用的字符 n-gram 长度
+            max_posting_ratio: 高频 n-gram 的判定比例
+        """
+        self.block_list = block_list or []
+        self.ngram_size = max(1, int(ngram_size))
+        if hasattr(self.block_list, 'texts'):
+            # BlockStore：直接批量解码文本列，不为每个块构造 dict
+            self.texts = [text.strip() for text in self.block_list.texts()]
+        else:
+            self.texts = [block.get('text', '').strip() for block in self.block_list]
+        self.posting_limit = max(MIN_POSTING_LIMIT, int(len(self.texts) * max_posting_ratio))
+
+        postings = defaultdict(list)
+        n = self.ngram_size
+        posting_entries = 0
+        for idx, text in enumerate(self.texts):
+            if len(text) < n:
+                continue
+            grams = {text[i:i + n] for i in range(len(text) - n + 1)}
+            posting_entries += len(grams)
+            for gram in grams:
+                postings[gram].append(idx)
+        self.postings = dict(postings)
+        self._posting_entries = posting_entries
+
+    def __len__(self):
+        return len(self.block_list)
+
+    def memory_estimate(self):
+        """索引占用内存的粗略估计（字节）：文本、倒排表条目及 n-gram 键"""
+        text_bytes = sum(sys.getsizeof(text) for text in self.texts)
+        return text_bytes + self._posting_entries * 8 + len(self.postings) * (64 + 4 * self.ngram_size)
+
+    def _collect_candidates(self, chunk):
+        """根据 n-gram 命中次数召回候选 block，返回按命中数降序排列的索引列表"""
+        n = self.ngram_size
+        grams = {chunk[i:i + n] for i in range(len(chunk) - n + 1)}
+        hits = defaultdict(int)
+        frequent = set()
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if not posting:
+                continue
+            if len(posting) > self.posting_limit:
+                frequent.update(posting)
+                continue
+            for idx in posting:
+                hits[idx] += 1
+
+        if hits:
+            return sorted(hits, key=lambda idx: (-hits[idx], idx))
+        # 所有共享 n-gram 都是高频词时，退回到高频词覆盖的 block
+        return sorted(frequent)
+
+    def _find_anchor(self, chunk):
+        """返回 (锚点索引, 最长公共子串长度)，未找到时返回 (None, 0)"""
+        if len(chunk) < self.ngram_size:
+            # chunk 过短无法生成 n-gram：先做子串查找，命中即为最大可能长度
+            for idx, text in enumerate(self.texts):
+                if text and chunk in text:
+                    return idx, len(chunk)
+            candidates = [idx for idx, text in enumerate(self.texts) if text]
+        else:
+            candidates = self._collect_candidates(chunk)
+
+        if not candidates:
+            return None, 0
+
+        sam = _SuffixAutomaton(chunk)
+        best_idx, best_len = None, 0
+        for idx in candidates:
+            text = self.texts[idx]
+            # 公共子串长度不会超过 block 自身长度，无法超越当前最优时跳过
+            if best_idx is not None and (len(text) < best_len or (len(text) == best_len and idx > best_idx)):
+                continue
+            lcs_length = sam.longest_common_substring_length(text)
+            if lcs_length > best_len or (lcs_length == best_len and lcs_length > 0 and idx < best_idx):
+                best_idx, best_len = idx, lcs_length
+        return best_idx, best_len
+
+    def match_span(self, chunk_content):
+        """
+        返回构成 chunk 的连续 block 索引区间 (start, end)，end 为闭区间；未匹配返回 None
+        """
+        chunk = (chunk_content or '').strip()
+        if not chunk or not self.block_list:
+            return None
+
+        anchor_idx, _ = self._find_anchor(chunk)
+        if anchor_idx is None:
+            return None
+
+        start = anchor_idx
+        while start > 0 and self.texts[start - 1] and self.texts[start - 1] in chunk:
+            start -= 1
+        end = anchor_idx
+        while end + 1 < len(self.texts) and self.texts[end + 1] and self.texts[end + 1] in chunk:
+            end += 1
+        return start, end
+
+    def positions_for_chunk(self, chunk_content):
+        """
+        返回 chunk 对应的位置列表，每项为 [page_idx, x0, x1, y0, y1]，
+        格式与 ragflow_build._add_positions 的输入一致；未匹配返回 None
+        """
+        span = self.match_span(chunk_content)
+        if span is None:
+            return None
+
+        positions = []
+        for block in self.block_list[span[0]:span[1] + 1]:
+            bbox = block.get('bbox')
+            page_number = block.get('page_idx')
+            if bbox and page_number is not None:
+                positions.append([page_number, bbox[0], bbox[2], bbox[1], bbox[3]])
+        return positions or None
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+紧凑的二进制块存储
+
+从 MinerU 返回的 middle_json 中一次性提取分块定位所需的块信息（页码、bbox、类型、文本），
+按列保存为一个小的二进制文件，代替把完整 middle_json 以 indent=2 写盘后再整体 json.load。
+读取时通过 mmap 映射文件，各列直接以 memoryview 访问，文本按需解码。
+
+文件布局（小端）：
+    头部        magic(4s) version(I) 块数 n(I) 类型数 t(I) 类型表字节数(I) 文本字节数(I)
+    page_idx    int32[n]
+    index       int32[n]
+    type_id     int32[n]
+    bbox        float32[n * 4]
+    text_offset uint32[n + 1]   各块文本在文本区中的字节偏移
+    类型表      UTF-8，以 \\0 分隔的 t 个类型名（补齐到 4 字节）
+    文本区      所有块文本的 UTF-8 拼接
+"""
+
+import mmap
+import os
+import struct
+from array import array
+from typing import Any, Dict, Iterator, List
+
+BLOCK_STORE_MAGIC = b"KFBS"
+BLOCK_STORE_VERSION = 1
+_HEADER = struct.Struct("<4sIIIII")
+
+
+def block_store_path(md_file_path: str) -> str:
+    """md 文件对应的块存储文件路径"""
+    return md_file_path.replace('.md', '_blocks.bin')
+
+
+def _block_text(block: Dict[str, Any]) -> str:
+    return ''.join(
+        span['content']
+        for line in block.get('lines', [])
+        for span in line.get('spans', [])
+        if isinstance(span.get('content'), str)
+    ).strip()
+
+
+def extract_page_blocks(page_idx: int, page: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    提取 middle_json 中单个页面的块
+
+    Pipeline 模式读取 preproc_blocks，VLM 模式读取 para_blocks；没有 bbox 的块跳过。
+    """
+    if 'preproc_blocks' in page:
+        blocks, source_mode = page['preproc_blocks'], 'pipeline'
+    elif 'para_blocks' in page:
+        blocks, source_mode = page['para_blocks'], 'vlm'
+        if not isinstance(blocks, list):
+            print(f"[WARNING] VLM模式para_blocks格式异常，期望数组但得到: {type(blocks)}")
+            return []
+    else:
+        print(f"[WARNING] 第{page_idx}页缺少preproc_blocks和para_blocks字段，跳过")
+        return []
+
+    block_list = []
+    for block in blocks:
+        bbox = block.get('bbox')
+        if not bbox:
+            continue
+        block_list.append({
+            'bbox': bbox,
+            'type': block.get('type', 'unknown'),
+            'text': _block_text(block),
+            'page_idx': page_idx,
+            'index': block.get('index', 0),
+            'source_mode': source_mode,
+        })
+    return block_list
+
+
+def extract_blocks(middle_json: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """从 middle_json 中提取块列表"""
+    block_list = []
+    if 'pdf_info' not in middle_json:
+        print(f"[WARNING] 无效的数据结构: 缺少 pdf_info 字段")
+        return block_list
+
+    for page_idx, page in enumerate(middle_json['pdf_info']):
+        block_list.extend(extract_page_blocks(page_idx, page))
+    return block_list
+
+
+def _pad4(data: bytes) -> bytes:
+    return data + b"\0" * (-len(data) % 4)
+
+
+def write_block_store(path: str, block_list: List[Dict[str, Any]]) -> int:
+    """
+    把块列表写入块存储文件
+
+    Returns:
+        int: 文件大小（字节）
+    """
+    type_ids = {}
+    page_idx = array('i')
+    index = array('i')
+    type_column = array('i')
+    bbox = array('f')
+    offsets = array('I', [0])
+    text_parts = []
+    text_len = 0
+    for block in block_list:
+        page_idx.append(int(block.get('page_idx', 0)))
+        index.append(int(block.get('index') or 0))
+        type_key = f"{block.get('type', 'unknown')}\t{block.get('source_mode', '')}"
+        type_column.append(type_ids.setdefault(type_key, len(type_ids)))
+        x0, y0, x1, y1 = (list(block.get('bbox') or []) + [0, 0, 0, 0])[:4]
+        bbox.extend((x0, y0, x1, y1))
+        encoded = (block.get('text') or '').encode('utf-8')
+        text_parts.append(encoded)
+        text_len += len(encoded)
+        offsets.append(text_len)
+
+    type_table = _pad4("\0".join(type_ids).encode('utf-8'))
+    header = _HEADER.pack(BLOCK_STORE_MAGIC, BLOCK_STORE_VERSION, len(block_list), len(type_ids),
+                          len(type_table), text_len)
+    # array 按本机字节序写出，文件格式约定为小端
+    columns = [page_idx, index, type_column, bbox, offsets]
+    if array('i', [1]).tobytes()[0] != 1:
+        for column in columns:
+            column.byteswap()
+
+    part_path = f"{path}.part"
+    with open(part_path, 'wb') as f:
+        f.write(header)
+        for column in columns:
+            column.tofile(f)
+        f.write(type_table)
+        for encoded in text_parts:
+            f.write(encoded)
+    os.replace(part_path, path)
+    return os.path.getsize(path)
+
+
+class BlockStore:
+    """
+    通过 mmap 只读访问块存储文件
+
+    支持 len() 和按下标取块（返回与 extract_blocks 相同结构的 dict），
+    可直接作为 BlockMatcher 的 block_list 使用。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, type_count, type_table_len, text_len = _HEADER.unpack_from(self._mmap, 0)
+        if magic != BLOCK_STORE_MAGIC or version != BLOCK_STORE_VERSION:
+            self._mmap.close()
+            raise ValueError(f"不是有效的块存储文件: {path}")
+        if array('i', [1]).tobytes()[0] != 1:
+            self._mmap.close()
+            raise ValueError("块存储文件仅支持小端平台直接映射")
+
+        self._count = count
+        self._view = view = memoryview(self._mmap)
+        pos = _HEADER.size
+
+        def column(fmt: str, length: int) -> memoryview:
+            nonlocal pos
+            data = view[pos:pos + 4 * length].cast(fmt)
+            pos += 4 * length
+            return data
+
+        self._page_idx = column('i', count)
+        self._index = column('i', count)
+        self._type_ids = column('i', count)
+        self._bbox = column('f', count * 4)
+        self._offsets = column('I', count + 1)
+        type_names = bytes(view[pos:pos + type_table_len]).rstrip(b"\0").decode('utf-8')
+        self._types = [name.split("\t", 1) for name in type_names.split("\0")] if type_count else []
+        pos += type_table_len
+        self._text = view[pos:pos + text_len]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def text(self, i: int) -> str:
+        return str(self._text[self._offsets[i]:self._offsets[i + 1]], 'utf-8')
+
+    def bbox(self, i: int) -> List[float]:
+        return list(self._bbox[4 * i:4 * i + 4])
+
+    def page_idx(self, i: int) -> int:
+        return self._page_idx[i]
+
+    def texts(self) -> List[str]:
+        """所有块的文本（一次性解码整个文本区后切分）"""
+        data = bytes(self._text)
+        offsets = self._offsets
+        return [data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(self._count)]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if not -self._count <= i < self._count:
+            raise IndexError(i)
+        i %= self._count
+        block_type, source_mode = self._types[self._type_ids[i]]
+        return {
+            'bbox': self.bbox(i),
+            'type': block_type,
+            'text': self.text(i),
+            'page_idx': self._page_idx[i],
+            'index': self._index[i],
+            'source_mode': source_mode,
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(self._count):
+            yield self[i]
+
+    def close(self):
+        """释放 mmap（之后不能再访问块数据）"""
+        for view in (self._page_idx, self._index, self._type_ids, self._bbox, self._offsets, self._text,
+                     self._view):
+            view.release()
+        self._mmap.close()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MinerU 服务端点池
+
+多个 MinerU 服务实例时在客户端做负载均衡：每次请求选择未被摘除、且未达到并发上限的端点中
+进行中请求最少的一个；端点的健康状态由 HealthState 维护，连续失败后摘除，恢复后自动加回。
+"""
+
+import collections
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .health_state import HealthState
+
+# 统计近期吞吐量的时间窗口（秒）
+THROUGHPUT_WINDOW = 300
+# 所有端点都达到并发上限时，重新检查的间隔（秒）
+ACQUIRE_POLL_INTERVAL = 1.0
+# MinerU 服务错误响应中标识错误类型的响应头
+ERROR_CODE_HEADER = "X-Error-Code"
+# MinerU 服务正常、但其依赖的 SGLang 服务不可用，不计入端点的健康状态
+ERROR_SGLANG_UNAVAILABLE = "sglang_unavailable"
+
+
+class EndpointUnavailableError(Exception):
+    """端点暂时无法处理请求（服务繁忙、网关错误或其依赖的 SGLang 不可用），可以换其他端点重试"""
+
+    def __init__(self, base_url: str, status_code: int, message: str = "", error_code: Optional[str] = None):
+        super().__init__(f"{base_url} 返回 {status_code}: {message}")
+        self.base_url = base_url
+        self.status_code = status_code
+        self.error_code = error_code
+
+    @property
+    def upstream_unavailable(self) -> bool:
+        """是否是端点依赖的上游服务（SGLang）不可用，端点本身正常"""
+        return self.error_code == ERROR_SGLANG_UNAVAILABLE
+
+
+class MinerUEndpoint:
+    """单个 MinerU 服务端点：并发上限、健康状态和请求统计"""
+
+    def __init__(self, base_url: str, max_concurrency: int, probe: Callable[[str], bool]):
+        self.base_url = base_url.rstrip('/')
+        self.max_concurrency = max(1, max_concurrency)
+        self.health = HealthState(f"MinerU 服务 {self.base_url}", lambda: probe(self.base_url))
+        self.outstanding = 0
+        self._lock = threading.Lock()
+        self._succeeded = 0
+        self._failed = 0
+        self._total_latency = 0.0
+        self._recent = collections.deque()
+
+    def record(self, ok: bool, latency: float):
+        """记录一次请求的结果和耗时"""
+        now = time.time()
+        with self._lock:
+            if ok:
+                self._succeeded += 1
+                self._total_latency += latency
+                self._recent.append(now)
+            else:
+                self._failed += 1
+            while self._recent and now - self._recent[0] > THROUGHPUT_WINDOW:
+                self._recent.popleft()
+
+    def stats(self) -> Dict:
+        now = time.time()
+        with self._lock:
+            while self._recent and now - self._recent[0] > THROUGHPUT_WINDOW:
+                self._recent.popleft()
+            succeeded = self._succeeded
+            return {
+                'url': self.base_url,
+                'healthy': self.health.snapshot()['healthy'],
+                'outstanding': self.outstanding,
+                'max_concurrency': self.max_concurrency,
+                'succeeded': succeeded,
+                'failed': self._failed,
+                'avg_latency_seconds': round(self._total_latency / succeeded, 2) if succeeded else None,
+                'recent_docs_per_minute': round(len(self._recent) * 60 / THROUGHPUT_WINDOW, 2),
+            }
+
+
+class EndpointPool:
+    """按最少进行中请求选择端点，端点达到并发上限时排队等待"""
+
+    def __init__(self, base_urls: Iterable[str], max_concurrency: int, probe: Callable[[str], bool]):
+        self.endpoints: List[MinerUEndpoint] = [
+            MinerUEndpoint(url, max_concurrency, probe) for url in base_urls
+        ]
+        if not self.endpoints:
+            raise ValueError("至少需要配置一个 MinerU 服务地址")
+        self._cond = threading.Condition()
+
+    def acquire(self, exclude: Iterable[MinerUEndpoint] = (),
+                cancel_event: Optional[threading.Event] = None,
+                deadline: Optional[float] = None) -> Optional[MinerUEndpoint]:
+        """
+        选择一个端点并占用一个并发名额，用完后必须调用 release
+
+        Returns:
+            MinerUEndpoint: 选中的端点；除 exclude 外没有其他端点时返回 None
+
+        Raises:
+            Exception: 其余端点均已被摘除、等待超时或被取消
+        """
+        exclude = set(exclude)
+        with self._cond:
+            while True:
+                candidates = [ep for ep in self.endpoints if ep not in exclude]
+                if not candidates:
+                    return None
+                available = [ep for ep in candidates if not ep.health.is_marked_unhealthy()]
+                if not available:
+                    raise Exception("没有可用的 MinerU 服务: " + ", ".join(ep.base_url for ep in candidates))
+                free = [ep for ep in available if ep.outstanding < ep.max_concurrency]
+                if free:
+                    endpoint = min(free, key=lambda ep: ep.outstanding)
+                    endpoint.outstanding += 1
+                    return endpoint
+                if cancel_event is not None and cancel_event.is_set():
+                    raise Exception("已放弃等待 MinerU 服务")
+                if deadline is not None and time.time() > deadline:
+                    raise Exception("等待 MinerU 服务空闲超时")
+                self._cond.wait(ACQUIRE_POLL_INTERVAL)
+
+    def release(self, endpoint: MinerUEndpoint):
+        with self._cond:
+            endpoint.outstanding -= 1
+            self._cond.notify()
+
+    def any_healthy(self) -> bool:
+        """是否至少有一个端点可用（状态过期的端点会探测一次）"""
+        return any(ep.health.is_healthy() for ep in self.endpoints)
+
+    def stats(self) -> List[Dict]:
+        return [ep.stats() for ep in self.endpoints]
@@ -7,14 +7,23 @@ MinerU FastAPI 适配器
 """
 
 import os
+import shutil
 import tempfile
+import threading
+import time
+import zipfile
 import requests
-import json
-from typing import Optional, Callable, Dict, Any
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
+from typing import Optional, Callable, Dict, Any, List, Tuple
 from loguru import logger
 
 # 导入文档转换功能
 from .file_converter import ensure_pdf
+from .pdf_sharding import PDFIUM_AVAILABLE, count_pdf_pages, plan_page_ranges, split_pdf, merge_shard_results
+from .endpoint_pool import (EndpointPool, EndpointUnavailableError, MinerUEndpoint, ERROR_CODE_HEADER,
+                            ERROR_SGLANG_UNAVAILABLE)
+from .result_stream import parse_result_file, parse_result_stream
 
 # 导入统一配置系统
 try:
@@ -29,6 +38,77 @@ except ImportError:
         logger.warning("无法导入统一配置系统，将使用环境变量作为备用")
 
 
+# 流式接收响应时每次读取的字节数
+RESPONSE_CHUNK_SIZE = 1024 * 1024
+# 异步任务模式：单次长轮询的等待时间（秒）和允许连续失败的轮询次数
+JOB_POLL_WAIT = 30
+JOB_POLL_MAX_FAILURES = 5
+
+# MinerU 解析期间对应的文档进度区间
+MINERU_PROGRESS_RANGE = (0.3, 0.8)
+# 各解析阶段在 MinerU 进度区间内的占比，analyzing 阶段内按已分析页数推进
+MINERU_STAGE_RANGES = {
+    'loading': (0.0, 0.05, "加载文档"),
+    'analyzing': (0.05, 0.85, "分析页面"),
+    'building': (0.85, 0.95, "生成结果"),
+    'packaging': (0.95, 1.0, "打包结果"),
+}
+# 分片解析时汇总各分片进度的间隔（秒）
+SHARD_PROGRESS_INTERVAL = 1.0
+# 视为服务不可用的响应状态码，计入健康状态的连续失败次数
+UNAVAILABLE_STATUS_CODES = (502, 503, 504)
+# 可以换其他端点重试的响应状态码（任务队列已满或服务不可用）
+RETRYABLE_STATUS_CODES = (429,) + UNAVAILABLE_STATUS_CODES
+
+
+class _ShardProgress:
+    """汇总各分片的任务状态，换算为整个文档的已分析页数"""
+
+    def __init__(self, page_ranges: List[Tuple[int, int]]):
+        self._pages = [end - start for start, end in page_ranges]
+        self._statuses = [None] * len(page_ranges)
+        self._lock = threading.Lock()
+
+    def update(self, index: int, status: Dict[str, Any]):
+        with self._lock:
+            self._statuses[index] = status
+
+    def combined(self) -> Dict[str, Any]:
+        with self._lock:
+            statuses = list(self._statuses)
+        if all(status is None or status['status'] == 'queued' for status in statuses):
+            return {'status': 'queued'}
+        pages_done = 0
+        for pages, status in zip(self._pages, statuses):
+            if status is None:
+                continue
+            if status['status'] == 'done' or status.get('stage') in ('building', 'packaging'):
+                pages_done += pages
+            elif status.get('stage') == 'analyzing':
+                pages_done += min(status.get('pages_done') or 0, pages)
+        return {'status': 'running', 'stage': 'analyzing', 'pages_done': pages_done, 'pages_total': sum(self._pages)}
+
+
+class _RemoteJobs:
+    """记录分片提交的、尚未结束的服务端任务，文档取消时由调用线程直接删除"""
+
+    def __init__(self):
+        self._jobs: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def add(self, base_url: str, job_id: str):
+        with self._lock:
+            self._jobs[job_id] = base_url
+
+    def discard(self, job_id: Optional[str]):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def snapshot(self) -> List[Tuple[str, str]]:
+        with self._lock:
+            return [(base_url, job_id) for job_id, base_url in self._jobs.items()]
+
+
 class MinerUFastAPIAdapter:
     """MinerU FastAPI 适配器 - 统一配置管理版本"""
     
@@ -42,7 +122,14 @@ class MinerUFastAPIAdapter:
                  parse_method: str = "auto",
                  lang: str = "ch",
                  formula_enable: bool = True,
-                 table_enable: bool = True):
+                 table_enable: bool = True,
+                 image_transport: str = "zip",
+                 request_mode: str = "async",
+                 shard_pages: int = 0,
+                 shard_min_pages: int = 0,
+                 shard_concurrency: int = 1,
+                 endpoint_max_concurrency: int = 4,
+                 request_retries: int = 1):
         """
         初始化适配器 - 统一配置管理
         
@@ -55,8 +142,18 @@ class MinerUFastAPIAdapter:
             lang: 语言设置（pipeline 后端）
             formula_enable: 公式解析开关（pipeline 后端）
             table_enable: 表格解析开关（pipeline 后端）
+            image_transport: 图片传输方式，zip（二进制打包流式返回）、base64（嵌入 JSON）
+                或 minio（MinerU 服务直接写入知识库存储桶，只返回对象 key）
+            request_mode: 请求方式，async（提交任务后长轮询状态，再下载结果）或 sync（单个同步请求）
+            shard_pages: 大 PDF 分片解析时每个分片的页数，0 表示不分片
+            shard_min_pages: 页数超过该值的 PDF 才分片解析
+            shard_concurrency: 同一文档同时解析的分片数
+            endpoint_max_concurrency: 每个 MinerU 服务端点同时处理的请求数上限
+            request_retries: 请求因连接失败或服务繁忙失败时，换其他端点重试的次数
         """
-        self.base_url = base_url.rstrip('/')
+        # base_url 可以是逗号分隔的多个 MinerU 服务地址，请求在它们之间负载均衡
+        base_urls = [url.strip().rstrip('/') for url in base_url.split(',') if url.strip()]
+        self.base_url = base_urls[0]
         self.backend = backend
         self.timeout = timeout
         
@@ -68,42 +165,74 @@ class MinerUFastAPIAdapter:
         self.lang = lang
         self.formula_enable = formula_enable
         self.table_enable = table_enable
+        self.image_transport = image_transport
+        self.request_mode = request_mode
+        self.shard_pages = shard_pages
+        self.shard_min_pages = shard_min_pages
+        self.shard_concurrency = max(1, shard_concurrency)
+        self.endpoint_max_concurrency = max(1, endpoint_max_concurrency)
+        self.request_retries = max(0, request_retries)
         
         self.session = requests.Session()
+        # 各端点的健康状态由真实请求结果维护，不再在每个文档前探测
+        self.pool = EndpointPool(base_urls, self.endpoint_max_concurrency, self._probe_server)
         
-        logger.info(f"MinerU FastAPI适配器已初始化: URL={self.base_url}, Backend={self.backend}")
+        logger.info(f"MinerU FastAPI适配器已初始化: URL={', '.join(base_urls)}, Backend={self.backend}")
         logger.info(f"VLM配置: server_url={self.server_url}")
         logger.info(f"Pipeline配置: parse_method={self.parse_method}, lang={self.lang}, formula_enable={self.formula_enable}, table_enable={self.table_enable}")
         
+    def _probe_server(self, base_url: str) -> bool:
+        """主动探测 FastAPI 服务器是否可访问"""
+        response = self.session.get(f"{base_url}/docs", timeout=10)
+        return response.status_code == 200
+
     def _check_server_health(self) -> bool:
-        """检查 FastAPI 服务器是否可访问"""
-        try:
-            response = self.session.get(f"{self.base_url}/docs", timeout=10)
-            return response.status_code == 200
-        except Exception as e:
-            logger.error(f"FastAPI 服务器不可访问: {e}")
-            return False
-    
-    def _prepare_request_data(self, 
+        """检查是否至少有一个 FastAPI 服务器可用（使用缓存的健康状态，过期时才探测）"""
+        return self.pool.any_healthy()
+
+    def get_endpoint_stats(self) -> List[Dict[str, Any]]:
+        """各 MinerU 服务端点的健康状态、进行中请求数、耗时和吞吐量"""
+        return self.pool.stats()
+
+    def cache_params(self) -> Dict[str, Any]:
+        """影响解析结果的参数，作为解析结果缓存键的一部分"""
+        return {
+            'backend': self.backend,
+            'parse_method': self.parse_method,
+            'lang': self.lang,
+            'formula_enable': self.formula_enable,
+            'table_enable': self.table_enable,
+        }
+
+    def _prepare_request_data(self,
                              backend: str = None,
                              parse_method: str = None,
                              lang: str = None, 
                              formula_enable: bool = None,
                              table_enable: bool = None,
                              server_url: Optional[str] = None,
+                             image_bucket: Optional[str] = None,
                              **kwargs) -> Dict[str, Any]:
         """准备请求数据 - 使用适配器配置作为默认值"""
         backend = backend or self.backend
         
         data = {
             'backend': backend,
-            'return_content_list': True,  # 总是返回内容列表
+            'return_content_list': False,  # 客户端不使用内容列表，服务端无需生成
             'return_info': True,         # 默认返回解析信息（用于位置信息）
+            'info_format': 'positions',  # 只需块的 bbox、页码和文本；旧版服务忽略该参数并返回完整 middle_json
             'return_layout': False,      # 默认不返回布局
             'return_images': True,       # 获取原始图片数据
             'is_json_md_dump': False,    # 默认不保存文件到服务器
             'output_dir': 'output'  # 临时输出目录
         }
+        if self.image_transport in ('zip', 'minio'):
+            # 结果与原始图片打包为 zip 返回，旧版服务会忽略该参数并返回 JSON
+            data['response_format'] = 'zip'
+        if self.image_transport == 'minio' and image_bucket:
+            # 图片由 MinerU 服务直接写入存储桶，响应中只返回对象 key；
+            # 不支持该参数的旧版服务仍会随响应返回图片
+            data['image_bucket'] = image_bucket
         
         # 添加特定后端参数，优先使用传入参数，否则使用适配器配置
         if backend == 'vlm-sglang-client':
@@ -127,10 +256,335 @@ class MinerUFastAPIAdapter:
         data.update(kwargs)
         return data
     
+    def _read_zip_response(self, response, temp_dir: str, images_dir: Optional[str]) -> Dict[str, Any]:
+        """
+        将 zip 响应流式写入磁盘，流式解析 result.json，并把图片逐个解压到 images_dir
+
+        图片不经过内存中的完整 payload，也不需要 base64 解码。未指定 images_dir 而响应中有图片时，
+        解压到新建的临时目录（不在 temp_dir 中，不随请求结束删除），由调用方通过结果中的 images_dir 使用和清理。
+        """
+        zip_path = os.path.join(temp_dir, "result.zip")
+        with open(zip_path, 'wb') as f:
+            for chunk in response.iter_content(RESPONSE_CHUNK_SIZE):
+                f.write(chunk)
+
+        image_count = 0
+        with zipfile.ZipFile(zip_path) as zf:
+            with zf.open("result.json") as f:
+                result = parse_result_file(f)
+            image_members = [member for member in zf.infolist()
+                             if not member.is_dir() and member.filename.startswith("images/")]
+            if image_members:
+                if images_dir:
+                    os.makedirs(images_dir, exist_ok=True)
+                else:
+                    images_dir = tempfile.mkdtemp(prefix="mineru_images_")
+            for member in image_members:
+                # 只取文件名，防止路径穿越
+                target_path = os.path.join(images_dir, os.path.basename(member.filename))
+                with zf.open(member) as src, open(target_path, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, RESPONSE_CHUNK_SIZE)
+                image_count += 1
+
+        result['images_dir'] = images_dir
+        result['image_count'] = image_count
+        logger.info(f"已从 zip 响应解压 {image_count} 张图片到 {images_dir}")
+        return result
+
+    def _post_file_parse(self, base_url: str, pdf_path: str, data: Dict[str, Any]):
+        """同步调用 /file_parse，返回流式响应"""
+        with open(pdf_path, 'rb') as f:
+            return self.session.post(
+                f"{base_url}/file_parse",
+                files={'file': f},
+                data=data,
+                timeout=self.timeout,
+                stream=True
+            )
+
+    @staticmethod
+    def _report_job_progress(status: Dict[str, Any], update_progress: Optional[Callable]):
+        """把任务状态中的阶段和页数映射为文档进度"""
+        if not update_progress:
+            return
+        start, end = MINERU_PROGRESS_RANGE
+        if status['status'] == 'queued':
+            update_progress(start, "MinerU 排队中")
+            return
+        stage_range = MINERU_STAGE_RANGES.get(status.get('stage'))
+        if status['status'] != 'running' or stage_range is None:
+            return
+        stage_start, stage_end, label = stage_range
+        pages_done = status.get('pages_done') or 0
+        pages_total = status.get('pages_total') or 0
+        fraction = stage_start
+        if pages_total:
+            fraction += (stage_end - stage_start) * min(pages_done, pages_total) / pages_total
+            label = f"{label} {pages_done}/{pages_total} 页"
+        update_progress(start + (end - start) * fraction, f"MinerU {label}")
+
+    def _submit_and_wait(self, base_url: str, pdf_path: str, data: Dict[str, Any],
+                         on_status: Optional[Callable] = None,
+                         cancel_event: Optional[threading.Event] = None,
+                         remote_jobs: Optional[_RemoteJobs] = None):
+        """
+        向 base_url 提交异步任务并长轮询直到完成，返回 (结果响应, 任务ID)
+
+        任务状态变化时调用 on_status(status)；cancel_event 被设置时放弃等待。提交成功的任务记录到
+        remote_jobs，取消时由调用方删除。轮询期间的网络抖动只会重试，不会丢失服务端正在进行的推理；
+        服务不支持任务接口时回退为同步请求，此时任务ID为 None。
+        """
+        with open(pdf_path, 'rb') as f:
+            response = self.session.post(
+                f"{base_url}/jobs",
+                files={'file': f},
+                data=data,
+                timeout=self.timeout
+            )
+        if response.status_code in (404, 405):
+            logger.info("MinerU 服务不支持任务接口，回退为同步请求")
+            return self._post_file_parse(base_url, pdf_path, data), None
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            raise EndpointUnavailableError(base_url, response.status_code, response.text,
+                                           response.headers.get(ERROR_CODE_HEADER))
+        if response.status_code != 202:
+            raise Exception(f"提交 MinerU 任务失败: {response.status_code} - {response.text}")
+
+        job_id = response.json()['job_id']
+        logger.info(f"已提交 MinerU 任务: {job_id}")
+        if remote_jobs is not None:
+            remote_jobs.add(base_url, job_id)
+        deadline = time.time() + self.timeout
+        failures = 0
+        last_progress = None
+        try:
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise Exception(f"已放弃等待 MinerU 任务: {job_id}")
+                if time.time() > deadline:
+                    raise requests.exceptions.Timeout(f"MinerU 任务 {job_id} 未在 {self.timeout} 秒内完成")
+                try:
+                    status_response = self.session.get(
+                        f"{base_url}/jobs/{job_id}",
+                        params={'wait': JOB_POLL_WAIT},
+                        timeout=JOB_POLL_WAIT + 30
+                    )
+                except requests.exceptions.RequestException as e:
+                    failures += 1
+                    if failures > JOB_POLL_MAX_FAILURES:
+                        raise
+                    logger.warning(f"查询 MinerU 任务状态失败（第 {failures} 次），稍后重试: {e}")
+                    delay = min(2 ** failures, 30)
+                    if cancel_event is not None:
+                        cancel_event.wait(delay)
+                    else:
+                        time.sleep(delay)
+                    continue
+                failures = 0
+
+                if status_response.status_code == 404:
+                    raise Exception(f"MinerU 任务不存在或已过期: {job_id}")
+                status = status_response.json()
+                progress_key = (status['status'], status.get('stage'), status.get('pages_done'))
+                if progress_key != last_progress:
+                    last_progress = progress_key
+                    if on_status:
+                        on_status(status)
+                if status['status'] == 'done':
+                    break
+                if status['status'] in ('failed', 'cancelled'):
+                    raise Exception(f"MinerU 任务失败: {status.get('error') or status['status']}")
+
+            return self.session.get(
+                f"{base_url}/jobs/{job_id}/result",
+                timeout=self.timeout,
+                stream=True
+            ), job_id
+        except Exception:
+            # 放弃等待时取消服务端任务，排队中的任务不再占用推理资源
+            self._delete_job(base_url, job_id)
+            if remote_jobs is not None:
+                remote_jobs.discard(job_id)
+            raise
+
+    def _delete_job(self, base_url: str, job_id: Optional[str]):
+        """删除服务端任务及其结果（尽力而为，失败时由服务端按保留时长清理）"""
+        if not job_id:
+            return
+        try:
+            self.session.delete(f"{base_url}/jobs/{job_id}", timeout=10)
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"删除 MinerU 任务失败: {job_id}, 错误: {e}")
+
+    def _run_request(self, pdf_path: str, data: Dict[str, Any], temp_dir: str, images_dir: Optional[str],
+                     on_status: Optional[Callable] = None,
+                     cancel_event: Optional[threading.Event] = None,
+                     remote_jobs: Optional[_RemoteJobs] = None) -> Dict[str, Any]:
+        """
+        选择一个 MinerU 端点发送解析请求并读取结果
+
+        端点按进行中请求数最少选择；连接失败、读取超时或服务繁忙（429/502/503/504）时
+        换一个未尝试过的端点重试，最多重试 request_retries 次。
+        """
+        deadline = time.time() + self.timeout
+        tried = []
+        last_error = None
+        for _ in range(self.request_retries + 1):
+            endpoint = self.pool.acquire(exclude=tried, cancel_event=cancel_event, deadline=deadline)
+            if endpoint is None:
+                break
+            tried.append(endpoint)
+            start_time = time.time()
+            try:
+                result = self._request_endpoint(endpoint, pdf_path, data, temp_dir, images_dir,
+                                                on_status, cancel_event, remote_jobs)
+                endpoint.record(True, time.time() - start_time)
+                return result
+            except (requests.exceptions.ConnectionError, requests.exceptions.ReadTimeout,
+                    EndpointUnavailableError) as e:
+                endpoint.record(False, time.time() - start_time)
+                last_error = e
+                logger.warning(f"MinerU 服务 {endpoint.base_url} 请求失败，尝试其他节点: {e}")
+            except Exception:
+                endpoint.record(False, time.time() - start_time)
+                raise
+            finally:
+                self.pool.release(endpoint)
+        raise last_error
+
+    def _request_endpoint(self, endpoint: MinerUEndpoint, pdf_path: str, data: Dict[str, Any],
+                          temp_dir: str, images_dir: Optional[str],
+                          on_status: Optional[Callable] = None,
+                          cancel_event: Optional[threading.Event] = None,
+                          remote_jobs: Optional[_RemoteJobs] = None) -> Dict[str, Any]:
+        """向指定端点发送一次解析请求（异步任务或同步请求）并读取结果"""
+        base_url = endpoint.base_url
+        # 异步模式下提交任务并轮询，长文档不再占用一个长连接
+        job_id = None
+        try:
+            if self.request_mode == 'async':
+                response, job_id = self._submit_and_wait(base_url, pdf_path, data, on_status, cancel_event,
+                                                         remote_jobs)
+            else:
+                response = self._post_file_parse(base_url, pdf_path, data)
+        except (requests.exceptions.ConnectionError, requests.exceptions.ReadTimeout) as e:
+            # 连接失败或读取超时说明服务可能不可用；等待任务超过总超时等错误与服务健康无关
+            endpoint.health.record_failure(e)
+            raise
+        except EndpointUnavailableError as e:
+            # SGLang 不可用时 MinerU 服务本身正常，不摘除该端点
+            if e.status_code in UNAVAILABLE_STATUS_CODES and not e.upstream_unavailable:
+                endpoint.health.record_failure(e)
+            raise
+
+        # 无论结果读取成功与否都删除服务端任务，失败的任务不在服务端堆积
+        try:
+            error_code = response.headers.get(ERROR_CODE_HEADER)
+            if response.status_code in UNAVAILABLE_STATUS_CODES and error_code != ERROR_SGLANG_UNAVAILABLE:
+                endpoint.health.record_failure(Exception(f"HTTP {response.status_code}"))
+            else:
+                endpoint.health.record_success()
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                raise EndpointUnavailableError(base_url, response.status_code, response.text, error_code)
+
+            if response.status_code != 200:
+                error_msg = f"FastAPI 请求失败: {response.status_code} - {response.text}"
+                logger.error(error_msg)
+                raise Exception(error_msg)
+
+            if response.headers.get('Content-Type', '').startswith('application/zip'):
+                return self._read_zip_response(response, temp_dir, images_dir)
+            # 边接收边解析，info（middle_json）逐页提取块信息，不在内存中构建完整对象
+            return parse_result_stream(response.iter_content(RESPONSE_CHUNK_SIZE))
+        finally:
+            response.close()
+            self._delete_job(base_url, job_id)
+            if remote_jobs is not None:
+                remote_jobs.discard(job_id)
+
+    def _plan_shards(self, pdf_path: str) -> Optional[List[Tuple[int, int]]]:
+        """页数超过阈值时返回分片页码区间，否则返回 None"""
+        if self.shard_pages <= 0 or not PDFIUM_AVAILABLE:
+            return None
+        try:
+            total_pages = count_pdf_pages(pdf_path)
+        except Exception as e:
+            logger.warning(f"读取 PDF 页数失败，不分片解析: {e}")
+            return None
+        if total_pages <= max(self.shard_min_pages, self.shard_pages):
+            return None
+        return plan_page_ranges(total_pages, self.shard_pages)
+
+    def _process_shards(self, pdf_path: str, page_ranges: List[Tuple[int, int]], data: Dict[str, Any],
+                        temp_dir: str, images_dir: Optional[str],
+                        update_progress: Optional[Callable] = None) -> Dict[str, Any]:
+        """
+        把 PDF 按页码区间拆分后并行解析，再按页码顺序合并结果
+
+        分片在工作线程中请求；进度汇总和 update_progress 调用留在当前线程，
+        以便 update_progress 中的取消检查作用于当前解析任务。
+        """
+        shard_paths = split_pdf(pdf_path, page_ranges, temp_dir)
+        logger.info(f"PDF 共 {page_ranges[-1][1]} 页，拆分为 {len(shard_paths)} 个分片并行解析")
+
+        # 未指定图片目录时各分片共用一个临时目录，合并结果只保留一个 images_dir
+        own_images_dir = images_dir is None
+        if own_images_dir:
+            images_dir = tempfile.mkdtemp(prefix="mineru_images_")
+
+        progress = _ShardProgress(page_ranges)
+        cancel_event = threading.Event()
+        remote_jobs = _RemoteJobs()
+        results = [None] * len(shard_paths)
+        executor = ThreadPoolExecutor(max_workers=min(self.shard_concurrency, len(shard_paths)),
+                                      thread_name_prefix="mineru-shard")
+        try:
+            futures = {}
+            for index, shard_path in enumerate(shard_paths):
+                shard_temp_dir = os.path.join(temp_dir, f"shard_{index}")
+                os.makedirs(shard_temp_dir, exist_ok=True)
+                future = executor.submit(
+                    self._run_request, shard_path, data, shard_temp_dir, images_dir,
+                    partial(progress.update, index), cancel_event, remote_jobs
+                )
+                futures[future] = index
+
+            pending = set(futures)
+            last_status = None
+            while pending:
+                done, pending = wait(pending, timeout=SHARD_PROGRESS_INTERVAL)
+                for future in done:
+                    results[futures[future]] = future.result()
+                    progress.update(futures[future], {'status': 'done'})
+                status = progress.combined()
+                if status != last_status:
+                    last_status = status
+                    self._report_job_progress(status, update_progress)
+        except BaseException:
+            # 任一分片失败或文档被取消时，其余分片放弃等待，服务端任务直接删除，不等分片线程察觉
+            cancel_event.set()
+            for base_url, job_id in remote_jobs.snapshot():
+                self._delete_job(base_url, job_id)
+            if own_images_dir:
+                shutil.rmtree(images_dir, ignore_errors=True)
+            raise
+        finally:
+            # 不等待仍在运行的分片线程，它们在下一次检查 cancel_event 时退出
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        merged = merge_shard_results(results, page_ranges)
+        if own_images_dir and not os.listdir(images_dir):
+            os.rmdir(images_dir)
+            merged.pop('images_dir', None)
+            merged.pop('image_count', None)
+        return merged
+
     def process_file(self,
                     file_path: str,
                     update_progress: Optional[Callable] = None,
                     backend: str = None,
+                    images_dir: Optional[str] = None,
+                    image_bucket: Optional[str] = None,
                     **kwargs) -> Dict[str, Any]:
         """
         处理文件的主要接口 - 简化版本，自动使用适配器配置
@@ -139,6 +593,11 @@ class MinerUFastAPIAdapter:
             file_path: 文件路径（支持PDF、Office文档、URL等）
             update_progress: 进度回调函数
             backend: 指定后端类型（可选，覆盖适配器默认值）
+            images_dir: 图片保存目录；服务返回 zip 时图片直接解压到该目录，
+                结果中的 images_dir 字段指向该目录，images 字段不再包含 base64 数据。
+                未指定时图片解压到新建的临时目录，由调用方根据结果中的 images_dir 清理
+            image_bucket: 图片存储桶；image_transport 为 minio 时图片由服务直接写入该桶，
+                结果中的 image_keys 字段为已写入的对象 key
             **kwargs: 其他参数（可选，覆盖适配器配置）
             
         Returns:
@@ -184,44 +643,39 @@ class MinerUFastAPIAdapter:
                     update_progress(0.25, "PDF文件检查完成")
             
             # 准备请求数据（自动使用适配器配置）
-            data = self._prepare_request_data(backend=backend, **kwargs)
+            data = self._prepare_request_data(backend=backend, image_bucket=image_bucket, **kwargs)
             
             if update_progress:
                 update_progress(0.3, f"开始 {data['backend']} 后端处理")
                 
-            # 发送请求
-            with open(pdf_to_process, 'rb') as f:
-                files = {'file': f}
-                response = self.session.post(
-                    f"{self.base_url}/file_parse",
-                    files=files,
-                    data=data,
-                    timeout=self.timeout
+            # 大 PDF 按页码区间拆分后并行解析，其余文档单次请求
+            page_ranges = self._plan_shards(pdf_to_process)
+            if page_ranges:
+                result = self._process_shards(pdf_to_process, page_ranges, data, temp_dir, images_dir,
+                                              update_progress)
+            else:
+                result = self._run_request(
+                    pdf_to_process, data, temp_dir, images_dir,
+                    on_status=lambda status: self._report_job_progress(status, update_progress)
                 )
                 
-            if response.status_code == 200:
-                result = response.json()
+            if update_progress:
+                update_progress(0.8, "FastAPI 处理完成")
                 
-                if update_progress:
-                    update_progress(0.8, "FastAPI 处理完成")
-                    
-                # 添加处理信息
-                result['_adapter_info'] = {
-                    'backend_used': result.get('backend', data['backend']),
-                    'file_processed': os.path.basename(file_path),
-                    'converted_from': os.path.basename(file_path) if temp_pdf_to_delete else None,
-                    'adapter_version': '2.2.0',  # 更新版本号
-                    'processing_mode': 'fastapi_with_document_conversion'
-                }
+            # 添加处理信息
+            result['_adapter_info'] = {
+                'backend_used': result.get('backend', data['backend']),
+                'file_processed': os.path.basename(file_path),
+                'converted_from': os.path.basename(file_path) if temp_pdf_to_delete else None,
+                'shards': len(page_ranges) if page_ranges else 1,
+                'adapter_version': '2.2.0',  # 更新版本号
+                'processing_mode': 'fastapi_with_document_conversion'
+            }
+            
+            if update_progress:
+                update_progress(1.0, "处理完成")
                 
-                if update_progress:
-                    update_progress(1.0, "处理完成")
-                    
-                return result
-            else:
-                error_msg = f"FastAPI 请求失败: {response.status_code} - {response.text}"
-                logger.error(error_msg)
-                raise Exception(error_msg)
+            return result
                 
         except requests.exceptions.Timeout:
             error_msg = f"FastAPI 请求超时 ({self.timeout}秒)"
@@ -242,7 +696,6 @@ class MinerUFastAPIAdapter:
             
             # 清理临时目录
             try:
-                import shutil
                 if os.path.exists(temp_dir):
                     shutil.rmtree(temp_dir)
                     logger.debug(f"已清理临时目录: {temp_dir}")
@@ -272,6 +725,13 @@ def get_global_adapter() -> MinerUFastAPIAdapter:
             lang = MINERU_CONFIG.pipeline.lang
             formula_enable = MINERU_CONFIG.pipeline.formula_enable
             table_enable = MINERU_CONFIG.pipeline.table_enable
+            image_transport = MINERU_CONFIG.fastapi.image_transport
+            request_mode = MINERU_CONFIG.fastapi.request_mode
+            shard_pages = MINERU_CONFIG.fastapi.shard_pages
+            shard_min_pages = MINERU_CONFIG.fastapi.shard_min_pages
+            shard_concurrency = MINERU_CONFIG.fastapi.shard_concurrency
+            endpoint_max_concurrency = MINERU_CONFIG.fastapi.endpoint_max_concurrency
+            request_retries = MINERU_CONFIG.fastapi.request_retries
             
             logger.info("从统一配置系统加载MinerU完整配置")
         else:
@@ -289,6 +749,13 @@ def get_global_adapter() -> MinerUFastAPIAdapter:
             lang = os.environ.get('MINERU_LANG', 'ch')
             formula_enable = os.environ.get('MINERU_FORMULA_ENABLE', 'true').lower() == 'true'
             table_enable = os.environ.get('MINERU_TABLE_ENABLE', 'true').lower() == 'true'
+            image_transport = os.environ.get('MINERU_IMAGE_TRANSPORT', 'zip')
+            request_mode = os.environ.get('MINERU_REQUEST_MODE', 'async')
+            shard_pages = int(os.environ.get('MINERU_SHARD_PAGES', '100'))
+            shard_min_pages = int(os.environ.get('MINERU_SHARD_MIN_PAGES', '200'))
+            shard_concurrency = int(os.environ.get('MINERU_SHARD_CONCURRENCY', '4'))
+            endpoint_max_concurrency = int(os.environ.get('MINERU_ENDPOINT_MAX_CONCURRENCY', '4'))
+            request_retries = int(os.environ.get('MINERU_REQUEST_RETRIES', '1'))
             
             logger.warning("统一配置系统不可用，从环境变量加载MinerU配置")
         
@@ -300,7 +767,14 @@ def get_global_adapter() -> MinerUFastAPIAdapter:
             parse_method=parse_method,
             lang=lang,
             formula_enable=formula_enable,
-            table_enable=table_enable
+            table_enable=table_enable,
+            image_transport=image_transport,
+            request_mode=request_mode,
+            shard_pages=shard_pages,
+            shard_min_pages=shard_min_pages,
+            shard_concurrency=shard_concurrency,
+            endpoint_max_concurrency=endpoint_max_concurrency,
+            request_retries=request_retries
         )
         
         logger.info("MinerU FastAPI适配器统一配置加载完成")
@@ -328,6 +802,13 @@ def configure_adapter(base_url: str = None,
         current_lang = MINERU_CONFIG.pipeline.lang
         current_formula_enable = MINERU_CONFIG.pipeline.formula_enable
         current_table_enable = MINERU_CONFIG.pipeline.table_enable
+        current_image_transport = MINERU_CONFIG.fastapi.image_transport
+        current_request_mode = MINERU_CONFIG.fastapi.request_mode
+        current_shard_pages = MINERU_CONFIG.fastapi.shard_pages
+        current_shard_min_pages = MINERU_CONFIG.fastapi.shard_min_pages
+        current_shard_concurrency = MINERU_CONFIG.fastapi.shard_concurrency
+        current_endpoint_max_concurrency = MINERU_CONFIG.fastapi.endpoint_max_concurrency
+        current_request_retries = MINERU_CONFIG.fastapi.request_retries
     else:
         # 环境变量备用
         current_url = os.environ.get('MINERU_FASTAPI_URL', 'http://localhost:8888')
@@ -339,6 +820,13 @@ def configure_adapter(base_url: str = None,
         current_lang = os.environ.get('MINERU_LANG', 'ch')
         current_formula_enable = os.environ.get('MINERU_FORMULA_ENABLE', 'true').lower() == 'true'
         current_table_enable = os.environ.get('MINERU_TABLE_ENABLE', 'true').lower() == 'true'
+        current_image_transport = os.environ.get('MINERU_IMAGE_TRANSPORT', 'zip')
+        current_request_mode = os.environ.get('MINERU_REQUEST_MODE', 'async')
+        current_shard_pages = int(os.environ.get('MINERU_SHARD_PAGES', '100'))
+        current_shard_min_pages = int(os.environ.get('MINERU_SHARD_MIN_PAGES', '200'))
+        current_shard_concurrency = int(os.environ.get('MINERU_SHARD_CONCURRENCY', '4'))
+        current_endpoint_max_concurrency = int(os.environ.get('MINERU_ENDPOINT_MAX_CONCURRENCY', '4'))
+        current_request_retries = int(os.environ.get('MINERU_REQUEST_RETRIES', '1'))
     
     _global_adapter = MinerUFastAPIAdapter(
         base_url=base_url or current_url,
@@ -348,7 +836,14 @@ def configure_adapter(base_url: str = None,
         parse_method=parse_method or current_parse_method,
         lang=lang or current_lang,
         formula_enable=formula_enable if formula_enable is not None else current_formula_enable,
-        table_enable=table_enable if table_enable is not None else current_table_enable
+        table_enable=table_enable if table_enable is not None else current_table_enable,
+        image_transport=current_image_transport,
+        request_mode=current_request_mode,
+        shard_pages=current_shard_pages,
+        shard_min_pages=current_shard_min_pages,
+        shard_concurrency=current_shard_concurrency,
+        endpoint_max_concurrency=current_endpoint_max_concurrency,
+        request_retries=current_request_retries
     )
     
     logger.info(f"FastAPI 适配器配置已更新 - 统一配置管理")
@@ -387,7 +882,15 @@ def get_adapter_config_info() -> Dict[str, Any]:
         'fastapi_config': {
             'base_url': adapter.base_url,
             'backend': adapter.backend,
-            'timeout': adapter.timeout
+            'timeout': adapter.timeout,
+            'image_transport': adapter.image_transport,
+            'request_mode': adapter.request_mode,
+            'shard_pages': adapter.shard_pages,
+            'shard_min_pages': adapter.shard_min_pages,
+            'shard_concurrency': adapter.shard_concurrency,
+            'endpoints': [endpoint.base_url for endpoint in adapter.pool.endpoints],
+            'endpoint_max_concurrency': adapter.endpoint_max_concurrency,
+            'request_retries': adapter.request_retries
         },
         'vlm_config': {
             'server_url': adapter.server_url
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MinerU 服务健康状态跟踪
+
+不再在每个文档解析前探测一次服务：真实请求的结果即为健康信号，成功时刷新状态，
+连续的连接失败达到阈值后标记为不可用。只有在状态过期且期间没有任何请求时才同步探测一次；
+标记为不可用后由后台线程定期探测，恢复后自动标记为可用。
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+from loguru import logger
+
+# 健康状态的有效期（秒），期间没有请求结果刷新时下次使用前重新探测
+HEALTH_TTL = 60
+# 连续失败多少次后标记为不可用
+HEALTH_FAILURE_THRESHOLD = 3
+# 不可用期间后台探测的间隔（秒）
+HEALTH_REPROBE_INTERVAL = 10
+
+
+class HealthState:
+    """单个服务端点的健康状态"""
+
+    def __init__(self, name: str, probe: Callable[[], bool],
+                 ttl: float = HEALTH_TTL,
+                 failure_threshold: int = HEALTH_FAILURE_THRESHOLD,
+                 reprobe_interval: float = HEALTH_REPROBE_INTERVAL):
+        """
+        Args:
+            name: 端点名称，用于日志
+            probe: 主动探测函数，服务可用时返回 True
+            ttl: 健康状态有效期（秒）
+            failure_threshold: 标记为不可用所需的连续失败次数
+            reprobe_interval: 不可用期间后台探测的间隔（秒）
+        """
+        self.name = name
+        self._probe = probe
+        self.ttl = ttl
+        self.failure_threshold = max(1, failure_threshold)
+        self.reprobe_interval = reprobe_interval
+        self._lock = threading.Lock()
+        self._healthy: Optional[bool] = None
+        self._checked_at = 0.0
+        self._failures = 0
+        self._reprobe_thread: Optional[threading.Thread] = None
+
+    def is_healthy(self) -> bool:
+        """
+        当前是否可用
+
+        不可用时直接返回 False（由后台线程负责恢复）；状态未知或已过期时同步探测一次。
+        """
+        with self._lock:
+            healthy = self._healthy
+            fresh = time.time() - self._checked_at < self.ttl
+        if healthy is False:
+            return False
+        if healthy and fresh:
+            return True
+        return self.check()
+
+    def is_marked_unhealthy(self) -> bool:
+        """是否已被标记为不可用（只读取当前状态，不探测）"""
+        with self._lock:
+            return self._healthy is False
+
+    def check(self) -> bool:
+        """立即探测一次并更新状态"""
+        try:
+            ok = bool(self._probe())
+        except Exception as e:
+            logger.warning(f"探测 {self.name} 失败: {e}")
+            ok = False
+        if ok:
+            self.record_success()
+        else:
+            self._mark_unhealthy("主动探测失败")
+        return ok
+
+    def record_success(self):
+        """真实请求成功（或收到服务端的正常响应）"""
+        with self._lock:
+            recovered = self._healthy is False
+            self._healthy = True
+            self._checked_at = time.time()
+            self._failures = 0
+        if recovered:
+            logger.info(f"{self.name} 已恢复可用")
+
+    def record_failure(self, error: Optional[Exception] = None):
+        """真实请求因连接错误或超时失败，连续失败达到阈值后标记为不可用"""
+        with self._lock:
+            self._failures += 1
+            failures = self._failures
+        if failures >= self.failure_threshold:
+            self._mark_unhealthy(f"连续 {failures} 次请求失败: {error}")
+        else:
+            logger.warning(f"{self.name} 请求失败（连续第 {failures} 次）: {error}")
+
+    def _mark_unhealthy(self, reason: str):
+        with self._lock:
+            was_healthy = self._healthy is not False
+            self._healthy = False
+            self._checked_at = time.time()
+            reprobe_thread = None
+            if self._reprobe_thread is None:
+                reprobe_thread = threading.Thread(
+                    target=self._reprobe_loop, name=f"health-{self.name}", daemon=True
+                )
+                self._reprobe_thread = reprobe_thread
+        if was_healthy:
+            logger.error(f"{self.name} 标记为不可用: {reason}")
+        if reprobe_thread is not None:
+            reprobe_thread.start()
+
+    def _reprobe_loop(self):
+        """不可用期间定期探测，恢复后退出"""
+        while True:
+            time.sleep(self.reprobe_interval)
+            try:
+                ok = bool(self._probe())
+            except Exception:
+                ok = False
+            if ok:
+                with self._lock:
+                    self._reprobe_thread = None
+                    self._healthy = True
+                    self._checked_at = time.time()
+                    self._failures = 0
+                logger.info(f"{self.name} 已恢复可用")
+                return
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'name': self.name,
+                'healthy': self._healthy,
+                'consecutive_failures': self._failures,
+                'checked_at': self._checked_at,
+            }
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Markdown 分段器
+
+单次扫描 Markdown 文本，按文档顺序产出带类型的片段：
+    heading  ATX 标题行（# 到 ######）
+    table    管道表格（表头行 + 分隔行 + 数据行）或 MinerU 输出的 HTML 表格：VLM 后端为 <table>...</table>，
+             pipeline 后端为 <html><body><table>...</table></body></html>
+    image    单独成行的图片（![...](...) 或 <img ...>）
+    text     其余连续的行（包括空行和围栏代码块）
+
+每个片段记录其在原文中的字符偏移 [start, end)，txt[start:end] 即片段内容（不含末尾换行）。
+逐行处理且只向前看一行，耗时与文本长度成线性关系。
+"""
+
+import re
+from typing import Iterator, NamedTuple, Optional, Tuple
+
+SEGMENT_TEXT = 'text'
+SEGMENT_TABLE = 'table'
+SEGMENT_IMAGE = 'image'
+SEGMENT_HEADING = 'heading'
+
+_HEADING_RE = re.compile(r'#{1,6}(?:\s|$)')
+_IMAGE_RE = re.compile(r'!\[[^\]]*\]\([^)]*\)|<img\b[^>]*>', re.IGNORECASE)
+_FENCE_RE = re.compile(r'(`{3,}|~{3,})')
+# HTML 表格的开始：可能带有 <html>、<body> 包装
+_HTML_TABLE_RE = re.compile(r'(<html\b[^>]*>\s*)?(<body\b[^>]*>\s*)?<table\b', re.IGNORECASE)
+_SEPARATOR_CELL_CHARS = frozenset('-:')
+
+
+class MarkdownSegment(NamedTuple):
+    type: str
+    content: str
+    start: int
+    end: int
+
+
+def _iter_lines(txt: str) -> Iterator[Tuple[int, int]]:
+    """产出每行的 (起始偏移, 结束偏移)，结束偏移不含换行符"""
+    pos = 0
+    length = len(txt)
+    while pos <= length:
+        end = txt.find('\n', pos)
+        if end == -1:
+            end = length
+        yield pos, end
+        pos = end + 1
+
+
+def _html_table_end_tag(stripped: str) -> Optional[str]:
+    """HTML 表格开始行对应的结束标签（包装在 <html>/<body> 中时为最外层的结束标签），不是表格时返回 None"""
+    match = _HTML_TABLE_RE.match(stripped)
+    if not match:
+        return None
+    if match.group(1):
+        return '</html>'
+    if match.group(2):
+        return '</body>'
+    return '</table>'
+
+
+def _is_table_line(stripped: str) -> bool:
+    return len(stripped) >= 2 and stripped[0] == '|' and stripped[-1] == '|'
+
+
+def _is_separator_line(stripped: str) -> bool:
+    """表格分隔行，如 |---|:---:|"""
+    if not _is_table_line(stripped) or '-' not in stripped:
+        return False
+    cells = [cell.strip() for cell in stripped[1:-1].split('|')]
+    return any(cells) and all(set(cell) <= _SEPARATOR_CELL_CHARS for cell in cells)
+
+
+class _Segmenter:
+    """逐行消费文本，累积当前片段并在类型变化时产出"""
+
+    def __init__(self, txt: str):
+        self.txt = txt
+        self.kind: Optional[str] = None
+        self.start = 0
+        self.end = 0
+
+    def take(self, kind: str, start: int, end: int, continued: bool = False) -> Optional[MarkdownSegment]:
+        """
+        把一行并入当前片段；开始新片段时返回上一个已完成的片段
+
+        相邻的文本行总是合并；表格行只有在 continued（属于同一个表格）时才合并。
+        """
+        if kind == self.kind and (kind == SEGMENT_TEXT or continued):
+            self.end = end
+            return None
+        finished = self.flush()
+        self.kind, self.start, self.end = kind, start, end
+        return finished
+
+    def flush(self) -> Optional[MarkdownSegment]:
+        if self.kind is None:
+            return None
+        segment = MarkdownSegment(self.kind, self.txt[self.start:self.end], self.start, self.end)
+        self.kind = None
+        return segment
+
+
+def iter_markdown_segments(txt: str) -> Iterator[MarkdownSegment]:
+    """按文档顺序产出 Markdown 片段"""
+    if not txt:
+        return
+    segmenter = _Segmenter(txt)
+    fence = None          # 所在围栏代码块的开始标记
+    html_table_end = None  # 位于跨行的 HTML 表格中时，表格的结束标签
+    in_table = False      # 是否位于管道表格中
+    pending = None        # 可能是表头的上一行 (start, end)
+
+    for start, end in _iter_lines(txt):
+        stripped = txt[start:end].strip()
+        continued = False
+
+        if pending is not None:
+            header_start, header_end = pending
+            pending = None
+            if _is_separator_line(stripped):
+                segment = segmenter.take(SEGMENT_TABLE, header_start, end)
+                if segment:
+                    yield segment
+                in_table = True
+                continue
+            segment = segmenter.take(SEGMENT_TEXT, header_start, header_end)
+            if segment:
+                yield segment
+
+        if fence is not None:
+            kind = SEGMENT_TEXT
+            if stripped.startswith(fence):
+                fence = None
+        elif html_table_end is not None:
+            kind, continued = SEGMENT_TABLE, True
+            if html_table_end in stripped.lower():
+                html_table_end = None
+        elif in_table and _is_table_line(stripped):
+            kind, continued = SEGMENT_TABLE, True
+        else:
+            in_table = False
+            fence_match = _FENCE_RE.match(stripped)
+            end_tag = None if fence_match else _html_table_end_tag(stripped)
+            if fence_match:
+                fence = fence_match.group(1)
+                kind = SEGMENT_TEXT
+            elif end_tag is not None:
+                html_table_end = None if end_tag in stripped.lower() else end_tag
+                kind = SEGMENT_TABLE
+            elif _is_table_line(stripped) and not _is_separator_line(stripped):
+                # 表头需要看下一行是否为分隔行
+                pending = (start, end)
+                continue
+            elif _HEADING_RE.match(stripped):
+                kind = SEGMENT_HEADING
+            elif _IMAGE_RE.fullmatch(stripped):
+                kind = SEGMENT_IMAGE
+            else:
+                kind = SEGMENT_TEXT
+
+        segment = segmenter.take(kind, start, end, continued)
+        if segment:
+            yield segment
+
+    if pending is not None:
+        segment = segmenter.take(SEGMENT_TEXT, *pending)
+        if segment:
+            yield segment
+    segment = segmenter.flush()
+    if segment:
+        yield segment
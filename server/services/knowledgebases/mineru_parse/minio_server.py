@@ -108,6 +108,11 @@ def _ensure_bucket_exists(minio_client, kb_id):
             # 尝试重新设置策略
             _set_bucket_policy(minio_client, kb_id)
 
+def ensure_bucket(kb_id):
+    """确保知识库存储桶存在并可公开读取（供外部服务直接写入图片前调用）"""
+    minio_client = get_minio_client()
+    _ensure_bucket_exists(minio_client, kb_id)
+
 def upload_file_to_minio(kb_id, file_path):
     """上传单个文件到MinIO"""
     minio_client = get_minio_client()
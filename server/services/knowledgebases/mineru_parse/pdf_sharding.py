@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+大 PDF 分片工具
+
+把页数较多的 PDF 按页码区间切分为多个分片，分别交给 MinerU 并行解析，
+再按页码顺序合并各分片的 middle_json、content_list 和 Markdown。
+"""
+
+import os
+import uuid
+from typing import Any, Dict, List, Tuple
+
+from loguru import logger
+
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
+    logger.warning("未安装 pypdfium2，大 PDF 分片解析不可用")
+
+
+def count_pdf_pages(pdf_path: str) -> int:
+    """获取 PDF 页数"""
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def plan_page_ranges(total_pages: int, shard_pages: int) -> List[Tuple[int, int]]:
+    """按每片页数切分页码区间，返回 [(起始页, 结束页)]，左闭右开，页码从 0 开始"""
+    shard_pages = max(1, shard_pages)
+    return [(start, min(start + shard_pages, total_pages)) for start in range(0, total_pages, shard_pages)]
+
+
+def split_pdf(pdf_path: str, page_ranges: List[Tuple[int, int]], output_dir: str) -> List[str]:
+    """
+    按页码区间把 PDF 拆分为多个文件
+
+    分片文件名带随机后缀，避免不同文档的分片在 MinerU 服务端输出目录中重名。
+
+    Returns:
+        List[str]: 与 page_ranges 一一对应的分片文件路径
+    """
+    base_name = os.path.splitext(os.path.basename(pdf_path))[0].replace('.', '_')
+    token = uuid.uuid4().hex[:8]
+    shard_paths = []
+    source = pdfium.PdfDocument(pdf_path)
+    try:
+        for start, end in page_ranges:
+            shard = pdfium.PdfDocument.new()
+            try:
+                shard.import_pages(source, list(range(start, end)))
+                shard_path = os.path.join(output_dir, f"{base_name}_{token}_p{start + 1}-{end}.pdf")
+                shard.save(shard_path)
+            finally:
+                shard.close()
+            shard_paths.append(shard_path)
+    finally:
+        source.close()
+    return shard_paths
+
+
+def _offset_pages(items: List[Dict[str, Any]], page_offset: int) -> List[Dict[str, Any]]:
+    """复制列表中的条目并把 page_idx 加上分片的起始页"""
+    shifted = []
+    for item in items:
+        if isinstance(item, dict) and 'page_idx' in item:
+            item = dict(item)
+            item['page_idx'] = item['page_idx'] + page_offset
+        shifted.append(item)
+    return shifted
+
+
+def merge_shard_results(results: List[Dict[str, Any]], page_ranges: List[Tuple[int, int]]) -> Dict[str, Any]:
+    """
+    按页码顺序合并各分片的解析结果
+
+    块列表、pdf_info 中的页面和 content_list 中的条目按分片起始页修正 page_idx；
+    Markdown 按分片顺序拼接；图片（base64、zip 解压目录或对象 key）取并集。
+    """
+    merged: Dict[str, Any] = {
+        'md_content': "\n\n".join(result.get('md_content') or '' for result in results),
+        'backend': results[0].get('backend'),
+    }
+
+    block_lists = [result.get('blocks') for result in results]
+    if all(blocks is not None for blocks in block_lists):
+        merged['blocks'] = []
+        for blocks, (start, _) in zip(block_lists, page_ranges):
+            merged['blocks'].extend(_offset_pages(blocks, start))
+    elif any(blocks is not None for blocks in block_lists):
+        logger.warning("部分分片未返回位置信息，合并结果不包含位置信息")
+
+    infos = [result.get('info') for result in results]
+    if all(infos):
+        merged_info = dict(infos[0])
+        merged_info['pdf_info'] = []
+        for info, (start, _) in zip(infos, page_ranges):
+            merged_info['pdf_info'].extend(_offset_pages(info.get('pdf_info', []), start))
+        merged['info'] = merged_info
+    elif any(infos):
+        logger.warning("部分分片未返回 info 字段，合并结果不包含位置信息")
+
+    if any('content_list' in result for result in results):
+        merged['content_list'] = []
+        for result, (start, _) in zip(results, page_ranges):
+            merged['content_list'].extend(_offset_pages(result.get('content_list') or [], start))
+
+    if any('images' in result for result in results):
+        merged['images'] = {}
+        for result in results:
+            merged['images'].update(result.get('images') or {})
+
+    if any(result.get('images_dir') for result in results):
+        merged['images_dir'] = next(result['images_dir'] for result in results if result.get('images_dir'))
+        merged['image_count'] = sum(result.get('image_count', 0) for result in results)
+
+    if all(result.get('image_keys') is not None for result in results):
+        merged['image_bucket'] = results[0].get('image_bucket')
+        merged['image_keys'] = [key for result in results for key in result['image_keys']]
+
+    return merged
@@ -1,11 +1,15 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 import os
+import shutil
 import tempfile
-import json
 import base64
 from .ragflow_build import create_ragflow_resources
 from .fastapi_adapter import get_global_adapter
+from .minio_server import ensure_bucket
+from .result_cache import get_parse_result_cache
+from .block_store import block_store_path, extract_blocks, write_block_store
+from ..parse_scheduler import parse_stage, STAGE_MINERU
 
 # 聊天助手 Prompt 模板:
 #   请参考{knowledge}内容回答用户问题。
@@ -47,46 +51,94 @@ def _save_images_from_result(result, images_dir):
     return saved_count
 
 
-def _process_pdf_with_fastapi(pdf_path, update_progress):
-    """使用 FastAPI 处理 PDF 文件"""
+def _process_pdf_with_fastapi(pdf_path, update_progress, kb_id=None):
+    """
+    使用 FastAPI 处理 PDF 文件
+
+    Returns:
+        tuple: (Markdown 文件路径, 本地图片目录)；图片已由 MinerU 直接写入知识库存储桶时图片目录为 None
+    """
     if update_progress:
         update_progress(0.05, "使用 FastAPI 模式处理文档")
     
+    # 结果文件与图片统一保存在临时目录，保持接口兼容性
+    temp_dir = tempfile.mkdtemp()
+    images_dir = os.path.join(temp_dir, 'images')
+
     # 使用全局适配器处理，让适配器自己决定使用哪个backend
     # 不再从环境变量直接获取，避免绕过配置系统
     adapter = get_global_adapter()
-    result = adapter.process_file(
-        file_path=pdf_path,
-        update_progress=update_progress,
-        return_info=True,    # 确保返回 middle_json 信息
-        return_images=True   # 获取原始图片数据
-    )
-    
-    # 保存结果到临时文件，保持接口兼容性
-    if 'md_content' in result:
-        temp_dir = tempfile.mkdtemp()
-        
+    image_bucket = None
+    if adapter.image_transport == 'minio' and kb_id:
+        # MinerU 服务直接把图片写入知识库存储桶，需先确保桶存在且可公开读取
+        ensure_bucket(kb_id)
+        image_bucket = kb_id
+    # 同一文件以相同参数解析过时直接复用缓存结果，跳过 MinerU
+    cache = get_parse_result_cache()
+    cache_key = None
+    cached_result = None
+    if cache:
+        try:
+            cache_key = cache.make_key(pdf_path, adapter.cache_params())
+            cached_result = cache.get(cache_key, images_dir)
+        except Exception as e:
+            print(f"[WARNING] 查询解析结果缓存失败: {e}")
+
+    # 解析或后处理失败时删除临时目录（Markdown 与图片），成功时目录交给调用方使用
+    try:
+        if cached_result is not None:
+            if update_progress:
+                update_progress(0.8, "命中解析结果缓存，跳过 MinerU 解析")
+            result = cached_result
+        else:
+            # MinerU 服务处理能力有限，由调度器限制同时调用的文档数
+            with parse_stage(STAGE_MINERU):
+                result = adapter.process_file(
+                    file_path=pdf_path,
+                    update_progress=update_progress,
+                    images_dir=images_dir,  # zip 传输时图片直接解压到该目录
+                    image_bucket=image_bucket,  # minio 传输时图片由服务直接写入该存储桶
+                    return_info=True,    # 确保返回 middle_json 信息
+                    return_images=True   # 获取原始图片数据
+                )
+
+        if 'md_content' not in result:
+            raise ValueError("FastAPI 未返回 md_content")
+
         # 保存 Markdown 文件
         md_file_path = os.path.join(temp_dir, "result.md")
         with open(md_file_path, 'w', encoding='utf-8') as f:
             f.write(result['md_content'])
         
-        # 保存 middle_json 数据到对应位置，供 get_bbox_for_chunk 使用
-        if 'info' in result and result['info']:
-            middle_json_path = os.path.join(temp_dir, "result_middle.json")
-            with open(middle_json_path, 'w', encoding='utf-8') as f:
-                json.dump(result['info'], f, ensure_ascii=False, indent=2)
-            print(f"[INFO] 已保存位置信息文件: {middle_json_path}")
+        # 块信息（接收结果时已从 middle_json 中逐页提取）保存为紧凑的块存储文件，供 get_bbox_for_chunk 使用
+        block_list = result.get('blocks')
+        if block_list is None and result.get('info'):
+            block_list = extract_blocks(result['info'])
+        if block_list is not None:
+            blocks_path = block_store_path(md_file_path)
+            store_size = write_block_store(blocks_path, block_list)
+            print(f"[INFO] 已保存位置信息文件: {blocks_path}（{store_size / 1024:.1f} KB）")
         else:
             print(f"[WARNING] FastAPI 未返回位置信息数据 (info 字段)")
         
-        # 创建并保存图片到临时目录
-        images_dir = os.path.join(temp_dir, 'images')
-        _save_images_from_result(result, images_dir)
-            
-        return md_file_path
-    else:
-        raise ValueError("FastAPI 未返回 md_content")
+        # minio 传输的图片已在存储桶中；zip 传输的图片已写入 images_dir；
+        # 旧版服务返回 base64 时在此解码保存
+        if result.get('image_keys') is not None:
+            print(f"[INFO] MinerU 已将 {len(result['image_keys'])} 张图片写入存储桶 {result.get('image_bucket')}")
+            if cache_key:
+                cache.put(cache_key, result, None)
+            return md_file_path, None
+        if result.get('images_dir'):
+            print(f"[INFO] 已接收 {result.get('image_count', 0)} 张图片到 {images_dir}")
+        else:
+            _save_images_from_result(result, images_dir)
+
+        if cache_key and cached_result is None:
+            cache.put(cache_key, result, images_dir)
+        return md_file_path, images_dir
+    except Exception:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
 
 
 def _safe_create_ragflow(doc_id, kb_id, md_file_path, image_dir, update_progress):
@@ -111,10 +163,7 @@ def process_pdf_entry(doc_id, pdf_path, kb_id, update_progress):
             update_progress(0.01, "PDF 处理模式: FastAPI")
             
         # 使用 FastAPI 处理
-        md_file_path = _process_pdf_with_fastapi(pdf_path, update_progress)
-        
-        # 处理图片目录（已在 _process_pdf_with_fastapi 中创建）
-        images_dir = os.path.join(os.path.dirname(md_file_path), 'images')
+        md_file_path, images_dir = _process_pdf_with_fastapi(pdf_path, update_progress, kb_id)
         
         # 创建 RAGFlow 资源
         result = _safe_create_ragflow(doc_id, kb_id, md_file_path, images_dir, update_progress)
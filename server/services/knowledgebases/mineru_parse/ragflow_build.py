@@ -3,11 +3,15 @@ import os
 import time
 import shutil
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
+from elasticsearch import helpers
 from .minio_server import upload_directory_to_minio
 from .mineru_test import update_markdown_image_urls
-from .utils import split_markdown_to_chunks_configured, get_bbox_for_chunk, update_document_progress, should_cleanup_temp_files
+from .utils import split_markdown_to_chunks_configured, get_bbox_for_chunk, update_document_progress, should_cleanup_temp_files, release_blocks_for_md
 from database import get_es_client, get_db_connection
+from ...config import INGESTION_CONFIG
+from ..parse_scheduler import parse_stage, STAGE_CHUNKING, STAGE_INGESTION
 
 def _validate_environment():
     """验证环境变量配置"""
@@ -21,6 +25,10 @@ def _validate_environment():
     return api_key, base_url
 
 def _upload_images(kb_id, image_dir, update_progress):
+    if image_dir is None:
+        # 图片已由 MinerU 服务直接写入知识库存储桶
+        print(f"第4步：图片已在MinIO中，跳过上传")
+        return
     update_progress(0.7, "上传图片到MinIO...")
     print(f"第4步：上传图片到MinIO...")
     upload_directory_to_minio(kb_id, image_dir)
@@ -66,54 +74,158 @@ def _get_document_chunking_config(doc_id):
         if conn:
             conn.close()
 
-def add_chunks_to_doc(doc, chunks, update_progress):
-    update_progress(0.8, "添加 chunk 到文档...")
+def _iter_chunk_batches(indexed_chunks, batch_size, batch_max_chars):
+    """按数量和字符数上限切分批次，单个超长分块独占一批"""
+    batch = []
+    batch_chars = 0
+    for index, chunk in indexed_chunks:
+        if batch and (len(batch) >= batch_size or batch_chars + len(chunk) > batch_max_chars):
+            yield batch
+            batch = []
+            batch_chars = 0
+        batch.append((index, chunk))
+        batch_chars += len(chunk)
+    if batch:
+        yield batch
+
+def _add_chunk_with_retry(doc, chunk, max_retries, retry_backoff):
+    """提交单个分块，失败后按指数退避重试，返回 RAGFlow 的 Chunk 对象"""
+    attempt = 0
+    while True:
+        try:
+            return doc.add_chunk(content=chunk)
+        except Exception:
+            attempt += 1
+            if attempt > max_retries:
+                raise
+            time.sleep(retry_backoff * (2 ** (attempt - 1)))
+
+def add_chunks_to_doc(doc, chunks, update_progress, progress_range=(0.8, 0.9)):
+    """
+    分批并发地将分块添加到 RAGFlow 文档
+
+    分块按 INGESTION_CONFIG 中的数量/字符数上限分批，每批内使用有界线程池并发提交，
+    单个分块失败时按指数退避重试，每批完成后通过 update_progress 上报进度。
+
+    Returns:
+        list: 与 chunks 一一对应的添加结果（RAGFlow Chunk 对象），空分块或最终失败的位置为 None
+    """
+    start_progress, end_progress = progress_range
+    update_progress(start_progress, "添加 chunk 到文档...")
     print(f"总共接收到 {len(chunks)} 个 chunks 准备添加。")
-    for i, chunk in enumerate(chunks):
-        chunk_preview = chunk.strip()[:50].replace('\n', ' ')
-        print(f"准备添加 Chunk {i}: \"{chunk_preview}...\"")
-        if chunk and chunk.strip():
-            try:
-                doc.add_chunk(content=chunk)
-            except Exception as e:
-                print(f"添加 chunk 失败: {e}")
-
-def _update_chunks_position(doc, md_file_path, chunk_content_to_index):
+
+    results = [None] * len(chunks)
+    indexed_chunks = [(i, chunk) for i, chunk in enumerate(chunks) if chunk and chunk.strip()]
+    if not indexed_chunks:
+        return results
+
+    batch_size = max(1, INGESTION_CONFIG.batch_size)
+    batch_max_chars = max(1, INGESTION_CONFIG.batch_max_chars)
+    max_workers = max(1, INGESTION_CONFIG.max_workers)
+    max_retries = max(0, INGESTION_CONFIG.max_retries)
+    retry_backoff = INGESTION_CONFIG.retry_backoff
+
+    total = len(indexed_chunks)
+    done = 0
+    failed = 0
+    start_time = time.time()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for batch in _iter_chunk_batches(indexed_chunks, batch_size, batch_max_chars):
+            futures = {
+                executor.submit(_add_chunk_with_retry, doc, chunk, max_retries, retry_backoff): index
+                for index, chunk in batch
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    failed += 1
+                    chunk_preview = chunks[index].strip()[:50].replace('\n', ' ')
+                    print(f"添加 chunk {index} 失败（已重试 {max_retries} 次）: {e}，内容: \"{chunk_preview}...\"")
+
+            done += len(batch)
+            progress = start_progress + (end_progress - start_progress) * done / total
+            update_progress(progress, f"已添加 chunk {done}/{total}")
+
+    elapsed = time.time() - start_time
+    print(f"chunk 添加完成: 成功 {total - failed}/{total}，耗时 {elapsed:.2f} 秒")
+    return results
+
+def _build_position_action(index_name, chunk_id, md_file_path, chunk_content, original_index):
+    """构建单个分块的 ES 部分更新 action（top_int 记录原始顺序，position_int/page_num_int 记录位置）"""
+    doc_fields = {"top_int": original_index}
+
+    # 尝试获取位置信息，如果成功则添加到更新中
+    try:
+        position_int_temp = get_bbox_for_chunk(md_file_path, chunk_content)
+        if position_int_temp is not None:
+            position_fields = {}
+            _add_positions(position_fields, position_int_temp)
+            if position_fields.get("position_int"):
+                doc_fields["position_int"] = position_fields["position_int"]
+                doc_fields["page_num_int"] = position_fields["page_num_int"]
+    except Exception as e:
+        print(f"获取chunk位置异常: {e}")
+
+    return {
+        "_op_type": "update",
+        "_index": index_name,
+        "_id": chunk_id,
+        "doc": doc_fields
+    }
+
+def _bulk_update_positions(es_client, index_name, actions):
+    """
+    批量写入分块位置信息，所有 action 写完后只刷新一次索引
+
+    Returns:
+        int: 更新成功的分块数量
+    """
+    if not actions:
+        return 0
+
+    start_time = time.time()
+    success_count, errors = helpers.bulk(
+        es_client,
+        actions,
+        chunk_size=500,
+        raise_on_error=False,
+        raise_on_exception=False
+    )
+    for error in errors:
+        item = error.get("update", error)
+        print(f"ES更新异常: id={item.get('_id')}, status={item.get('status')}, error={item.get('error')}")
+
+    try:
+        es_client.indices.refresh(index=index_name)
+    except Exception as refresh_e:
+        print(f"ES刷新索引异常: {refresh_e}")
+
+    elapsed = time.time() - start_time
+    throughput = len(actions) / elapsed if elapsed > 0 else float(len(actions))
+    print(f"ES位置批量更新完成: 成功 {success_count}/{len(actions)}，失败 {len(errors)}，"
+          f"耗时 {elapsed:.2f} 秒，吞吐 {throughput:.1f} 条/秒")
+    return success_count
+
+def _update_chunks_position(doc, md_file_path, chunks, added_chunks):
+    """
+    为已添加的分块写入顺序和位置信息
+
+    直接使用 add_chunks_to_doc 返回的分块 ID 与原始序号对应，
+    无需重新列出文档分块或按内容反查，重复内容的分块也能各自写入。
+    """
     es_client = get_es_client()
     print(f"文档: id: {doc.id})")
-    chunk_count = 0
     tenant_id = doc.created_by
     index_name = f"ragflow_{tenant_id}"
-    for chunk in doc.list_chunks(keywords=None, page=1, page_size=10000):
-        original_index = chunk_content_to_index.get(chunk.content)
-        if original_index is None:
-            print(f"警告: 无法为块 id={chunk.id} 的内容找到原始索引，将跳过此块。")
+    actions = []
+    for original_index, (chunk_content, added_chunk) in enumerate(zip(chunks, added_chunks)):
+        if added_chunk is None or not added_chunk.id:
             continue
-        
-        direct_update = {
-            "doc": {
-                "top_int": original_index
-            }
-        }
-        
-        # 尝试获取位置信息，如果成功则添加到更新中
-        try:
-            position_int_temp = get_bbox_for_chunk(md_file_path, chunk.content)
-            if position_int_temp is not None:
-                doc_fields = {}
-                _add_positions(doc_fields, position_int_temp)
-                direct_update["doc"]["position_int"] = doc_fields.get("position_int")
-        except Exception as e:
-            print(f"获取chunk位置异常: {e}")
-        
-        # 执行ES更新
-        try:
-            es_client.update(index=index_name, id=chunk.id, body=direct_update, refresh=True)
-            chunk_count += 1
-        except Exception as es_e:
-            print(f"ES更新异常: {es_e}")
-        
-    return chunk_count
+        actions.append(_build_position_action(index_name, added_chunk.id, md_file_path, chunk_content, original_index))
+
+    return _bulk_update_positions(es_client, index_name, actions)
 
 def _cleanup_temp_files(md_file_path):
     """清理临时文件"""
@@ -131,32 +243,35 @@ def _cleanup_temp_files(md_file_path):
 def create_ragflow_resources(doc_id, kb_id, md_file_path, image_dir, update_progress):
     """
     使用增强文本创建RAGFlow知识库和聊天助手
+
+    image_dir 为 None 表示图片已直接写入知识库存储桶，无需再上传
     """
     try:
         doc = get_ragflow_doc(doc_id, kb_id)
 
-        _upload_images(kb_id, image_dir, update_progress)
+        with parse_stage(STAGE_INGESTION):
+            _upload_images(kb_id, image_dir, update_progress)
 
         # 获取文档的分块配置
         chunking_config = _get_document_chunking_config(doc_id)
         
-        enhanced_text = update_markdown_image_urls(md_file_path, kb_id)
-        
-        # 传递分块配置给分块函数
-        if chunking_config:
-            chunks = split_markdown_to_chunks_configured(
-                enhanced_text, 
-                chunk_token_num=chunking_config.get('chunk_token_num', 256),
-                min_chunk_tokens=chunking_config.get('min_chunk_tokens', 10),
-                chunking_config=chunking_config
-            )
-        else:
-            chunks = split_markdown_to_chunks_configured(enhanced_text, chunk_token_num=256)
-        
-        chunk_content_to_index = {chunk: i for i, chunk in enumerate(chunks)}
+        with parse_stage(STAGE_CHUNKING):
+            enhanced_text = update_markdown_image_urls(md_file_path, kb_id)
 
-        add_chunks_to_doc(doc, chunks, update_progress)
-        chunk_count = _update_chunks_position(doc, md_file_path, chunk_content_to_index)
+            # 传递分块配置给分块函数
+            if chunking_config:
+                chunks = split_markdown_to_chunks_configured(
+                    enhanced_text,
+                    chunk_token_num=chunking_config.get('chunk_token_num', 256),
+                    min_chunk_tokens=chunking_config.get('min_chunk_tokens', 10),
+                    chunking_config=chunking_config
+                )
+            else:
+                chunks = split_markdown_to_chunks_configured(enhanced_text, chunk_token_num=256)
+
+        with parse_stage(STAGE_INGESTION):
+            added_chunks = add_chunks_to_doc(doc, chunks, update_progress)
+            chunk_count = _update_chunks_position(doc, md_file_path, chunks, added_chunks)
         # 根据环境变量决定是否清理临时文件
         _cleanup_temp_files(md_file_path)
 
@@ -167,6 +282,9 @@ def create_ragflow_resources(doc_id, kb_id, md_file_path, image_dir, update_prog
         import traceback
         traceback.print_exc()
         raise
+    finally:
+        # 位置信息已写入，释放该文档的块列表和匹配索引
+        release_blocks_for_md(md_file_path)
 
 def _add_positions(d, poss):
     try:
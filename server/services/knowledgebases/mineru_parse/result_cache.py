@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MinerU 解析结果缓存
+
+按输入文件内容的 SHA-256 和解析参数缓存 MinerU 的解析结果，同一文件重复上传到多个知识库、
+或修改分块配置后重新解析时直接复用，跳过 MinerU 推理。
+
+每条缓存是 MinIO 中的一个 zip 对象（result.json + images/），对象名为
+``<文件 SHA-256>/<参数哈希>.zip``。缓存总大小超过上限时按最近访问时间淘汰。
+
+缓存总大小在进程内按写入量累加估算，只有估算值超过上限、或每写入 SIZE_RESYNC_PUTS 次
+（其他进程也会写入同一存储桶）时才列举存储桶重新统计，写入时不再每次都列举全部对象。
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from typing import Any, Dict, Optional
+
+from minio.commonconfig import CopySource, REPLACE
+from minio.error import S3Error
+
+from database import get_minio_client
+from ..object_fetch import download_object_to_path, stream_object_to_file
+from .result_stream import parse_result_file
+from ...config import PARSE_CACHE_CONFIG
+
+# 缓存内容格式版本，结果结构变化时递增以使旧缓存失效
+CACHE_FORMAT_VERSION = 1
+# 计算文件哈希时每次读取的字节数
+HASH_CHUNK_SIZE = 1024 * 1024
+# 缓存超出上限时淘汰到上限的该比例，避免每次写入都触发淘汰
+EVICTION_TARGET_RATIO = 0.9
+# 每写入该次数后列举存储桶重新统计缓存总大小
+SIZE_RESYNC_PUTS = 100
+# 缓存中保存的结果字段
+CACHED_FIELDS = ('md_content', 'blocks', 'info', 'content_list', 'backend')
+
+
+class ParseResultCache:
+    """基于 MinIO 的 MinerU 解析结果缓存"""
+
+    def __init__(self, bucket: str, max_size_bytes: int):
+        self.bucket = bucket
+        self.max_size_bytes = max_size_bytes
+        self._lock = threading.Lock()
+        self._bucket_ready = False
+        # 缓存总大小的估算值（字节），None 表示尚未统计
+        self._size_estimate: Optional[int] = None
+        self._puts_since_resync = 0
+        self._evict_lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'errors': 0}
+
+    @staticmethod
+    def make_key(file_path: str, params: Dict[str, Any]) -> str:
+        """根据文件内容和解析参数生成缓存对象名"""
+        file_hash = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                file_hash.update(block)
+        param_text = json.dumps(params, sort_keys=True, ensure_ascii=False)
+        param_hash = hashlib.sha256(f"v{CACHE_FORMAT_VERSION}:{param_text}".encode('utf-8')).hexdigest()[:16]
+        return f"{file_hash.hexdigest()}/{param_hash}.zip"
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def get_stats(self) -> Dict[str, Any]:
+        """命中、未命中、写入、淘汰和出错次数以及命中率"""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats['bucket'] = self.bucket
+        stats['max_size_mb'] = self.max_size_bytes // (1024 * 1024)
+        return stats
+
+    def _client(self):
+        minio_client = get_minio_client()
+        if not self._bucket_ready:
+            if not minio_client.bucket_exists(self.bucket):
+                minio_client.make_bucket(self.bucket)
+                print(f"[Parse Cache] 创建缓存存储桶: {self.bucket}")
+            self._bucket_ready = True
+        return minio_client
+
+    def get(self, key: str, images_dir: str) -> Optional[Dict[str, Any]]:
+        """
+        查找缓存，命中时把图片解压到 images_dir
+
+        Returns:
+            dict: 与 MinerUFastAPIAdapter.process_file 结构一致的结果（图片位于 images_dir），未命中返回 None
+        """
+        fd, zip_path = tempfile.mkstemp(prefix="parse_cache_", suffix=".zip")
+        os.close(fd)
+        try:
+            minio_client = self._client()
+            try:
+                download_object_to_path(minio_client, self.bucket, key, zip_path)
+            except S3Error as e:
+                if e.code != 'NoSuchKey':
+                    raise
+                self._count('misses')
+                return None
+
+            image_count = 0
+            with zipfile.ZipFile(zip_path) as zf:
+                with zf.open("result.json") as f:
+                    result = parse_result_file(f)
+                os.makedirs(images_dir, exist_ok=True)
+                for member in zf.infolist():
+                    if member.is_dir() or not member.filename.startswith("images/"):
+                        continue
+                    target_path = os.path.join(images_dir, os.path.basename(member.filename))
+                    with zf.open(member) as src, open(target_path, 'wb') as dst:
+                        shutil.copyfileobj(src, dst, HASH_CHUNK_SIZE)
+                    image_count += 1
+            result['images_dir'] = images_dir
+            result['image_count'] = image_count
+
+            self._touch(minio_client, key)
+            self._count('hits')
+            print(f"[Parse Cache] 命中缓存: {key}（{image_count} 张图片）")
+            return result
+        except Exception as e:
+            self._count('errors')
+            print(f"[Parse Cache] 读取缓存失败，按未命中处理: {key}, 错误: {e}")
+            return None
+        finally:
+            if os.path.exists(zip_path):
+                os.remove(zip_path)
+
+    def _touch(self, minio_client, key: str):
+        """原地复制对象以刷新修改时间，淘汰时据此判断最近访问"""
+        try:
+            minio_client.copy_object(
+                self.bucket, key, CopySource(self.bucket, key),
+                metadata={"last-access": str(int(time.time()))},
+                metadata_directive=REPLACE,
+            )
+        except Exception as e:
+            print(f"[Parse Cache] 刷新缓存访问时间失败: {key}, 错误: {e}")
+
+    def put(self, key: str, result: Dict[str, Any], images_dir: Optional[str]):
+        """
+        写入缓存
+
+        图片取自 images_dir；结果中的图片已由 MinerU 直接写入存储桶时（image_keys），从存储桶读取后打包。
+        """
+        fd, zip_path = tempfile.mkstemp(prefix="parse_cache_", suffix=".zip")
+        os.close(fd)
+        try:
+            minio_client = self._client()
+            cached = {field: result[field] for field in CACHED_FIELDS if field in result}
+            with zipfile.ZipFile(zip_path, "w") as zf:
+                zf.writestr("result.json", json.dumps(cached, ensure_ascii=False), compress_type=zipfile.ZIP_DEFLATED)
+                if result.get('image_keys') is not None:
+                    for image_key in result['image_keys']:
+                        with zf.open(f"images/{os.path.basename(image_key)}", "w") as dst:
+                            stream_object_to_file(minio_client, result['image_bucket'], image_key, dst)
+                elif images_dir and os.path.isdir(images_dir):
+                    for image_name in os.listdir(images_dir):
+                        zf.write(os.path.join(images_dir, image_name), f"images/{image_name}",
+                                 compress_type=zipfile.ZIP_STORED)
+
+            zip_size = os.path.getsize(zip_path)
+            minio_client.fput_object(self.bucket, key, zip_path, content_type="application/zip")
+            self._count('stores')
+            print(f"[Parse Cache] 已写入缓存: {key}（{zip_size / 1024 / 1024:.2f} MB）")
+            if self._record_put(zip_size):
+                self._evict(minio_client)
+        except Exception as e:
+            self._count('errors')
+            print(f"[Parse Cache] 写入缓存失败: {key}, 错误: {e}")
+        finally:
+            if os.path.exists(zip_path):
+                os.remove(zip_path)
+
+    def _record_put(self, size: int) -> bool:
+        """累加写入量，返回是否需要列举存储桶（尚未统计、估算值超过上限或到了重新统计的写入次数）"""
+        with self._lock:
+            self._puts_since_resync += 1
+            if self._size_estimate is None or self._puts_since_resync >= SIZE_RESYNC_PUTS:
+                return True
+            self._size_estimate += size
+            return self._size_estimate > self.max_size_bytes
+
+    def _evict(self, minio_client):
+        """统计缓存总大小，超过上限时按最近访问时间从旧到新删除，直到降到上限的 90%"""
+        # 同一时刻只需一个线程列举和淘汰
+        if not self._evict_lock.acquire(blocking=False):
+            return
+        try:
+            self._evict_locked(minio_client)
+        finally:
+            self._evict_lock.release()
+
+    def _evict_locked(self, minio_client):
+        objects = list(minio_client.list_objects(self.bucket, recursive=True))
+        total_size = sum(obj.size for obj in objects)
+        self._set_size_estimate(total_size)
+        if total_size <= self.max_size_bytes:
+            return
+
+        target_size = self.max_size_bytes * EVICTION_TARGET_RATIO
+        evicted = 0
+        for obj in sorted(objects, key=lambda item: item.last_modified):
+            if total_size <= target_size:
+                break
+            minio_client.remove_object(self.bucket, obj.object_name)
+            total_size -= obj.size
+            evicted += 1
+        self._set_size_estimate(total_size)
+        self._count('evictions', evicted)
+        print(f"[Parse Cache] 缓存超出上限，已淘汰 {evicted} 条，当前大小 {total_size / 1024 / 1024:.1f} MB")
+
+    def _set_size_estimate(self, total_size: int):
+        with self._lock:
+            self._size_estimate = total_size
+            self._puts_since_resync = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_parse_result_cache() -> Optional[ParseResultCache]:
+    """获取全局解析结果缓存，未启用时返回 None"""
+    global _cache
+    if not PARSE_CACHE_CONFIG.enabled:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ParseResultCache(
+                bucket=PARSE_CACHE_CONFIG.bucket,
+                max_size_bytes=PARSE_CACHE_CONFIG.max_size_mb * 1024 * 1024,
+            )
+        return _cache
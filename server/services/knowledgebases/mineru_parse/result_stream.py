@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MinerU 解析结果的流式 JSON 解析
+
+MinerU 返回的结果中 info 字段即完整的 middle_json，上千页的扫描件整体 json.load 后会产生
+GB 级的对象图。这里按字节块增量读取结果：顶层字段照常解码，info.pdf_info 数组逐页解码，
+每页只提取分块定位需要的块信息（extract_page_blocks）后即丢弃，峰值内存与单页大小相当。
+
+解析结果中不再包含 info 字段，改为 blocks 字段（与 extract_blocks 的返回结构一致）。
+"""
+
+import codecs
+import json
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List
+
+from .block_store import extract_page_blocks
+
+# 从文件对象读取时每次读取的字节数
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+_WHITESPACE = ' \t\n\r'
+
+
+class _JSONStream:
+    """在增量读取的文本缓冲区上按需解码 JSON 值"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._decoder = json.JSONDecoder()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, min_chars: int = 1) -> bool:
+        """丢弃已消费的文本并至少再读入 min_chars 个字符，没有更多数据时返回 False"""
+        parts = [self._buf[self._pos:]]
+        self._pos = 0
+        added = 0
+        while added < min_chars and not self._eof:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                text = self._text_decoder.decode(b'', final=True)
+                self._eof = True
+            else:
+                text = self._text_decoder.decode(chunk)
+            parts.append(text)
+            added += len(text)
+        self._buf = ''.join(parts)
+        return added > 0
+
+    def _skip_whitespace(self):
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf) or not self._fill():
+                return
+
+    def peek(self) -> str:
+        """下一个非空白字符（不消费）"""
+        self._skip_whitespace()
+        if self._pos >= len(self._buf):
+            raise ValueError("JSON 数据意外结束")
+        return self._buf[self._pos]
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"JSON 格式错误: 期望 {char!r}，实际为 {found!r}")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """解码下一个完整的 JSON 值"""
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+                # 值不完整：缓冲区按已有长度成倍扩充，大字段的重复解码总量保持线性
+                self._fill(max(len(self._buf) - self._pos, STREAM_CHUNK_SIZE))
+                continue
+            # 数字位于缓冲区末尾时可能还没读完
+            if end >= len(self._buf) and not self._eof and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def object_keys(self) -> Iterator[str]:
+        """逐个产出对象的键，调用方须在继续迭代前读取该键对应的值"""
+        self.expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise ValueError("JSON 格式错误: 对象的键不是字符串")
+            self.expect(':')
+            yield key
+            if self.peek() == '}':
+                self._pos += 1
+                return
+            self.expect(',')
+
+    def array_items(self) -> Iterator[int]:
+        """逐个产出数组元素的下标，调用方须在继续迭代前读取该元素"""
+        self.expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            if self.peek() == ']':
+                self._pos += 1
+                return
+            self.expect(',')
+
+    def expect_end(self):
+        self._skip_whitespace()
+        if self._pos < len(self._buf):
+            raise ValueError("JSON 格式错误: 结果之后还有多余数据")
+
+
+def _read_info_blocks(stream: _JSONStream) -> List[Dict[str, Any]]:
+    """读取 info（middle_json）对象，逐页提取块信息，其余字段跳过"""
+    blocks: List[Dict[str, Any]] = []
+    has_pages = False
+    for key in stream.object_keys():
+        if key == 'pdf_info' and stream.peek() == '[':
+            has_pages = True
+            for page_idx in stream.array_items():
+                page = stream.value()
+                if isinstance(page, dict):
+                    blocks.extend(extract_page_blocks(page_idx, page))
+        else:
+            stream.value()
+    if not has_pages:
+        print(f"[WARNING] 无效的数据结构: 缺少 pdf_info 字段")
+    return blocks
+
+
+def parse_result_stream(chunks: Iterable[bytes]) -> Dict[str, Any]:
+    """
+    从字节块流中解析 MinerU 结果
+
+    Args:
+        chunks: UTF-8 编码的 JSON 字节块，如 response.iter_content(...)
+
+    Returns:
+        dict: 除 info 外的顶层字段；info 为对象时替换为 blocks 块列表
+    """
+    stream = _JSONStream(chunks)
+    result: Dict[str, Any] = {}
+    for key in stream.object_keys():
+        if key == 'info' and stream.peek() == '{':
+            result['blocks'] = _read_info_blocks(stream)
+        else:
+            result[key] = stream.value()
+    stream.expect_end()
+    return result
+
+
+def iter_file_chunks(f: BinaryIO, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """按固定大小读取二进制文件对象"""
+    return iter(lambda: f.read(chunk_size), b'')
+
+
+def parse_result_file(f: BinaryIO) -> Dict[str, Any]:
+    """从二进制文件对象（如 zip 中的 result.json）流式解析 MinerU 结果"""
+    return parse_result_stream(iter_file_chunks(f))
+
+
+def load_middle_json_blocks(path: str) -> List[Dict[str, Any]]:
+    """流式读取 middle_json 文件并提取块列表"""
+    with open(path, 'rb') as f:
+        return _read_info_blocks(_JSONStream(iter_file_chunks(f)))
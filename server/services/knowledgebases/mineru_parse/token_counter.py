@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分块使用的 token 计数
+
+各分块策略会对相同或重叠的文本反复计数。这里为 tiktoken 编码器加一层按内容哈希的
+有界 LRU 缓存，每段文本只编码一次；批量计数时未缓存的文本通过 encode_ordinary_batch
+多线程编码；合并文本的 token 数由各部分的计数相加得到，不再重新编码拼接后的文本。
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List
+
+# 缓存的计数结果条数上限
+TOKEN_MEMO_MAX_ENTRIES = 200_000
+# 未缓存文本达到该数量时使用多线程批量编码
+BATCH_ENCODE_MIN_TEXTS = 16
+BATCH_ENCODE_THREADS = 4
+
+
+def _content_key(text: str) -> bytes:
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+class TokenCounter:
+    """带内容哈希缓存的 token 计数器"""
+
+    def __init__(self, encoding, max_entries: int = TOKEN_MEMO_MAX_ENTRIES):
+        self.encoding = encoding
+        self.max_entries = max_entries
+        self._memo: "OrderedDict[bytes, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0}
+
+    def _get(self, key: bytes):
+        with self._lock:
+            count = self._memo.get(key)
+            if count is None:
+                self._stats['misses'] += 1
+                return None
+            self._memo.move_to_end(key)
+            self._stats['hits'] += 1
+            return count
+
+    def _put(self, key: bytes, count: int):
+        with self._lock:
+            self._memo[key] = count
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+
+    def count(self, text: str) -> int:
+        """单段文本的 token 数"""
+        if not text:
+            return 0
+        key = _content_key(text)
+        count = self._get(key)
+        if count is None:
+            count = len(self.encoding.encode_ordinary(text))
+            self._put(key, count)
+        return count
+
+    def count_many(self, texts: Iterable[str]) -> List[int]:
+        """批量计数，返回与 texts 顺序一致的 token 数；重复和已缓存的文本不再编码"""
+        texts = list(texts)
+        keys = [_content_key(text) if text else None for text in texts]
+        counts: List[int] = [0] * len(texts)
+        missing: Dict[bytes, str] = {}
+        for i, (text, key) in enumerate(zip(texts, keys)):
+            if key is None:
+                continue
+            count = self._get(key) if key not in missing else None
+            if count is None:
+                missing[key] = text
+            else:
+                counts[i] = count
+
+        if missing:
+            missing_texts = list(missing.values())
+            if len(missing_texts) >= BATCH_ENCODE_MIN_TEXTS:
+                encoded = self.encoding.encode_ordinary_batch(missing_texts, num_threads=BATCH_ENCODE_THREADS)
+            else:
+                encoded = [self.encoding.encode_ordinary(text) for text in missing_texts]
+            fresh = {key: len(tokens) for key, tokens in zip(missing, encoded)}
+            for key, count in fresh.items():
+                self._put(key, count)
+            for i, key in enumerate(keys):
+                if key in fresh:
+                    counts[i] = fresh[key]
+        return counts
+
+    def count_joined(self, counts: Iterable[int], separator: str = "\n\n") -> int:
+        """按 separator 拼接后文本的 token 数（由各部分计数相加，BPE 在边界处可能有 ±1 的差异）"""
+        counts = [count for count in counts]
+        if not counts:
+            return 0
+        return sum(counts) + self.count(separator) * (len(counts) - 1)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._memo)
+        return stats
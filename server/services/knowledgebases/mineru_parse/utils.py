@@ -13,7 +13,6 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 #
-import mysql.connector
 import os
 import tiktoken
 import tempfile
@@ -31,6 +30,9 @@ except ImportError:
     print("Warning: markdown-it-py not available. Please install with: pip install markdown-it-py")
 
 from ...config import CONFIG, APP_CONFIG
+from .block_cache import get_block_cache
+from .markdown_segmenter import iter_markdown_segments, SEGMENT_TABLE
+from .token_counter import TokenCounter
 
 
 # 分块模式配置
@@ -187,307 +189,146 @@ tiktoken_cache_dir = tempfile.gettempdir()
 os.environ["TIKTOKEN_CACHE_DIR"] = tiktoken_cache_dir
 # encoder = tiktoken.encoding_for_model("gpt-3.5-turbo")
 encoder = tiktoken.get_encoding("cl100k_base")
+token_counter = TokenCounter(encoder)
 
 
 def num_tokens_from_string(string: str, model_name: str = "cl100k_base") -> int:
     """Returns the number of tokens in a text string."""
     try:
-        return len(encoder.encode(string))
+        return token_counter.count(string)
     except Exception:
         return 0
 
 
+def num_tokens_from_strings(strings) -> list:
+    """Returns the number of tokens of each string, encoding uncached strings in one batch."""
+    strings = list(strings)
+    try:
+        return token_counter.count_many(strings)
+    except Exception:
+        return [num_tokens_from_string(string) for string in strings]
+
+
 def truncate(string: str, max_len: int) -> str:
     """Returns truncated text if the length of text exceed max_len."""
     return encoder.decode(encoder.encode(string)[:max_len])
 
 
-def _extract_tables_and_remainder_md(txt: str) -> (str, list[str]):
+def _table_segment_to_chunk(table_md: str) -> str:
+    """管道表格转换为 HTML，HTML 表格原样保留"""
+    if table_md.lstrip().startswith('<'):
+        return table_md
+    try:
+        return md_to_html(table_md, extensions=['markdown.extensions.tables'])
+    except Exception as e:
+        # If conversion fails, add raw table markdown as a fallback
+        print(f"[WARNING] Failed to convert table to HTML: {e}. Added raw table markdown.")
+        return table_md
+
+
+class _NaiveTextMerger:
     """
-    Extracts markdown tables from text and returns the remaining text
-    and a list of table strings.
-    This is a simplified implementation.
+    Merges text lines into chunks respecting token limits (RAGFlow naive_merge logic).
     """
-    lines = txt.split('\n')
-    tables = []
-    remainder_lines = []
-    in_table = False
-    current_table = []
-
-    for line in lines:
-        stripped_line = line.strip()
-        # Basic check for table row (starts and ends with |)
-        is_table_line = stripped_line.startswith('|') and stripped_line.endswith('|')
-        # Basic check for table separator (e.g., |---|---| or |:---|:---:|)
-        is_separator_line = True
-        if is_table_line and '-' in stripped_line:
-            parts = [p.strip() for p in stripped_line[1:-1].split('|')]
-            if not all(set(p) <= set('-:') for p in parts if p): # allow only -, :
-                is_separator_line = False
-            if not parts: # Handles | | case
-                is_separator_line = False
-        else:
-            is_separator_line = False
-
-
-        if is_table_line or (in_table and stripped_line): # Continue table if already in it and line is not empty
-            if not in_table and is_table_line and not is_separator_line: # Potential start of a new table (header)
-                # Look ahead for a separator line
-                next_line_index = lines.index(line) + 1
-                if next_line_index < len(lines):
-                    next_line_stripped = lines[next_line_index].strip()
-                    next_is_separator = next_line_stripped.startswith('|') and next_line_stripped.endswith('|') and '-' in next_line_stripped
-                    if next_is_separator:
-                        parts_next = [p.strip() for p in next_line_stripped[1:-1].split('|')]
-                        if not all(set(p) <= set('-:') for p in parts_next if p):
-                            next_is_separator = False
-                        if not parts_next:
-                            next_is_separator = False
-                    if next_is_separator:
-                        in_table = True
-                        current_table.append(line)
-                    else: # Not a table header
-                        remainder_lines.append(line)
-                else: # No next line
-                     remainder_lines.append(line)
-            elif in_table:
-                current_table.append(line)
-                if not is_table_line and not stripped_line: # Empty line might end the table
-                    tables.append("\n".join(current_table))
-                    current_table = []
-                    in_table = False
-                    remainder_lines.append(line) # Add the empty line to remainder
-            else: # A line that looks like a table line but isn't starting a valid table
-                remainder_lines.append(line)
-
-        elif in_table and not stripped_line : # An empty line definitely ends a table
-            tables.append("\n".join(current_table))
-            current_table = []
-            in_table = False
-            remainder_lines.append(line) # Add the empty line to remainder
-        elif in_table and not is_table_line : # A non-table line also ends a table
-            tables.append("\n".join(current_table))
-            current_table = []
-            in_table = False
-            remainder_lines.append(line) # Add this line to remainder
-        else:
-            remainder_lines.append(line)
 
-    if current_table: # Add any remaining table
-        tables.append("\n".join(current_table))
+    def __init__(self, chunk_token_num: int):
+        self.chunk_token_num = chunk_token_num
+        self.chunks = []
+        self.parts = []
+        self.token_count = 0
+
+    def add_lines(self, text: str):
+        lines = text.split("\n")
+        for sec_line, line_token_count in zip(lines, num_tokens_from_strings(lines)):
+            if sec_line.strip() and line_token_count > 3 * self.chunk_token_num:
+                # Split long lines, trying to preserve original spacing if line was just very long
+                mid_point = len(sec_line) // 2
+                self._add_section(sec_line[:mid_point])
+                self._add_section(sec_line[mid_point:])
+            else:
+                # Keep empty lines to respect original newlines for merging
+                self._add_section(sec_line, line_token_count)
+
+    def _add_section(self, section_text: str, section_token_count: int = None):
+        chunk_token_num = self.chunk_token_num
+        if section_token_count is None:
+            section_token_count = num_tokens_from_string(section_text)
+
+        if not section_text.strip() and not self.parts:  # Skip leading empty/whitespace sections
+            return
+
+        if self.token_count + section_token_count <= chunk_token_num:
+            self.parts.append(section_text)
+            self.token_count += section_token_count
+            return
+
+        # Finalize current chunk if it's not empty
+        self.flush()
+        if section_token_count > 3 * chunk_token_num:  # Drastically oversized, needs splitting
+            mid = len(section_text) // 2
+            self.chunks.append(section_text[:mid].strip())
+            self.chunks.append(section_text[mid:].strip())
+        elif section_token_count > chunk_token_num:  # Tolerable oversize
+            self.chunks.append(section_text.strip())
+        else:  # Start new chunk
+            self.parts = [section_text]
+            self.token_count = section_token_count
+
+    def flush(self):
+        if self.parts:
+            self.chunks.append("\n".join(self.parts).strip())
+        self.parts = []
+        self.token_count = 0
 
-    return "\n".join(remainder_lines), tables
 
 def split_markdown_to_chunks(txt, chunk_token_num=128, delimiter="\n!?。；！？"):
     """
     Splits markdown text into chunks, processing tables separately and merging text sections
     to be consistent with RAGFlow's naive.py markdown handling.
+
+    Segments come from iter_markdown_segments in document order: each table becomes its own
+    chunk (pipe tables converted to HTML) and closes the text chunk before it, all other
+    segments are merged line by line.
     """
     if not txt or not txt.strip():
         return []
 
-    # 1. Extract tables and remainder text
-    remainder_text, extracted_tables = _extract_tables_and_remainder_md(txt)
-    
-    processed_chunks = []
-    
-    # 2. Process tables: convert to HTML and add as individual chunks
-    for table_md in extracted_tables:
-        if table_md.strip():
-            # Ensure markdown.extensions.tables is available
-            try:
-                table_html = md_to_html(table_md, extensions=['markdown.extensions.tables'])
-                processed_chunks.append(table_html)
-            except Exception as e:
-                # If conversion fails, add raw table markdown as a fallback
-                # Or log an error and skip
-                processed_chunks.append(table_md)
-                print(f"[WARNING] Failed to convert table to HTML: {e}. Added raw table markdown.")
-
-
-    # 3. Initial splitting of remainder_text (non-table text)
-    initial_sections = []
-    if remainder_text and remainder_text.strip():
-        for sec_line in remainder_text.split("\n"):
-            line_content = sec_line.strip()
-            if not line_content: # Keep empty lines if they are part of structure or to respect original newlines for merging
-                initial_sections.append(sec_line) # Add the original line with its spacing
-                continue
-
-            if num_tokens_from_string(sec_line) > 3 * chunk_token_num:
-                # Split long lines, trying to preserve original spacing if line was just very long
-                mid_point = len(sec_line) // 2
-                initial_sections.append(sec_line[:mid_point])
-                initial_sections.append(sec_line[mid_point:])
-            else:
-                initial_sections.append(sec_line)
-    
-    # 4. Merge initial text sections into chunks respecting token limits (naive_merge logic)
-    # This part needs to be careful about document order with tables.
-    # The strategy here is to process text between tables.
-    # However, _extract_tables_and_remainder_md might not preserve order perfectly if tables are interspersed.
-    # For simplicity, we'll process all tables first, then all text. A more sophisticated approach
-    # would interleave them based on original position.
-
-    final_text_chunks = []
-    current_chunk_parts = []
-    current_token_count = 0
-
-    for section_text in initial_sections:
-        section_token_count = num_tokens_from_string(section_text)
-        
-        if not section_text.strip() and not current_chunk_parts: # Skip leading empty/whitespace sections
-            continue
-
-        if current_token_count + section_token_count <= chunk_token_num:
-            current_chunk_parts.append(section_text)
-            current_token_count += section_token_count
+    merger = _NaiveTextMerger(chunk_token_num)
+    for segment in iter_markdown_segments(txt):
+        if segment.type == SEGMENT_TABLE:
+            merger.flush()
+            if segment.content.strip():
+                merger.chunks.append(_table_segment_to_chunk(segment.content))
         else:
-            # Finalize current_chunk if it's not empty
-            if current_chunk_parts:
-                final_text_chunks.append("\n".join(current_chunk_parts).strip())
-            
-            # Start a new chunk with the current section
-            # If a single section itself is too large, it will be added as is.
-            # RAGFlow's naive_merge might have more sophisticated splitting for oversized single sections.
-            # For now, we add it as is or split it if it's drastically oversized.
-            if section_token_count > chunk_token_num and section_token_count <= 3 * chunk_token_num: # Tolerable oversize
-                 final_text_chunks.append(section_text.strip())
-                 current_chunk_parts = []
-                 current_token_count = 0
-            elif section_token_count > 3 * chunk_token_num: # Drastically oversized, needs splitting
-                # This split is basic, RAGFlow might be more nuanced
-                mid = len(section_text) // 2
-                final_text_chunks.append(section_text[:mid].strip())
-                final_text_chunks.append(section_text[mid:].strip())
-                current_chunk_parts = []
-                current_token_count = 0
-            else: # Start new chunk
-                current_chunk_parts = [section_text]
-                current_token_count = section_token_count
-    
-    # Add any remaining part as the last chunk
-    if current_chunk_parts:
-        final_text_chunks.append("\n".join(current_chunk_parts).strip())
-
-    # Combine table HTML chunks and text chunks.
-    # This simple combination appends all text chunks after all table chunks.
-    # A more accurate implementation would require knowing the original order.
-    # Given the current _extract_tables_and_remainder_md, this is a limitation.
-    all_chunks = [chunk for chunk in processed_chunks if chunk.strip()] # Add table chunks first
-    all_chunks.extend([chunk for chunk in final_text_chunks if chunk.strip()])
-    
-    return all_chunks
+            merger.add_lines(segment.content)
+    merger.flush()
+
+    return [chunk for chunk in merger.chunks if chunk.strip()]
 
 
-_blocks_cache = {}
 def get_blocks_from_md(md_file_path):
-    if md_file_path in _blocks_cache:
-        return _blocks_cache[md_file_path]
-    
-    json_path = md_file_path.replace('.md', '_middle.json')
+    """
+    获取 md 文件对应的块列表（用于分块定位）
+
+    优先通过 mmap 读取解析时保存的块存储文件（*_blocks.bin），不存在时回退为读取 *_middle.json；
+    结果保存在按内存上限淘汰的分块定位缓存中，文档处理完成后由 release_blocks_for_md 释放。
+    """
     try:
-        with open(json_path, 'r') as f:
-            data = json.load(f)
-            block_list = []
-            
-            # 检查数据结构类型
-            if 'pdf_info' not in data:
-                print(f"[WARNING] 无效的数据结构: 缺少 pdf_info 字段")
-                _blocks_cache[md_file_path] = []
-                return []
-            
-            for page_idx, page in enumerate(data['pdf_info']):
-                # Pipeline模式：有preproc_blocks字段
-                if 'preproc_blocks' in page:
-                    print(f"[INFO] 检测到Pipeline模式数据结构")
-                    for block in page['preproc_blocks']:
-                        bbox = block.get('bbox')
-                        if not bbox:
-                            continue
-                        
-                        # 提取文本内容
-                        text_content = ''
-                        if 'lines' in block:
-                            for line in block['lines']:
-                                if 'spans' in line:
-                                    for span in line['spans']:
-                                        if 'content' in span:
-                                            text_content += span['content']
-                        
-                        block_data = {
-                            'bbox': bbox,
-                            'type': block.get('type', 'unknown'),
-                            'text': text_content.strip(),
-                            'page_idx': page_idx,
-                            'index': block.get('index', 0),
-                            'source_mode': 'pipeline'
-                        }
-                        block_list.append(block_data)
-                
-                # VLM模式：使用para_blocks字段（数组格式）
-                elif 'para_blocks' in page:
-                    print(f"[INFO] 检测到VLM模式数据结构")
-                    para_blocks = page['para_blocks']
-                    if isinstance(para_blocks, list):
-                        # VLM模式: para_blocks是数组
-                        for block in para_blocks:
-                            bbox = block.get('bbox')
-                            if not bbox:
-                                continue
-                            
-                            # 提取文本内容
-                            text_content = ''
-                            if 'lines' in block:
-                                for line in block['lines']:
-                                    if 'spans' in line:
-                                        for span in line['spans']:
-                                            if 'content' in span:
-                                                text_content += span['content']
-                            
-                            block_data = {
-                                'bbox': bbox,
-                                'type': block.get('type', 'unknown'),
-                                'text': text_content.strip(),
-                                'page_idx': page_idx,
-                                'index': block.get('index', 0),
-                                'source_mode': 'vlm'
-                            }
-                            block_list.append(block_data)
-                    else:
-                        print(f"[WARNING] VLM模式para_blocks格式异常，期望数组但得到: {type(para_blocks)}")
-                
-                else:
-                    print(f"[WARNING] 第{page_idx}页缺少preproc_blocks和para_blocks字段")
-                    # 尝试其他可能的字段名
-                    possible_fields = ['blocks', 'text_blocks', 'content_blocks']
-                    found = False
-                    for field_name in possible_fields:
-                        if field_name in page:
-                            print(f"[INFO] 尝试使用字段: {field_name}")
-                            found = True
-                            break
-                    
-                    if not found:
-                        print(f"[WARNING] 无法识别页面数据结构，跳过第{page_idx}页")
-            
-            print(f"[INFO] 从{json_path}提取了{len(block_list)}个块")
-            _blocks_cache[md_file_path] = block_list
-            return block_list
-            
-    except FileNotFoundError:
-        print(f"[WARNING] JSON文件不存在: {json_path}")
-        _blocks_cache[md_file_path] = []
-        return []
+        return get_block_cache().get_blocks(md_file_path)
     except json.JSONDecodeError as e:
         print(f"[ERROR] JSON解析失败: {e}")
-        _blocks_cache[md_file_path] = []
         return []
     except Exception as e:
         print(f"[ERROR] 获取块列表失败: {e}")
-        _blocks_cache[md_file_path] = []
         return []
 
+
+def release_blocks_for_md(md_file_path):
+    """释放 md 文件对应的块列表和匹配索引缓存（文档处理完成后调用）"""
+    released = get_block_cache().release(md_file_path)
+    if released:
+        print(f"[INFO] 已释放分块定位缓存: {md_file_path}")
+
 def longest_common_substring_length(str1, str2):
     """计算两个字符串的最长公共子串长度"""
     if not str1 or not str2:
@@ -509,90 +350,36 @@ def longest_common_substring_length(str1, str2):
     return max_length
 
 
+def get_block_matcher(md_file_path):
+    """获取（并缓存）md 文件对应 block 列表上的位置匹配索引"""
+    return get_block_cache().get_matcher(md_file_path)
+
+
 def get_bbox_for_chunk(md_file_path, chunk_content):
     """
     根据 md 文件路径和 chunk 内容，返回构成该 chunk 的连续 block 的 bbox 列表。
-    该算法采用混合评分机制寻找最佳"锚点" block，该评分兼顾了最长公共子串的长度和其占 block 自身长度的比例。
-    然后从该锚点向前后扩展，寻找同样存在于 chunk 中的连续 block。
-    这旨在平衡精确匹配和部分（截断）匹配的场景。
+    锚点 block 取与 chunk 最长公共子串最长的 block，然后从该锚点向前后扩展，
+    寻找同样存在于 chunk 中的连续 block。
+    候选 block 通过一次性建立的 n-gram 倒排索引召回，最长公共子串使用后缀自动机线性计算，
+    详见 block_matcher.BlockMatcher。
     
     支持Pipeline模式和VLM模式的数据结构。
     """
     try:
-        block_list = get_blocks_from_md(md_file_path)
-        if not block_list:
+        matcher = get_block_matcher(md_file_path)
+        if not len(matcher):
             print(f"[WARNING] 无法获取块列表，跳过位置信息获取")
             return None
 
-        chunk_content_clean = chunk_content.strip()
-        if not chunk_content_clean:
-            return None
-
-        # 检查是否为VLM模式
-        is_vlm_mode = any(block.get('source_mode', '').startswith('vlm') for block in block_list)
-        
-        if is_vlm_mode:
-            print(f"[INFO] 检测到VLM模式数据，处理坐标信息")
-
-        # 计算每个block与chunk的匹配分数
-        scored_blocks = []
-        for i, block in enumerate(block_list):
-            block_text = block.get('text', '').strip()
-            if not block_text:
-                continue
-            
-            # 计算最长公共子串
-            lcs_length = longest_common_substring_length(chunk_content_clean, block_text)
-            if lcs_length == 0:
-                continue
-                
-            # 混合评分：LCS长度 + 覆盖率
-            coverage_score = lcs_length / len(block_text) if len(block_text) > 0 else 0
-            combined_score = lcs_length * 0.7 + coverage_score * len(block_text) * 0.3
-            
-            scored_blocks.append((i, combined_score, lcs_length))
-
-        if not scored_blocks:
-            print(f"[WARNING] 未找到匹配的块")
+        if not chunk_content or not chunk_content.strip():
             return None
 
-        # 找到最佳锚点
-        scored_blocks.sort(key=lambda x: x[1], reverse=True)
-        anchor_idx = scored_blocks[0][0]
-        
-        # 从锚点扩展
-        matched_blocks = [block_list[anchor_idx]]
-        
-        # 向前扩展
-        for i in range(anchor_idx - 1, -1, -1):
-            block_text = block_list[i].get('text', '').strip()
-            if block_text and block_text in chunk_content_clean:
-                matched_blocks.insert(0, block_list[i])
-            else:
-                break
-        
-        # 向后扩展
-        for i in range(anchor_idx + 1, len(block_list)):
-            block_text = block_list[i].get('text', '').strip()
-            if block_text and block_text in chunk_content_clean:
-                matched_blocks.append(block_list[i])
-            else:
-                break
-        
-        # 提取位置信息
-        positions = []
-        for idx, block in enumerate(matched_blocks):
-            bbox = block.get('bbox')
-            page_number = block.get('page_idx')
-            if bbox and page_number is not None:
-                position = [page_number, bbox[0], bbox[2], bbox[1], bbox[3]]
-                positions.append(position)
-        
+        positions = matcher.positions_for_chunk(chunk_content)
         if positions:
             print(f"[INFO] 为chunk找到{len(positions)}个位置")
             return positions
         else:
-            print(f"[WARNING] 未能提取到有效的位置信息")
+            print(f"[WARNING] 未找到匹配的块")
             return None
             
     except Exception as e:
@@ -601,50 +388,10 @@ def get_bbox_for_chunk(md_file_path, chunk_content):
 
 
 def update_document_progress(doc_id, progress=None, message=None, status=None, run=None, chunk_count=None, process_duration=None):
-    """更新数据库中文档的进度和状态"""
-    conn = None
-    cursor = None
-    try:
-        from database import get_db_connection
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        updates = []
-        params = []
-
-        if progress is not None:
-            updates.append("progress = %s")
-            params.append(float(progress))
-        if message is not None:
-            updates.append("progress_msg = %s")
-            params.append(message)
-        if status is not None:
-            updates.append("status = %s")
-            params.append(status)
-        if run is not None:
-            updates.append("run = %s")
-            params.append(run)
-        if chunk_count is not None:
-             updates.append("chunk_num = %s")
-             params.append(chunk_count)
-        if process_duration is not None:
-            updates.append("process_duation = %s")
-            params.append(process_duration)
-
-
-        if not updates:
-            return
-
-        query = f"UPDATE document SET {', '.join(updates)} WHERE id = %s"
-        params.append(doc_id)
-        cursor.execute(query, params)
-        conn.commit()
-    except Exception as e:
-        print(f"[Parser-ERROR] 更新文档 {doc_id} 进度失败: {e}")
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+    """更新数据库中文档的进度和状态（进度合并写入，状态变更立即写入）"""
+    from ..progress_writer import update_document_progress as _submit_progress
+    _submit_progress(doc_id, progress=progress, message=message, status=status, run=run,
+                     chunk_count=chunk_count, process_duration=process_duration)
 
 
 def split_markdown_to_chunks_smart(txt, chunk_token_num=256, min_chunk_tokens=10):
@@ -958,12 +705,16 @@ def split_markdown_to_chunks_advanced(txt, chunk_token_num=256, min_chunk_tokens
 def _apply_size_control_and_optimization(chunks, min_tokens, target_tokens, max_tokens):
     """应用动态大小控制和优化策略"""
     optimized_chunks = []
+
+    # 一次性批量计数所有节点，之后的分块大小由节点计数相加得到
+    num_tokens_from_strings(
+        node_info.get('content', '') for chunk in chunks for node_info in chunk.get('nodes', [])
+    )
     
     i = 0
     while i < len(chunks):
         chunk = chunks[i]
-        chunk_content = _render_header_chunk(chunk)
-        chunk_tokens = num_tokens_from_string(chunk_content)
+        chunk_tokens = _header_chunk_tokens(chunk)
         
         # 检查特殊内容类型
         has_special_content = _has_special_content(chunk)
@@ -1092,9 +843,9 @@ def _try_merge_with_next(current_chunk, all_chunks, current_index, target_tokens
     next_chunk = all_chunks[current_index + 1]
     
     # 计算合并后的大小
-    current_content = _render_header_chunk(current_chunk)
-    next_content = _render_header_chunk(next_chunk)
-    merged_tokens = num_tokens_from_string(current_content + "\n\n" + next_content)
+    merged_tokens = token_counter.count_joined(
+        [_header_chunk_tokens(current_chunk), _header_chunk_tokens(next_chunk)]
+    )
     
     # 如果合并后大小合适
     if merged_tokens <= target_tokens * 1.2:  # 允许轻微超出目标大小
@@ -1383,6 +1134,20 @@ def _render_header_chunk(chunk_info):
     return "\n\n".join(content_parts).strip()
 
 
+def _header_chunk_tokens(chunk_info):
+    """_render_header_chunk 渲染结果的 token 数，由标题上下文和各节点的计数相加得到"""
+    part_counts = []
+    chunk_has_header = any(node['type'] == 'heading' for node in chunk_info.get('nodes', []))
+    if not chunk_has_header and chunk_info.get('headers'):
+        context_header = _get_most_relevant_header(chunk_info['headers'])
+        if context_header:
+            part_counts.append(num_tokens_from_string(context_header))
+    for node_info in chunk_info.get('nodes', []):
+        if node_info.get('content', '').strip():
+            part_counts.append(num_tokens_from_string(node_info['content']))
+    return token_counter.count_joined(part_counts)
+
+
 def _get_most_relevant_header(headers):
     """获取最相关的上下文标题（原始版本）"""
     if not headers:
@@ -1449,7 +1214,7 @@ def split_markdown_to_chunks_strict_regex(txt, chunk_token_num=256, min_chunk_to
         
         print(f"📊 [DEBUG] 正则分块结果: {len(final_chunks)} 个分块")
         if final_chunks:
-            token_counts = [num_tokens_from_string(chunk) for chunk in final_chunks]
+            token_counts = num_tokens_from_strings(final_chunks)
             print(f"📈 [DEBUG] Token分布: {min(token_counts)}-{max(token_counts)} (平均: {sum(token_counts)/len(token_counts):.1f})")
         
         return final_chunks
@@ -0,0 +1,76 @@
+import os
+import tempfile
+
+# 每次从 MinIO 读取的块大小
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def stream_object_to_file(minio_client, bucket_name, object_name, file_obj, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """
+    按块把 MinIO 对象写入文件对象，内存占用不超过一个块
+
+    Returns:
+        int: 写入的字节数
+    """
+    response = minio_client.get_object(bucket_name, object_name)
+    written = 0
+    try:
+        for data in response.stream(chunk_size):
+            file_obj.write(data)
+            written += len(data)
+    finally:
+        response.close()
+        response.release_conn()
+    return written
+
+
+def download_object_to_path(minio_client, bucket_name, object_name, file_path, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """
+    流式下载 MinIO 对象到本地文件（先写临时文件，完成后再改名，避免留下不完整的文件）
+
+    Returns:
+        int: 文件大小（字节）
+    """
+    part_path = f"{file_path}.part"
+    try:
+        with open(part_path, 'wb') as f:
+            written = stream_object_to_file(minio_client, bucket_name, object_name, f, chunk_size)
+        os.replace(part_path, file_path)
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+    return written
+
+
+def download_object_to_tempfile(minio_client, bucket_name, object_name, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """
+    流式下载 MinIO 对象到匿名临时文件
+
+    不使用 SpooledTemporaryFile：Python 3.10 中它没有 seekable()，zipfile（openpyxl、pandas 读取 xlsx）无法打开。
+
+    Returns:
+        tuple: (已定位到开头的文件对象, 字节数)，调用方负责 close()
+    """
+    temp_file = tempfile.TemporaryFile()
+    try:
+        written = stream_object_to_file(minio_client, bucket_name, object_name, temp_file, chunk_size)
+    except Exception:
+        temp_file.close()
+        raise
+    temp_file.seek(0)
+    return temp_file, written
+
+
+def tempfile_from_bytes(content):
+    """把已有的字节内容写入匿名临时文件，返回定位到开头的文件对象"""
+    temp_file = tempfile.TemporaryFile()
+    temp_file.write(content)
+    temp_file.seek(0)
+    return temp_file
+
+
+def write_bytes_to_path(content, file_path):
+    """把已有的字节内容写入本地文件"""
+    with open(file_path, 'wb') as f:
+        f.write(content)
+    return len(content)
@@ -0,0 +1,525 @@
+import heapq
+import itertools
+import queue
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from ..config import PARSE_SCHEDULER_CONFIG
+
+# 解析阶段
+STAGE_DOWNLOAD = "download"
+STAGE_MINERU = "mineru"
+STAGE_CHUNKING = "chunking"
+STAGE_INGESTION = "ingestion"
+
+# 数值越小越先执行
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+
+# 文档任务状态
+JOB_QUEUED = "queued"
+JOB_WAITING = "waiting"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+_FINISHED_STATES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+# 等待阶段配额时检查取消标记的间隔（秒）
+_ACQUIRE_POLL_INTERVAL = 0.5
+# 已结束的文档任务保留时长（秒），期间仍可查询其状态；之后不属于运行中批量任务的会被清理
+_FINISHED_JOB_RETENTION = 3600
+# 清理已结束任务的最小间隔（秒）
+_PRUNE_INTERVAL = 60
+
+
+class ParseCancelled(Exception):
+    """解析任务已被取消"""
+
+
+class _StageGate:
+    """
+    阶段并发闸门
+
+    与信号量不同，等待者按 (优先级, 提交顺序) 依次放行：先完成上一阶段的早提交文档先进入下一阶段，
+    使各阶段之间形成先进先出的流水线，高优先级文档也能在各阶段插队。
+    """
+
+    def __init__(self, limit):
+        self.limit = max(1, limit)
+        self.active = 0
+        self._waiters = []
+        self._cond = threading.Condition()
+
+    @property
+    def waiting(self):
+        return len(self._waiters)
+
+    def acquire(self, order, cancel_check=None):
+        """order 为可比较的唯一键；cancel_check 在等待期间周期性调用，抛出异常即放弃等待"""
+        with self._cond:
+            heapq.heappush(self._waiters, order)
+            try:
+                while self.active >= self.limit or self._waiters[0] != order:
+                    self._cond.wait(_ACQUIRE_POLL_INTERVAL)
+                    if cancel_check:
+                        cancel_check()
+            except BaseException:
+                self._waiters.remove(order)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+                raise
+            heapq.heappop(self._waiters)
+            self.active += 1
+            # 仍有空闲配额时唤醒下一个等待者
+            self._cond.notify_all()
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+
+class _ParseJob:
+    """单个文档的解析任务"""
+
+    def __init__(self, doc_id, doc_name, handler, priority, kb_id=None, on_finish=None):
+        self.doc_id = doc_id
+        self.doc_name = doc_name
+        self.handler = handler
+        self.priority = priority
+        self.kb_id = kb_id
+        self.finish_callbacks = [on_finish] if on_finish else []
+        self.seq = None
+        self.holds_pipeline_slot = False
+        self.state = JOB_QUEUED
+        self.stage = None
+        self.error = None
+        self.cancel_event = threading.Event()
+        self.submit_time = time.time()
+        self.start_time = None
+        self.end_time = None
+
+    @property
+    def finished(self):
+        return self.state in _FINISHED_STATES
+
+    def raise_if_cancelled(self):
+        if self.cancel_event.is_set():
+            raise ParseCancelled("解析任务已取消")
+
+    def to_dict(self):
+        return {
+            "id": self.doc_id,
+            "name": self.doc_name,
+            "state": self.state,
+            "stage": self.stage,
+            "priority": self.priority,
+            "error": self.error,
+        }
+
+
+class _BatchTask:
+    """知识库批量解析任务"""
+
+    def __init__(self, kb_id, jobs, priority):
+        self.kb_id = kb_id
+        self.jobs = jobs
+        self.priority = priority
+        self.status = "running" if jobs else "completed"
+        self.start_time = time.time()
+        self.end_time = None if jobs else self.start_time
+        self.cancel_requested = False
+        self.message = f"共找到 {len(jobs)} 个文档待解析。" if jobs else "没有需要解析的文档。"
+
+
+class ParseScheduler:
+    """
+    文档解析调度器
+
+    文档任务按 (优先级, 提交顺序) 排队，由固定数量的工作线程并行执行；
+    下载、MinerU 调用、分块、入库各阶段再分别限制并发，避免压垮 MinerU 等下游服务。
+    解析代码通过 stage() 申请阶段配额，并在阶段边界和进度回调中响应取消。
+
+    各阶段按流水线方式重叠执行：文档 N 分块、入库时，文档 N+1 已可以调用 MinerU。
+    已进入 MinerU 阶段但尚未完成入库的文档数不超过 mineru 并发数 + pipeline_buffer，
+    相当于 MinerU 与后续阶段之间的有界队列；入库跟不上时 MinerU 暂停领取新文档，
+    避免解析结果在磁盘上无限堆积。
+    """
+
+    def __init__(self, max_workers=8, stage_limits=None, pipeline_buffer=4):
+        self.stage_limits = {name: max(1, limit) for name, limit in (stage_limits or {}).items()}
+        self._stage_gates = {name: _StageGate(limit) for name, limit in self.stage_limits.items()}
+        self.pipeline_buffer = max(0, pipeline_buffer)
+        self._pipeline_gate = None
+        if STAGE_MINERU in self.stage_limits:
+            self._pipeline_gate = _StageGate(self.stage_limits[STAGE_MINERU] + self.pipeline_buffer)
+        # 工作线程需覆盖流水线中的全部文档，否则 MinerU 会因等待空闲线程而停顿
+        pipeline_capacity = self._pipeline_gate.limit if self._pipeline_gate else 0
+        self.max_workers = max(1, max_workers, pipeline_capacity + self.stage_limits.get(STAGE_DOWNLOAD, 0))
+
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._batches = {}
+        self._last_prune = time.time()
+        self._workers = []
+        self._local = threading.local()
+
+    # ---------- 提交与取消 ----------
+
+    def submit_document(self, doc_id, handler, doc_name=None, priority=PRIORITY_HIGH, on_finish=None,
+                        attach=False):
+        """
+        提交单个文档解析任务
+
+        Args:
+            on_finish: 任务结束后的回调，参数为 (doc_id, state, error)
+            attach: 同一文档已在排队或运行时，把 on_finish 挂到该任务上，随其结束一起回调
+
+        Returns:
+            bool: 是否已提交或已挂到现有任务（同一文档已在排队或运行且 attach 为 False 时返回 False）
+        """
+        with self._lock:
+            job = self._jobs.get(doc_id)
+            if job is not None and not job.finished:
+                if attach and on_finish:
+                    job.finish_callbacks.append(on_finish)
+                    return True
+                return False
+            self._prune_finished()
+            job = _ParseJob(doc_id, doc_name, handler, priority, on_finish=on_finish)
+            self._jobs[doc_id] = job
+            self._enqueue(job)
+        self._ensure_workers()
+        return True
+
+    def submit_batch(self, kb_id, documents, handler, priority=PRIORITY_NORMAL):
+        """
+        提交知识库批量解析任务
+
+        Args:
+            kb_id: 知识库ID
+            documents: [{'id': ..., 'name': ...}, ...]
+            handler: 解析单个文档的函数，接收 doc_id，返回包含 success 的字典
+            priority: 批量任务中所有文档的优先级
+
+        Returns:
+            dict: 批量任务进度，批量任务已在运行时返回 None
+        """
+        with self._lock:
+            batch = self._batches.get(kb_id)
+            if batch is not None and batch.status == "running":
+                return None
+
+            self._prune_finished()
+            jobs = []
+            for doc in documents:
+                job = self._jobs.get(doc['id'])
+                # 已在单独解析中的文档直接纳入批量统计，不重复排队
+                if job is None or job.finished:
+                    job = _ParseJob(doc['id'], doc.get('name'), handler, priority, kb_id=kb_id)
+                    self._jobs[doc['id']] = job
+                    self._enqueue(job)
+                jobs.append(job)
+
+            batch = _BatchTask(kb_id, jobs, priority)
+            self._batches[kb_id] = batch
+            progress = self._batch_progress(batch)
+        if jobs:
+            self._ensure_workers()
+        return progress
+
+    def cancel_batch(self, kb_id):
+        """取消知识库批量解析：排队中的文档直接取消，运行中的文档在下一个检查点中止"""
+        with self._lock:
+            batch = self._batches.get(kb_id)
+            if batch is None or batch.status != "running":
+                return False
+            batch.cancel_requested = True
+            for job in batch.jobs:
+                self._cancel_job(job)
+            self._refresh_batch(batch)
+        return True
+
+    def cancel_document(self, doc_id):
+        """取消单个文档的解析"""
+        with self._lock:
+            job = self._jobs.get(doc_id)
+            if job is None or job.finished:
+                return False
+            self._cancel_job(job)
+            for batch in self._batches.values():
+                if job in batch.jobs:
+                    self._refresh_batch(batch)
+        return True
+
+    # ---------- 状态查询 ----------
+
+    def get_batch_progress(self, kb_id):
+        with self._lock:
+            batch = self._batches.get(kb_id)
+            return self._batch_progress(batch) if batch else None
+
+    def get_document_status(self, doc_id):
+        with self._lock:
+            job = self._jobs.get(doc_id)
+            return job.to_dict() if job else None
+
+    def stats(self):
+        with self._lock:
+            states = {}
+            for job in self._jobs.values():
+                states[job.state] = states.get(job.state, 0) + 1
+            return {
+                "max_workers": self.max_workers,
+                "workers_alive": sum(1 for worker in self._workers if worker.is_alive()),
+                "queued": self._queue.qsize(),
+                "jobs": states,
+                "stages": {
+                    name: {
+                        "limit": gate.limit,
+                        "active": gate.active,
+                        "waiting": gate.waiting,
+                    }
+                    for name, gate in self._stage_gates.items()
+                },
+                "pipeline": {
+                    "limit": self._pipeline_gate.limit,
+                    "in_flight": self._pipeline_gate.active,
+                    "waiting": self._pipeline_gate.waiting,
+                } if self._pipeline_gate else None,
+            }
+
+    # ---------- 阶段控制 ----------
+
+    @contextmanager
+    def stage(self, name):
+        """
+        申请阶段并发配额
+
+        在调度器工作线程中调用时会记录当前阶段、按任务优先级排队并响应取消；
+        其他线程（如同步解析接口）同样受阶段并发限制，按到达顺序排队。
+        """
+        job = getattr(self._local, 'job', None)
+        gate = self._stage_gates.get(name)
+        cancel_check = None
+        if job is not None:
+            job.raise_if_cancelled()
+            job.stage = name
+            job.state = JOB_WAITING
+            cancel_check = job.raise_if_cancelled
+            order = (job.priority, job.seq)
+            # 进入 MinerU 阶段前先占用流水线名额，直到文档处理结束才释放
+            if name == STAGE_MINERU and self._pipeline_gate is not None and not job.holds_pipeline_slot:
+                self._pipeline_gate.acquire(order, cancel_check)
+                job.holds_pipeline_slot = True
+        else:
+            order = (PRIORITY_HIGH, next(self._sequence))
+
+        acquired = False
+        if gate is not None:
+            gate.acquire(order, cancel_check)
+            acquired = True
+
+        try:
+            if job is not None:
+                job.state = JOB_RUNNING
+                job.raise_if_cancelled()
+            yield
+        finally:
+            if acquired:
+                gate.release()
+
+    def raise_if_cancelled(self):
+        """当前线程正在执行的任务已被取消时抛出 ParseCancelled"""
+        job = getattr(self._local, 'job', None)
+        if job is not None:
+            job.raise_if_cancelled()
+
+    # ---------- 内部实现 ----------
+
+    def _enqueue(self, job):
+        job.seq = next(self._sequence)
+        self._queue.put((job.priority, job.seq, job))
+
+    def _cancel_job(self, job):
+        if job.finished:
+            return
+        job.cancel_event.set()
+        if job.state == JOB_QUEUED:
+            job.state = JOB_CANCELLED
+            job.error = "解析任务已取消"
+            job.end_time = time.time()
+            job.handler = None
+
+    def _ensure_workers(self):
+        with self._lock:
+            self._workers = [worker for worker in self._workers if worker.is_alive()]
+            for i in range(len(self._workers), self.max_workers):
+                worker = threading.Thread(target=self._worker_loop, name=f"parse-worker-{i}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def _worker_loop(self):
+        while True:
+            _, _, job = self._queue.get()
+            try:
+                with self._lock:
+                    skipped = job.finished
+                    if not skipped:
+                        job.state = JOB_RUNNING
+                        job.start_time = time.time()
+                if skipped:
+                    # 排队期间已被取消
+                    self._notify_finish(job)
+                else:
+                    self._run_job(job)
+            finally:
+                self._queue.task_done()
+
+    def _run_job(self, job):
+        self._local.job = job
+        state, error = JOB_FAILED, None
+        print(f"[Parse Scheduler] 开始解析文档 {job.doc_name or job.doc_id} (ID: {job.doc_id})")
+        try:
+            job.raise_if_cancelled()
+            result = job.handler(job.doc_id)
+            if result and result.get("success"):
+                state = JOB_COMPLETED
+            else:
+                error = (result or {}).get("error") or (result or {}).get("message") or "未知错误"
+        except ParseCancelled as e:
+            error = str(e)
+        except Exception as e:
+            error = str(e)
+            print(f"[Parse Scheduler ERROR] 解析文档 {job.doc_id} 时出错: {error}")
+            traceback.print_exc()
+        finally:
+            self._local.job = None
+            if job.holds_pipeline_slot:
+                job.holds_pipeline_slot = False
+                self._pipeline_gate.release()
+
+        if state != JOB_COMPLETED and job.cancel_event.is_set():
+            state = JOB_CANCELLED
+        with self._lock:
+            job.state = state
+            job.error = error
+            job.stage = None
+            job.end_time = time.time()
+            # 任务已结束，不再持有解析函数
+            job.handler = None
+            for batch in self._batches.values():
+                if batch.status == "running" and job in batch.jobs:
+                    self._refresh_batch(batch)
+        print(f"[Parse Scheduler] 文档 {job.doc_id} 解析结束: {state}"
+              f"{'，' + error if error else ''}，耗时 {job.end_time - job.start_time:.2f} 秒")
+        self._notify_finish(job)
+
+    def _prune_finished(self):
+        """清理结束超过保留时长、且不属于运行中批量任务的文档任务，调用方需持有 self._lock"""
+        now = time.time()
+        if now - self._last_prune < _PRUNE_INTERVAL:
+            return
+        self._last_prune = now
+        in_running_batch = {
+            id(job) for batch in self._batches.values() if batch.status == "running" for job in batch.jobs
+        }
+        expired = [
+            doc_id for doc_id, job in self._jobs.items()
+            if job.finished and job.end_time is not None and now - job.end_time > _FINISHED_JOB_RETENTION
+            and id(job) not in in_running_batch
+        ]
+        for doc_id in expired:
+            del self._jobs[doc_id]
+
+    def _notify_finish(self, job):
+        with self._lock:
+            callbacks, job.finish_callbacks = job.finish_callbacks, []
+        for callback in callbacks:
+            try:
+                callback(job.doc_id, job.state, job.error)
+            except Exception as e:
+                print(f"[Parse Scheduler ERROR] 文档 {job.doc_id} 结束回调执行失败: {e}")
+
+    def _refresh_batch(self, batch):
+        """根据文档任务状态更新批量任务，调用方需持有 self._lock"""
+        if batch.status != "running":
+            return
+        counts = self._count_states(batch)
+        finished = counts[JOB_COMPLETED] + counts[JOB_FAILED] + counts[JOB_CANCELLED]
+        total = len(batch.jobs)
+        if finished < total:
+            batch.message = f"正在解析 {counts[JOB_RUNNING] + counts[JOB_WAITING]} 个文档，已完成 {finished}/{total}"
+            return
+
+        batch.end_time = time.time()
+        batch.status = "cancelled" if batch.cancel_requested else "completed"
+        duration = round(batch.end_time - batch.start_time, 2)
+        batch.message = (f"批量解析{'已取消' if batch.cancel_requested else '完成'}。总计 {total} 个，"
+                         f"成功 {counts[JOB_COMPLETED]} 个，失败 {counts[JOB_FAILED]} 个，"
+                         f"取消 {counts[JOB_CANCELLED]} 个。耗时 {duration} 秒。")
+        print(f"[Parse Scheduler] KB {batch.kb_id}: {batch.message}")
+
+    @staticmethod
+    def _count_states(batch):
+        counts = {state: 0 for state in (JOB_QUEUED, JOB_WAITING, JOB_RUNNING) + _FINISHED_STATES}
+        for job in batch.jobs:
+            counts[job.state] += 1
+        return counts
+
+    def _batch_progress(self, batch):
+        counts = self._count_states(batch)
+        finished = counts[JOB_COMPLETED] + counts[JOB_FAILED] + counts[JOB_CANCELLED]
+        return {
+            "status": batch.status,
+            "total": len(batch.jobs),
+            "current": finished,
+            "message": batch.message,
+            "start_time": batch.start_time,
+            "end_time": batch.end_time,
+            "priority": batch.priority,
+            "queued": counts[JOB_QUEUED],
+            "running": counts[JOB_RUNNING] + counts[JOB_WAITING],
+            "completed": counts[JOB_COMPLETED],
+            "failed": counts[JOB_FAILED],
+            "cancelled": counts[JOB_CANCELLED],
+            "documents": [job.to_dict() for job in batch.jobs],
+        }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_parse_scheduler():
+    """获取全局解析调度器"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = ParseScheduler(
+                    max_workers=PARSE_SCHEDULER_CONFIG.max_workers,
+                    stage_limits={
+                        STAGE_DOWNLOAD: PARSE_SCHEDULER_CONFIG.download_concurrency,
+                        STAGE_MINERU: PARSE_SCHEDULER_CONFIG.mineru_concurrency,
+                        STAGE_CHUNKING: PARSE_SCHEDULER_CONFIG.chunking_concurrency,
+                        STAGE_INGESTION: PARSE_SCHEDULER_CONFIG.ingestion_concurrency,
+                    },
+                    pipeline_buffer=PARSE_SCHEDULER_CONFIG.pipeline_buffer
+                )
+    return _scheduler
+
+
+def parse_stage(name):
+    """申请解析阶段并发配额，用法: with parse_stage(STAGE_MINERU): ..."""
+    return get_parse_scheduler().stage(name)
+
+
+def raise_if_cancelled():
+    """当前解析任务已被取消时抛出 ParseCancelled"""
+    get_parse_scheduler().raise_if_cancelled()
@@ -0,0 +1,175 @@
+import atexit
+import threading
+import time
+from database import get_db_connection
+from ..config import PROGRESS_CONFIG
+
+# 参数名 -> document 表字段
+_FIELD_COLUMNS = {
+    "progress": "progress",
+    "message": "progress_msg",
+    "status": "status",
+    "run": "run",
+    "chunk_count": "chunk_num",
+    "process_duration": "process_duation",
+}
+
+# 出现这些字段的更新视为状态变更，立即写入
+_TERMINAL_FIELDS = ("status", "run", "chunk_count", "process_duration")
+
+
+class DocumentProgressWriter:
+    """
+    文档进度合并写入器
+
+    同一文档在刷新间隔内的多次进度更新只保留最新值，由后台线程定期用多行 UPDATE 批量写入；
+    包含状态变更的更新会连同该文档尚未写入的进度立即同步写入。
+    """
+
+    def __init__(self, flush_interval_ms=500, max_batch_size=200):
+        self.flush_interval = max(flush_interval_ms, 10) / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        # 保证同一文档的写入顺序：后台批量写入和立即写入互斥
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._stats = {"submitted": 0, "written_rows": 0, "statements": 0}
+
+    def submit(self, doc_id, progress=None, message=None, status=None, run=None, chunk_count=None, process_duration=None):
+        """提交一次进度更新"""
+        fields = {
+            "progress": float(progress) if progress is not None else None,
+            "message": message,
+            "status": status,
+            "run": run,
+            "chunk_count": chunk_count,
+            "process_duration": process_duration,
+        }
+        fields = {key: value for key, value in fields.items() if value is not None}
+        if not fields:
+            return
+
+        if any(key in fields for key in _TERMINAL_FIELDS):
+            with self._write_lock:
+                with self._pending_lock:
+                    self._stats["submitted"] += 1
+                    merged = self._pending.pop(doc_id, {})
+                merged.update(fields)
+                self._write({doc_id: merged})
+            return
+
+        with self._pending_lock:
+            self._stats["submitted"] += 1
+            self._pending.setdefault(doc_id, {}).update(fields)
+        self._ensure_thread()
+
+    def flush(self):
+        """立即写入所有待写入的进度"""
+        with self._write_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+            if pending:
+                self._write(pending)
+
+    def stats(self):
+        with self._pending_lock:
+            return dict(self._stats, pending=len(self._pending))
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="document-progress-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[Parser-ERROR] 批量写入文档进度失败: {e}")
+
+    def _write(self, updates):
+        """按更新字段分组，每组用一条 CASE 语句批量更新"""
+        groups = {}
+        for doc_id, fields in updates.items():
+            groups.setdefault(tuple(sorted(fields)), []).append(doc_id)
+
+        conn = None
+        cursor = None
+        statements = 0
+        try:
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            for keys, doc_ids in groups.items():
+                for start in range(0, len(doc_ids), self.max_batch_size):
+                    batch = doc_ids[start:start + self.max_batch_size]
+                    query, params = self._build_statement(keys, batch, updates)
+                    cursor.execute(query, params)
+                    statements += 1
+            conn.commit()
+            with self._pending_lock:
+                self._stats["statements"] += statements
+                self._stats["written_rows"] += len(updates)
+        except Exception as e:
+            print(f"[Parser-ERROR] 更新文档 {', '.join(updates)} 进度失败，下次刷新时重试: {e}")
+            self._requeue(updates)
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+    def _requeue(self, updates):
+        """写入失败的更新放回待写入队列，已有更新的字段保留较新的待写入值"""
+        with self._pending_lock:
+            for doc_id, fields in updates.items():
+                merged = dict(fields)
+                merged.update(self._pending.get(doc_id, {}))
+                self._pending[doc_id] = merged
+        self._ensure_thread()
+
+    @staticmethod
+    def _build_statement(keys, doc_ids, updates):
+        params = []
+        if len(doc_ids) == 1:
+            doc_id = doc_ids[0]
+            assignments = []
+            for key in keys:
+                assignments.append(f"{_FIELD_COLUMNS[key]} = %s")
+                params.append(updates[doc_id][key])
+            params.append(doc_id)
+            return f"UPDATE document SET {', '.join(assignments)} WHERE id = %s", params
+
+        assignments = []
+        for key in keys:
+            cases = []
+            for doc_id in doc_ids:
+                cases.append("WHEN %s THEN %s")
+                params.extend([doc_id, updates[doc_id][key]])
+            assignments.append(f"{_FIELD_COLUMNS[key]} = CASE id {' '.join(cases)} END")
+        params.extend(doc_ids)
+        placeholders = ", ".join(["%s"] * len(doc_ids))
+        return f"UPDATE document SET {', '.join(assignments)} WHERE id IN ({placeholders})", params
+
+
+_writer = DocumentProgressWriter(
+    flush_interval_ms=PROGRESS_CONFIG.flush_interval_ms,
+    max_batch_size=PROGRESS_CONFIG.max_batch_size
+)
+atexit.register(_writer.flush)
+
+
+def get_progress_writer():
+    """获取全局文档进度写入器"""
+    return _writer
+
+
+def update_document_progress(doc_id, progress=None, message=None, status=None, run=None, chunk_count=None, process_duration=None):
+    """更新数据库中文档的进度和状态（进度合并写入，状态变更立即写入）"""
+    _writer.submit(doc_id, progress=progress, message=message, status=status, run=run,
+                   chunk_count=chunk_count, process_duration=process_duration)
@@ -1,25 +1,24 @@
-import mysql.connector
 import json
-import threading 
 import requests
 import traceback
-import time
 from datetime import datetime
 from utils import generate_uuid
-from database import DB_CONFIG 
+from database import get_db_connection
 # 解析相关模块
 from .document_parser import perform_parse, _update_document_progress
-
-# 用于存储进行中的顺序批量任务状态
-# 结构: { kb_id: {"status": "running/completed/failed", "total": N, "current": M, "message": "...", "start_time": timestamp} }
-SEQUENTIAL_BATCH_TASKS = {}
+from .parse_scheduler import get_parse_scheduler, PRIORITY_HIGH, PRIORITY_NORMAL
+from .mineru_parse.result_cache import get_parse_result_cache
+from .mineru_parse.fastapi_adapter import get_global_adapter
+from .mineru_parse.block_cache import get_block_cache
+from .job_queue import get_parse_job_queue
+from ..config import JOB_QUEUE_CONFIG
 
 class KnowledgebaseService:
     
     @classmethod
     def _get_db_connection(cls):
-        """创建数据库连接"""
-        return mysql.connector.connect(**DB_CONFIG)
+        """从连接池借出数据库连接"""
+        return get_db_connection()
 
     @classmethod
     def get_knowledgebase_list(cls, page=1, size=10, name=''):
@@ -760,19 +759,19 @@ class KnowledgebaseService:
                 conn.close()
 
     @classmethod
-    def async_parse_document(cls, doc_id):
-        """异步解析文档"""
+    def async_parse_document(cls, doc_id, priority=PRIORITY_HIGH):
+        """异步解析文档（提交到持久化队列或本进程的解析调度器）"""
         try:
-            # 启动后台线程执行同步的 parse_document 方法
-            thread = threading.Thread(target=cls.parse_document, args=(doc_id,))
-            thread.daemon = True # 设置为守护线程，主程序退出时线程也退出
-            thread.start()
+            if JOB_QUEUE_CONFIG.enabled:
+                submitted = get_parse_job_queue().enqueue_document(doc_id, priority=priority)
+            else:
+                submitted = get_parse_scheduler().submit_document(doc_id, cls.parse_document, priority=priority)
 
             # 立即返回，表示任务已提交
             return {
                 "task_id": doc_id, # 使用 doc_id 作为任务标识符
                 "status": "processing",
-                "message": "文档解析任务已提交到后台处理"
+                "message": "文档解析任务已提交到后台处理" if submitted else "文档已在解析队列中"
             }
         except Exception as e:
             print(f"启动异步解析任务失败 (Doc ID: {doc_id}): {str(e)}")
@@ -811,13 +810,27 @@ class KnowledgebaseService:
                 except (ValueError, TypeError):
                     progress_value = 0.0 # 或记录错误
 
-            return {
+            progress = {
                 "progress": progress_value,
                 "message": result.get("progress_msg", ""),
                 "status": result.get("status", "0"), 
                 "running": result.get("run", "0"),
             }
 
+            # 附加调度器中的排队/阶段信息
+            job_status = get_parse_scheduler().get_document_status(doc_id)
+            if JOB_QUEUE_CONFIG.enabled:
+                queue_job = get_parse_job_queue().get_document_status(doc_id)
+                if queue_job:
+                    progress["queue_state"] = queue_job["status"]
+                    progress["worker"] = queue_job["worker_id"]
+            elif job_status:
+                progress["queue_state"] = job_status["state"]
+            # 阶段信息仅在本进程执行该文档时可用
+            if job_status and job_status["stage"]:
+                progress["stage"] = job_status["stage"]
+            return progress
+
         except Exception as e:
             print(f"获取文档进度失败 (Doc ID: {doc_id}): {str(e)}")
             return {"error": f"获取进度失败: {str(e)}"}
@@ -1055,22 +1068,12 @@ class KnowledgebaseService:
             if conn and conn.is_connected():
                 conn.close()
 
-    # 顺序批量解析 (核心逻辑，在后台线程运行)
+    # 启动批量解析 (提交到持久化队列或解析调度器)
     @classmethod
-    def _run_sequential_batch_parse(cls, kb_id):
-        """【内部方法】顺序执行批量解析，并在 SEQUENTIAL_BATCH_TASKS 中更新状态"""
-        global SEQUENTIAL_BATCH_TASKS
-        task_info = SEQUENTIAL_BATCH_TASKS.get(kb_id)
-        if not task_info:
-            print(f"[Seq Batch ERROR] Task info for KB {kb_id} not found at start.")
-            return # 理论上不应发生
-
+    def start_sequential_batch_parse_async(cls, kb_id, priority=PRIORITY_NORMAL):
+        """将知识库中未解析完成的文档提交解析，由 worker 并行执行"""
         conn = None
         cursor = None
-        parsed_count = 0
-        failed_count = 0
-        total_count = 0
-
         try:
             conn = cls._get_db_connection()
             cursor = conn.cursor(dictionary=True)
@@ -1083,136 +1086,81 @@ class KnowledgebaseService:
             """
             cursor.execute(query, (kb_id,))
             documents_to_parse = cursor.fetchall()
-            total_count = len(documents_to_parse)
-
-            # 更新任务总数
-            task_info["total"] = total_count
-            task_info["status"] = "running"
-            task_info["message"] = f"共找到 {total_count} 个文档待解析。"
-            task_info["start_time"] = time.time()
-            start_time = time.time()
-            SEQUENTIAL_BATCH_TASKS[kb_id] = task_info # 更新字典
-
-            if not documents_to_parse:
-                task_info["status"] = "completed"
-                task_info["message"] = "没有需要解析的文档。"
-                SEQUENTIAL_BATCH_TASKS[kb_id] = task_info
-                print(f"[Seq Batch] KB {kb_id}: 没有需要解析的文档。")
-                return
-
-            print(f"[Seq Batch] KB {kb_id}: 开始顺序解析 {total_count} 个文档...")
-
-            # 按顺序解析每个文档
-            for i, doc in enumerate(documents_to_parse):
-                doc_id = doc['id']
-                doc_name = doc['name']
-
-                # 更新当前进度
-                task_info["current"] = i + 1
-                task_info["message"] = f"正在解析: {doc_name} ({i+1}/{total_count})"
-                SEQUENTIAL_BATCH_TASKS[kb_id] = task_info
-                print(f"[Seq Batch] KB {kb_id}: ({i+1}/{total_count}) Parsing {doc_name} (ID: {doc_id})...")
-
-                try:
-                    # 调用同步的 parse_document 方法
-                    # 这个方法内部会处理单个文档的状态更新 (run, status)
-                    result = cls.parse_document(doc_id)
-                    if result and result.get("success"):
-                        parsed_count += 1
-                        print(f"[Seq Batch] KB {kb_id}: Document {doc_id} parsed successfully.")
-                    else:
-                        failed_count += 1
-                        error_msg = result.get("message", "未知错误") if result else "未知错误"
-                        print(f"[Seq Batch] KB {kb_id}: Document {doc_id} parsing failed: {error_msg}")
-                        # 即使单个失败，也继续处理下一个
-                except Exception as e:
-                    failed_count += 1
-                    print(f"[Seq Batch ERROR] KB {kb_id}: Error calling parse_document for {doc_id}: {str(e)}")
-                    traceback.print_exc()
-                    # 尝试更新文档状态为失败，以防 parse_document 内部未处理
-                    try:
-                        _update_document_progress(doc_id, status='1', run='0', progress=0.0, message=f"批量任务中解析失败: {str(e)[:255]}")
-                    except Exception as update_err:
-                         print(f"[Service-ERROR] 更新文档 {doc_id} 失败状态时出错: {str(update_err)}")
-
-            # 任务完成
-            end_time = time.time()
-            duration = round(end_time - task_info.get("start_time", start_time), 2)
-            final_message = f"批量顺序解析完成。总计 {total_count} 个，成功 {parsed_count} 个，失败 {failed_count} 个。耗时 {duration} 秒。"
-            task_info["status"] = "completed"
-            task_info["message"] = final_message
-            task_info["current"] = total_count # 确保 current 等于 total
-            SEQUENTIAL_BATCH_TASKS[kb_id] = task_info
-            print(f"[Seq Batch] KB {kb_id}: {final_message}")
-
         except Exception as e:
-            # 任务执行中发生严重错误
-            error_message = f"批量顺序解析过程中发生严重错误: {str(e)}"
-            print(f"[Seq Batch ERROR] KB {kb_id}: {error_message}")
+            error_message = f"启动批量解析任务失败: {str(e)}"
+            print(f"[Batch Parse ERROR] KB {kb_id}: {error_message}")
             traceback.print_exc()
-            task_info["status"] = "failed"
-            task_info["message"] = error_message
-            SEQUENTIAL_BATCH_TASKS[kb_id] = task_info
+            return {"success": False, "message": error_message}
         finally:
             if cursor:
                 cursor.close()
-            if conn and conn.is_connected():
+            if conn:
                 conn.close()
 
-    # 启动顺序批量解析 (异步请求)
-    @classmethod
-    def start_sequential_batch_parse_async(cls, kb_id):
-        """异步启动知识库的顺序批量解析任务"""
-        global SEQUENTIAL_BATCH_TASKS
-        if kb_id in SEQUENTIAL_BATCH_TASKS and SEQUENTIAL_BATCH_TASKS[kb_id].get("status") == "running":
-            return {"success": False, "message": "该知识库的批量解析任务已在运行中。"}
-
-        # 初始化任务状态
-        start_time = time.time()
-        SEQUENTIAL_BATCH_TASKS[kb_id] = {
-            "status": "starting",
-            "total": 0,
-            "current": 0,
-            "message": "任务准备启动...",
-            "start_time": start_time
-        }
-
         try:
-            # 启动后台线程执行顺序解析逻辑
-            thread = threading.Thread(target=cls._run_sequential_batch_parse, args=(kb_id,))
-            thread.daemon = True
-            thread.start()
-            print(f"[Seq Batch] KB {kb_id}: 已启动后台顺序解析线程。")
-
-            return {"success": True, "message": "顺序批量解析任务已启动。"}
-
+            if JOB_QUEUE_CONFIG.enabled:
+                progress = get_parse_job_queue().enqueue_batch(kb_id, documents_to_parse, priority=priority)
+            else:
+                progress = get_parse_scheduler().submit_batch(kb_id, documents_to_parse, cls.parse_document, priority=priority)
         except Exception as e:
-            error_message = f"启动顺序批量解析任务失败: {str(e)}"
-            print(f"[Seq Batch ERROR] KB {kb_id}: {error_message}")
+            error_message = f"启动批量解析任务失败: {str(e)}"
+            print(f"[Batch Parse ERROR] KB {kb_id}: {error_message}")
             traceback.print_exc()
-            # 更新任务状态为失败
-            SEQUENTIAL_BATCH_TASKS[kb_id] = {
-                "status": "failed",
-                "total": 0,
-                "current": 0,
-                "message": error_message,
-                "start_time": start_time
-            }
             return {"success": False, "message": error_message}
 
-    # 获取顺序批量解析进度
+        if progress is None:
+            return {"success": False, "message": "该知识库的批量解析任务已在运行中。"}
+
+        print(f"[Batch Parse] KB {kb_id}: 已提交 {progress['total']} 个文档待解析。")
+        return {"success": True, "message": f"批量解析任务已启动，共 {progress['total']} 个文档。"}
+
+    # 取消批量解析
+    @classmethod
+    def cancel_sequential_batch_parse(cls, kb_id):
+        """取消知识库的批量解析任务：排队中的文档不再解析，解析中的文档尽快中止"""
+        if JOB_QUEUE_CONFIG.enabled:
+            cancelled = get_parse_job_queue().cancel_batch(kb_id)
+        else:
+            cancelled = get_parse_scheduler().cancel_batch(kb_id)
+        if not cancelled:
+            return {"success": False, "message": "该知识库没有运行中的批量解析任务。"}
+        return {"success": True, "message": "已请求取消批量解析任务。"}
+
+    # 获取批量解析进度
     @classmethod
     def get_sequential_batch_parse_progress(cls, kb_id):
-        """获取指定知识库的顺序批量解析任务进度"""
-        global SEQUENTIAL_BATCH_TASKS
-        task_info = SEQUENTIAL_BATCH_TASKS.get(kb_id)
+        """获取指定知识库的批量解析任务进度"""
+        if JOB_QUEUE_CONFIG.enabled:
+            task_info = get_parse_job_queue().get_batch_progress(kb_id)
+        else:
+            task_info = get_parse_scheduler().get_batch_progress(kb_id)
 
         if not task_info:
             return {"status": "not_found", "message": "未找到该知识库的批量解析任务记录。"}
 
-        # 返回当前任务状态
         return task_info
 
+    # 获取解析结果缓存统计
+    @classmethod
+    def get_parse_cache_stats(cls):
+        """获取本进程 MinerU 解析结果缓存的命中统计"""
+        cache = get_parse_result_cache()
+        if cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **cache.get_stats()}
+
+    # 获取分块定位缓存统计
+    @classmethod
+    def get_block_cache_stats(cls):
+        """获取本进程分块定位缓存的项数、估算内存和命中率"""
+        return get_block_cache().get_stats()
+
+    # 获取 MinerU 服务端点统计
+    @classmethod
+    def get_mineru_endpoint_stats(cls):
+        """获取本进程各 MinerU 服务端点的健康状态、并发、耗时和吞吐量"""
+        return get_global_adapter().get_endpoint_stats()
+
     # 获取知识库所有文档状态 (用于刷新列表)
     @classmethod
     def get_knowledgebase_parse_progress(cls, kb_id):
@@ -2,13 +2,13 @@ import mysql.connector
 import pytz
 from datetime import datetime
 from utils import generate_uuid, encrypt_password
-from database import DB_CONFIG
+from database import get_db_connection
 
 def get_users_with_pagination(current_page, page_size, username='', email=''):
     """查询用户信息，支持分页和条件筛选"""
     try:
         # 建立数据库连接
-        conn = mysql.connector.connect(**DB_CONFIG)
+        conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
         
         # 构建WHERE子句和参数
@@ -69,7 +69,7 @@ def get_users_with_pagination(current_page, page_size, username='', email=''):
 def delete_user(user_id):
     """删除指定ID的用户"""
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
+        conn = get_db_connection()
         cursor = conn.cursor()
         
         # 删除 user 表中的用户记录
@@ -103,7 +103,7 @@ def create_user(user_data):
     时间将以 UTC+8 (Asia/Shanghai) 存储。
     """
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
+        conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
         
         # 检查用户表是否为空
@@ -282,7 +282,7 @@ def create_user(user_data):
 def update_user(user_id, user_data):
     """更新用户信息"""
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
+        conn = get_db_connection()
         cursor = conn.cursor()
         
         query = """
@@ -313,7 +313,7 @@ def reset_user_password(user_id, new_password):
         bool: 操作是否成功
     """
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
+        conn = get_db_connection()
         cursor = conn.cursor()
 
         # 加密新密码
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+chunk 位置匹配性能对比脚本
+对比原始的逐 block 最长公共子串 (DP) 评分与 BlockMatcher 倒排索引匹配的耗时和结果一致性
+
+用法:
+    python bbox_matcher_benchmark.py path/to/result_middle.json [--md path/to/result.md] [--legacy-limit 200]
+
+未指定 --md 时，使用连续 block 文本拼接出的模拟 chunk 进行测试。
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+# 添加必要的路径
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+try:
+    from services.knowledgebases.mineru_parse.utils import (
+        get_blocks_from_md,
+        longest_common_substring_length,
+        split_markdown_to_chunks_smart
+    )
+    from services.knowledgebases.mineru_parse.block_matcher import BlockMatcher
+except ImportError as e:
+    print(f"导入错误: {e}")
+    sys.exit(1)
+
+
+def legacy_positions_for_chunk(block_list, chunk_content):
+    """原始 get_bbox_for_chunk 的评分与扩展逻辑，作为对比基准"""
+    chunk_content_clean = chunk_content.strip()
+    if not chunk_content_clean:
+        return None
+
+    scored_blocks = []
+    for i, block in enumerate(block_list):
+        block_text = block.get('text', '').strip()
+        if not block_text:
+            continue
+        lcs_length = longest_common_substring_length(chunk_content_clean, block_text)
+        if lcs_length == 0:
+            continue
+        coverage_score = lcs_length / len(block_text)
+        combined_score = lcs_length * 0.7 + coverage_score * len(block_text) * 0.3
+        scored_blocks.append((i, combined_score, lcs_length))
+
+    if not scored_blocks:
+        return None
+
+    scored_blocks.sort(key=lambda x: x[1], reverse=True)
+    anchor_idx = scored_blocks[0][0]
+    matched_blocks = [block_list[anchor_idx]]
+    for i in range(anchor_idx - 1, -1, -1):
+        block_text = block_list[i].get('text', '').strip()
+        if block_text and block_text in chunk_content_clean:
+            matched_blocks.insert(0, block_list[i])
+        else:
+            break
+    for i in range(anchor_idx + 1, len(block_list)):
+        block_text = block_list[i].get('text', '').strip()
+        if block_text and block_text in chunk_content_clean:
+            matched_blocks.append(block_list[i])
+        else:
+            break
+
+    positions = []
+    for block in matched_blocks:
+        bbox = block.get('bbox')
+        page_number = block.get('page_idx')
+        if bbox and page_number is not None:
+            positions.append([page_number, bbox[0], bbox[2], bbox[1], bbox[3]])
+    return positions or None
+
+
+def build_synthetic_chunks(block_list, window=4):
+    """用连续 block 文本拼接模拟 chunk"""
+    texts = [block.get('text', '').strip() for block in block_list]
+    chunks = []
+    for start in range(0, len(texts), window):
+        chunk = "\n".join(t for t in texts[start:start + window] if t)
+        if chunk:
+            chunks.append(chunk)
+    return chunks
+
+
+def run_benchmark(middle_json_path, md_path=None, legacy_limit=200, seed=0):
+    md_file_path = middle_json_path.replace('_middle.json', '.md')
+    block_list = get_blocks_from_md(md_file_path)
+    if not block_list:
+        print(f"✗ 未能从 {middle_json_path} 读取 block")
+        return
+
+    if md_path:
+        with open(md_path, 'r', encoding='utf-8') as f:
+            chunks = split_markdown_to_chunks_smart(f.read(), chunk_token_num=256)
+    else:
+        chunks = build_synthetic_chunks(block_list)
+
+    total_chars = sum(len(block.get('text', '')) for block in block_list)
+    print(f"✓ block 数: {len(block_list):,}，文本字符数: {total_chars:,}，chunk 数: {len(chunks):,}")
+
+    t0 = time.perf_counter()
+    matcher = BlockMatcher(block_list)
+    build_time = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    new_results = [matcher.positions_for_chunk(chunk) for chunk in chunks]
+    match_time = time.perf_counter() - t0
+    print(f"BlockMatcher: 建索引 {build_time:.3f}s，匹配 {len(chunks)} 个 chunk 耗时 {match_time:.3f}s "
+          f"({match_time / max(len(chunks), 1) * 1000:.2f} ms/chunk)")
+
+    sample = list(range(len(chunks)))
+    if legacy_limit and len(sample) > legacy_limit:
+        random.Random(seed).shuffle(sample)
+        sample = sorted(sample[:legacy_limit])
+
+    t0 = time.perf_counter()
+    same = 0
+    for idx in sample:
+        if legacy_positions_for_chunk(block_list, chunks[idx]) == new_results[idx]:
+            same += 1
+    legacy_time = time.perf_counter() - t0
+    per_chunk = legacy_time / max(len(sample), 1)
+    print(f"原始 DP 评分: 抽样 {len(sample)} 个 chunk 耗时 {legacy_time:.3f}s "
+          f"({per_chunk * 1000:.2f} ms/chunk，全量预估 {per_chunk * len(chunks):.1f}s)")
+    print(f"结果一致: {same}/{len(sample)}")
+    if match_time > 0:
+        print(f"加速比: {per_chunk * len(chunks) / (build_time + match_time):.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="chunk 位置匹配性能对比")
+    parser.add_argument('middle_json', help="MinerU 输出的 *_middle.json 文件路径")
+    parser.add_argument('--md', dest='md_path', default=None, help="用于生成真实 chunk 的 markdown 文件")
+    parser.add_argument('--legacy-limit', type=int, default=200, help="原始算法抽样的 chunk 数，0 表示全量")
+    args = parser.parse_args()
+
+    run_benchmark(args.middle_json, args.md_path, args.legacy_limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试 Markdown 分段器
+验证管道表格、两种后端的 HTML 表格、围栏代码块和相邻表格的分段结果，
+以及每个片段的偏移与原文一致
+"""
+
+import os
+import sys
+
+# 添加必要的路径
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'knowledgebases', 'mineru_parse'))
+
+try:
+    from markdown_segmenter import (iter_markdown_segments, SEGMENT_HEADING, SEGMENT_IMAGE, SEGMENT_TABLE,
+                                    SEGMENT_TEXT)
+except ImportError as e:
+    print(f"导入错误: {e}")
+    sys.exit(1)
+
+
+VLM_TABLE = "<table><tr><td>姓名</td><td>分数</td></tr><tr><td>张三</td><td>90</td></tr></table>"
+PIPELINE_TABLE = "<html><body><table><tr><td>部门</td></tr><tr><td>研发</td></tr></table></body></html>"
+
+
+def _segments(txt):
+    segments = list(iter_markdown_segments(txt))
+    for segment in segments:
+        assert txt[segment.start:segment.end] == segment.content, f"片段偏移与原文不一致: {segment}"
+    return [(segment.type, segment.content) for segment in segments]
+
+
+def test_html_tables():
+    """VLM 的 <table> 和 pipeline 的 <html><body><table> 都识别为表格"""
+    print("🧪 HTML 表格（两种后端）")
+    for table in (VLM_TABLE, PIPELINE_TABLE):
+        txt = f"# 标题\n\n前文\n{table}\n后文"
+        assert _segments(txt) == [
+            (SEGMENT_HEADING, "# 标题"),
+            (SEGMENT_TEXT, "\n前文"),
+            (SEGMENT_TABLE, table),
+            (SEGMENT_TEXT, "后文"),
+        ], f"分段结果错误: {_segments(txt)}"
+
+    # 跨行的包装表格到 </html> 为止
+    multiline = "<html><body><table>\n<tr><td>a</td></tr>\n</table>\n</body></html>"
+    assert _segments(f"{multiline}\n正文") == [(SEGMENT_TABLE, multiline), (SEGMENT_TEXT, "正文")]
+    print("✅ 通过")
+
+
+def test_pipe_table():
+    """管道表格需要分隔行，缺少分隔行时按正文处理"""
+    print("🧪 管道表格")
+    table = "| 姓名 | 分数 |\n|:---|---:|\n| 张三 | 90 |"
+    assert _segments(f"说明\n{table}\n结尾") == [
+        (SEGMENT_TEXT, "说明"),
+        (SEGMENT_TABLE, table),
+        (SEGMENT_TEXT, "结尾"),
+    ]
+    assert _segments("| 不是表格 |\n正文") == [(SEGMENT_TEXT, "| 不是表格 |\n正文")]
+    print("✅ 通过")
+
+
+def test_fenced_code():
+    """围栏代码块中的表格、标题和图片都按正文处理"""
+    print("🧪 围栏代码块")
+    code = f"```\n# 注释\n{VLM_TABLE}\n| a | b |\n|---|---|\n![图](x.png)\n```"
+    assert _segments(f"{code}\n![图](y.png)") == [
+        (SEGMENT_TEXT, code),
+        (SEGMENT_IMAGE, "![图](y.png)"),
+    ]
+    print("✅ 通过")
+
+
+def test_back_to_back_tables():
+    """相邻的表格各自成为独立片段"""
+    print("🧪 相邻表格")
+    pipe = "| a | b |\n|---|---|\n| 1 | 2 |"
+    txt = "\n".join([VLM_TABLE, PIPELINE_TABLE, pipe, VLM_TABLE])
+    assert _segments(txt) == [
+        (SEGMENT_TABLE, VLM_TABLE),
+        (SEGMENT_TABLE, PIPELINE_TABLE),
+        (SEGMENT_TABLE, pipe),
+        (SEGMENT_TABLE, VLM_TABLE),
+    ], f"分段结果错误: {_segments(txt)}"
+    print("✅ 通过")
+
+
+if __name__ == "__main__":
+    test_html_tables()
+    test_pipe_table()
+    test_fenced_code()
+    test_back_to_back_tables()
+    print("🎉 所有测试通过")
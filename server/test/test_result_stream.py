@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试 MinerU 结果的流式 JSON 解析
+验证按不同大小切分的字节流（包括切在多字节 UTF-8 字符中间、数字恰好位于缓冲区末尾）
+解析结果与整体 json.loads 一致，并验证块列表经块存储文件读写后保持不变
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+# 添加必要的路径
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'knowledgebases'))
+
+try:
+    from mineru_parse import result_stream
+    from mineru_parse.result_stream import parse_result_stream
+    from mineru_parse.block_store import BlockStore, extract_blocks, write_block_store
+except ImportError as e:
+    print(f"导入错误: {e}")
+    sys.exit(1)
+
+
+def _block(block_type, text, bbox, index):
+    return {
+        "type": block_type,
+        "bbox": bbox,
+        "index": index,
+        "lines": [{"spans": [{"content": text}, {"content": {"not": "text"}}]}],
+    }
+
+
+def _build_result():
+    """带 pipeline 和 VLM 两种页面结构、多字节文本和各类 JSON 值的结果"""
+    middle_json = {
+        "_backend": "pipeline",
+        "pdf_info": [
+            {"page_idx": 0, "page_size": [612, 792], "preproc_blocks": [
+                _block("title", "第一章 概述 🚀", [10.5, 20.0, 300.25, 40.0], 0),
+                _block("text", "中文段落，包含 “引号” 和 emoji 😀😀", [10.0, 50.0, 500.0, 120.0], 1),
+                {"type": "image", "bbox": [], "index": 2},
+            ]},
+            {"page_idx": 1, "para_blocks": [
+                _block("table", "<table><tr><td>数据</td></tr></table>", [0.0, 0.0, 612.0, 792.0], 0),
+            ]},
+            {"page_idx": 2, "discarded_blocks": []},
+        ],
+        "nested": {"escaped": "a\"b\\c\né", "list": [1, -2.5e3, True, False, None]},
+    }
+    return {
+        "backend": "pipeline",
+        "md_content": "# 第一章 概述\n\n" + "长文本段落。" * 3000,
+        "info": middle_json,
+        "content_list": [{"type": "text", "text": "内容", "page_idx": 0}],
+        "version": 123456789,
+    }
+
+
+def _expected(result):
+    expected = {key: value for key, value in result.items() if key != "info"}
+    expected["blocks"] = extract_blocks(result["info"])
+    return expected
+
+
+def _chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_chunk_sizes():
+    """1 字节、奇数大小和大块切分的结果都与整体解析一致"""
+    print("🧪 不同切分大小")
+    result = _build_result()
+    data = json.dumps(result, ensure_ascii=False, indent=1).encode("utf-8")
+    expected = _expected(result)
+    for size in (1, 3, 7, 4093, len(data)):
+        assert parse_result_stream(_chunks(data, size)) == expected, f"切分大小 {size} 的解析结果不一致"
+    print("✅ 通过")
+
+
+def test_multibyte_boundaries():
+    """多字节字符的每一个字节位置都可能成为切分点"""
+    print("🧪 多字节字符切分")
+    result = {"md_content": "汉字😀é", "info": {"pdf_info": []}}
+    data = json.dumps(result, ensure_ascii=False).encode("utf-8")
+    for split in range(1, len(data)):
+        parsed = parse_result_stream([data[:split], data[split:]])
+        assert parsed == {"md_content": "汉字😀é", "blocks": []}, f"在第 {split} 字节切分时解析错误"
+    print("✅ 通过")
+
+
+def test_number_at_buffer_edge():
+    """数字恰好位于已读取数据末尾时，要读完后续字节再解码"""
+    print("🧪 缓冲区末尾的数字")
+    data = b'{"version": 1234567, "pages": [12, 345]}'
+    for split in range(1, len(data)):
+        parsed = parse_result_stream([data[:split], data[split:]])
+        assert parsed == {"version": 1234567, "pages": [12, 345]}, f"在第 {split} 字节切分时解析错误"
+
+    # 大于读取块的值需要多次扩充缓冲区
+    original_chunk_size = result_stream.STREAM_CHUNK_SIZE
+    result_stream.STREAM_CHUNK_SIZE = 16
+    try:
+        value = "x" * 1000
+        data = json.dumps({"md_content": value, "count": 98765}).encode("utf-8")
+        assert parse_result_stream(_chunks(data, 5)) == {"md_content": value, "count": 98765}
+    finally:
+        result_stream.STREAM_CHUNK_SIZE = original_chunk_size
+    print("✅ 通过")
+
+
+def test_info_not_object():
+    """info 不是对象时原样保留，不生成 blocks"""
+    print("🧪 非对象的 info")
+    for info in (None, "text", [1, 2], 42):
+        data = json.dumps({"info": info, "md_content": "正文"}, ensure_ascii=False).encode("utf-8")
+        assert parse_result_stream(_chunks(data, 2)) == {"info": info, "md_content": "正文"}
+    print("✅ 通过")
+
+
+def test_invalid_json():
+    """不完整或带多余内容的数据抛出异常"""
+    print("🧪 无效数据")
+    for data in (b'{"md_content": "abc"', b'{"a": 1} {"b": 2}', b'[1, 2]'):
+        try:
+            parse_result_stream(_chunks(data, 3))
+        except ValueError:
+            continue
+        raise AssertionError(f"未拒绝无效数据: {data!r}")
+    print("✅ 通过")
+
+
+def test_block_store_round_trip():
+    """流式解析得到的块写入块存储文件后读出，内容不变"""
+    print("🧪 块存储读写")
+    result = _build_result()
+    data = json.dumps(result, ensure_ascii=False).encode("utf-8")
+    blocks = parse_result_stream(_chunks(data, 7))["blocks"]
+    assert len(blocks) == 3, "块数量错误"
+
+    fd, path = tempfile.mkstemp(suffix="_blocks.bin")
+    os.close(fd)
+    try:
+        write_block_store(path, blocks)
+        store = BlockStore(path)
+        try:
+            assert len(store) == len(blocks)
+            assert list(store) == blocks, "块存储读出的内容与写入的不一致"
+            assert store.texts() == [block["text"] for block in blocks]
+            assert store[-1] == blocks[-1]
+        finally:
+            store.close()
+    finally:
+        os.remove(path)
+    print("✅ 通过")
+
+
+if __name__ == "__main__":
+    test_chunk_sizes()
+    test_multibyte_boundaries()
+    test_number_at_buffer_edge()
+    test_info_not_object()
+    test_invalid_json()
+    test_block_store_round_trip()
+    print("🎉 所有测试通过")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+测试表格文件的临时文件缓冲
+验证从 MinIO 流式下载（或由字节内容写入）的 .xlsx 能被 Excel 分块器直接解析，
+表格文件使用 tempfile.TemporaryFile 而非 SpooledTemporaryFile：Python 3.10 中后者没有 seekable()，zipfile 无法打开，需在 3.10 上运行本测试
+"""
+
+import os
+import sys
+from io import BytesIO
+
+# 添加必要的路径
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'knowledgebases'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'knowledgebases', 'excel_parse'))
+
+try:
+    from openpyxl import Workbook
+    from object_fetch import download_object_to_tempfile, tempfile_from_bytes
+    from excel_chunker import EnhancedExcelChunker
+except ImportError as e:
+    print(f"导入错误: {e}")
+    sys.exit(1)
+
+
+class _FakeObjectResponse:
+    """模拟 minio get_object 的返回值"""
+
+    def __init__(self, content):
+        self._content = content
+
+    def stream(self, chunk_size):
+        for i in range(0, len(self._content), chunk_size):
+            yield self._content[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+class _FakeMinioClient:
+    def __init__(self, content):
+        self._content = content
+
+    def get_object(self, bucket_name, object_name):
+        return _FakeObjectResponse(self._content)
+
+
+def _build_xlsx():
+    """生成一个带合并单元格的小表格"""
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["部门", "姓名", "分数"])
+    ws.append(["研发", "张三", 90])
+    ws.append([None, "李四", 85])
+    ws.merge_cells("A2:A3")
+    output = BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+def _check_table_file(table_file):
+    assert table_file.seekable(), "临时文件必须可定位，zipfile 依赖 seekable()"
+    chunker = EnhancedExcelChunker({'preprocess_merged_cells': True})
+    chunks = chunker.chunk_excel(table_file, "html")
+    assert chunks, "未生成任何分块"
+    assert "李四" in "".join(chunks), "分块内容缺少表格数据"
+    table_file.seek(0)
+    assert EnhancedExcelChunker.get_row_count(table_file) == 3, "行数统计错误"
+
+
+def test_tempfile_from_bytes():
+    """由字节内容写入的临时文件可以解析"""
+    print(f"🧪 tempfile_from_bytes（Python {sys.version.split()[0]}）")
+    table_file = tempfile_from_bytes(_build_xlsx())
+    try:
+        _check_table_file(table_file)
+    finally:
+        table_file.close()
+    print("✅ 通过")
+
+
+def test_download_object_to_tempfile():
+    """从 MinIO 流式下载的临时文件可以解析"""
+    print(f"🧪 download_object_to_tempfile（Python {sys.version.split()[0]}）")
+    content = _build_xlsx()
+    table_file, size = download_object_to_tempfile(_FakeMinioClient(content), "bucket", "sheet.xlsx", chunk_size=1024)
+    try:
+        assert size == len(content), "下载字节数错误"
+        _check_table_file(table_file)
+    finally:
+        table_file.close()
+    print("✅ 通过")
+
+
+if __name__ == "__main__":
+    test_tempfile_from_bytes()
+    test_download_object_to_tempfile()
+    print("🎉 所有测试通过")
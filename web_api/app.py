@@ -1,14 +1,25 @@
+import asyncio
 import json
 import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
 import requests
 from urllib.parse import urlparse
 from base64 import b64encode
 from glob import glob
-from typing import Tuple, Union, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, List, NamedTuple, Tuple, Union, Optional
 
+import pypdfium2 as pdfium
 import uvicorn
 from fastapi import FastAPI, UploadFile
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, FileResponse
+from starlette.background import BackgroundTask
 from loguru import logger
 
 from mineru.data.data_reader_writer import FileBasedDataWriter
@@ -16,13 +27,15 @@ from mineru.data.data_reader_writer.s3 import S3DataReader, S3DataWriter
 from mineru.utils.config_reader import get_bucket_name, get_s3_config
 from fastapi import Form
 from mineru.cli.common import convert_pdf_bytes_to_bytes_by_pypdfium2
-from mineru.backend.pipeline.pipeline_analyze import doc_analyze as pipeline_doc_analyze
+from mineru.backend.pipeline.pipeline_analyze import batch_image_analyze as pipeline_batch_image_analyze
 from mineru.backend.pipeline.model_json_to_middle_json import result_to_middle_json as pipeline_result_to_middle_json
 from mineru.backend.pipeline.pipeline_middle_json_mkcontent import union_make as pipeline_union_make
 from mineru.backend.vlm.vlm_analyze import doc_analyze as vlm_doc_analyze
 from mineru.backend.vlm.vlm_middle_json_mkcontent import union_make as vlm_union_make
 from mineru.utils.enum_class import MakeMode
 from mineru.utils.draw_bbox import draw_layout_bbox, draw_span_bbox
+from mineru.utils.pdf_classify import classify as classify_pdf
+from mineru.utils.pdf_image_tools import load_images_from_pdf
 
 app = FastAPI()
 
@@ -30,6 +43,68 @@ pdf_extensions = [".pdf"]
 office_extensions = [".ppt", ".pptx", ".doc", ".docx"]
 image_extensions = [".png", ".jpg", ".jpeg"]
 
+# Pipeline 后端的微批处理：在该时间窗口内到达的请求合并为一次模型推理（0 表示关闭）
+BATCH_WINDOW_MS = int(os.environ.get("MINERU_BATCH_WINDOW_MS", "200"))
+# 单次合并推理的最大文档数
+BATCH_MAX_DOCS = int(os.environ.get("MINERU_BATCH_MAX_DOCS", "16"))
+# 单次合并推理的最大页数，达到后立即开始推理，避免一批页面图像占用过多内存
+BATCH_MAX_PAGES = int(os.environ.get("MINERU_BATCH_MAX_PAGES", "512"))
+# Pipeline 推理的页窗口大小（沿用 MinerU 的 MINERU_MIN_BATCH_INFERENCE_SIZE 环境变量），每完成一个窗口上报一次进度
+ANALYZE_WINDOW_PAGES = int(os.environ.get("MINERU_MIN_BATCH_INFERENCE_SIZE", "128"))
+
+# 异步解析任务：工作线程数、排队上限、结果保留时长（秒）和结果存放目录
+# 工作线程数默认不少于单次合并推理的文档数和客户端对每个端点的并发数（4），否则微批处理凑不满
+JOB_WORKERS = int(os.environ.get("MINERU_JOB_WORKERS", str(max(BATCH_MAX_DOCS, 4))))
+JOB_MAX_PENDING = int(os.environ.get("MINERU_JOB_MAX_PENDING", "100"))
+JOB_RESULT_TTL = int(os.environ.get("MINERU_JOB_RESULT_TTL", "3600"))
+JOB_DIR = os.environ.get("MINERU_JOB_DIR", os.path.join(tempfile.gettempdir(), "mineru_jobs"))
+# 错误响应的 X-Error-Code 头：SGLang 不可用时 MinerU 服务本身仍然正常，客户端不应据此摘除本节点
+ERROR_CODE_HEADER = "X-Error-Code"
+ERROR_SGLANG_UNAVAILABLE = "sglang_unavailable"
+# SGLang 服务健康状态：有效期（秒）、标记为不可用的连续失败次数、不可用期间后台探测间隔（秒）
+SGLANG_HEALTH_TTL = int(os.environ.get("MINERU_SGLANG_HEALTH_TTL", "60"))
+SGLANG_HEALTH_FAILURE_THRESHOLD = int(os.environ.get("MINERU_SGLANG_HEALTH_FAILURES", "3"))
+SGLANG_HEALTH_REPROBE_INTERVAL = int(os.environ.get("MINERU_SGLANG_HEALTH_REPROBE", "10"))
+
+# 长轮询单次最长等待时间及检查间隔（秒）
+JOB_MAX_WAIT = 60
+JOB_POLL_STEP = 0.5
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+JOB_FINISHED_STATES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+# 解析阶段，通过任务状态接口上报进度
+STAGE_LOADING = "loading"
+STAGE_ANALYZING = "analyzing"
+STAGE_BUILDING = "building"
+STAGE_PACKAGING = "packaging"
+
+# 按需生成的解析产物：只有请求中需要时才构建 model_json（layout）和 content_list
+OUTPUT_LAYOUT = "layout"
+OUTPUT_CONTENT_LIST = "content_list"
+ALL_OUTPUTS = frozenset((OUTPUT_LAYOUT, OUTPUT_CONTENT_LIST))
+
+# info 字段格式：full 为完整 middle_json；positions 只保留各块的 bbox、类型、页码和文本
+INFO_FORMAT_FULL = "full"
+INFO_FORMAT_POSITIONS = "positions"
+INFO_FORMATS = (INFO_FORMAT_FULL, INFO_FORMAT_POSITIONS)
+
+# 进度回调：progress(stage, pages_done, pages_total)
+ProgressCallback = Optional[Callable[[str, int, int], None]]
+
+
+def report_progress(progress: ProgressCallback, stage: str, pages_done: int = 0, pages_total: int = 0):
+    if progress is not None:
+        progress(stage, pages_done, pages_total)
+
+
+class ParseCancelledError(Exception):
+    """Raised from a progress callback to stop parsing a document whose job was cancelled"""
+
 def validate_server_url(url: str) -> bool:
     """
     验证 server_url 的格式是否正确
@@ -73,11 +148,119 @@ def check_sglang_server_health(server_url: str, timeout: int = 10) -> Tuple[bool
     except Exception as e:
         return False, f"SGLang server health check failed: {str(e)}"
 
+def is_connection_error(error: Exception) -> bool:
+    """Whether an exception from the SGLang client means the server could not be reached"""
+    if isinstance(error, (ConnectionError, TimeoutError, requests.exceptions.ConnectionError,
+                          requests.exceptions.Timeout)):
+        return True
+    # httpx / aiohttp errors used by the VLM client, without importing them here
+    name = type(error).__name__
+    return "Connect" in name or "Timeout" in name
+
+
+class SGLangHealthTracker:
+    """
+    Cached health state of SGLang servers, keyed by server_url
+
+    Requests no longer probe /health every time: a state younger than ttl is reused, real
+    request outcomes refresh it (record_success / record_failure), and only after
+    failure_threshold consecutive connection failures is a server marked unhealthy. While a
+    server is unhealthy a background thread re-probes it every reprobe_interval seconds.
+    """
+
+    def __init__(self, ttl: int, failure_threshold: int, reprobe_interval: int):
+        self.ttl = ttl
+        self.failure_threshold = max(1, failure_threshold)
+        self.reprobe_interval = reprobe_interval
+        self._lock = threading.Lock()
+        self._states = {}
+
+    def _state(self, server_url: str) -> dict:
+        return self._states.setdefault(server_url, {
+            "healthy": None, "message": "", "checked_at": 0.0, "failures": 0, "reprobing": False,
+        })
+
+    def is_healthy(self, server_url: str, timeout: int = 10) -> Tuple[bool, str]:
+        with self._lock:
+            state = dict(self._state(server_url))
+        if state["healthy"] is False:
+            return False, state["message"]
+        if state["healthy"] and time.time() - state["checked_at"] < self.ttl:
+            return True, state["message"]
+        return self.check(server_url, timeout)
+
+    def check(self, server_url: str, timeout: int = 10) -> Tuple[bool, str]:
+        healthy, message = check_sglang_server_health(server_url, timeout)
+        if healthy:
+            self.record_success(server_url, message)
+        else:
+            self._mark_unhealthy(server_url, message)
+        return healthy, message
+
+    def record_success(self, server_url: str, message: str = "SGLang server is healthy"):
+        with self._lock:
+            state = self._state(server_url)
+            if state["healthy"] is False:
+                logger.info(f"SGLang server {server_url} is healthy again")
+            state.update(healthy=True, message=message, checked_at=time.time(), failures=0)
+
+    def record_failure(self, server_url: str, error: Exception):
+        with self._lock:
+            state = self._state(server_url)
+            state["failures"] += 1
+            failures = state["failures"]
+        logger.warning(f"SGLang request to {server_url} failed ({failures} in a row): {error}")
+        if failures >= self.failure_threshold:
+            self._mark_unhealthy(server_url, f"{failures} consecutive requests failed: {error}")
+
+    def _mark_unhealthy(self, server_url: str, message: str):
+        with self._lock:
+            state = self._state(server_url)
+            state.update(healthy=False, message=message, checked_at=time.time())
+            start_reprobe = not state["reprobing"]
+            state["reprobing"] = True
+        if start_reprobe:
+            logger.error(f"SGLang server {server_url} marked unhealthy: {message}")
+            threading.Thread(
+                target=self._reprobe_loop, args=(server_url,), name="sglang-health", daemon=True
+            ).start()
+
+    def _reprobe_loop(self, server_url: str):
+        while True:
+            time.sleep(self.reprobe_interval)
+            healthy, message = check_sglang_server_health(server_url)
+            if healthy:
+                with self._lock:
+                    self._state(server_url)["reprobing"] = False
+                self.record_success(server_url, message)
+                return
+
+
+sglang_health = SGLangHealthTracker(
+    SGLANG_HEALTH_TTL, SGLANG_HEALTH_FAILURE_THRESHOLD, SGLANG_HEALTH_REPROBE_INTERVAL
+)
+
+
+class KeyRecordingS3DataWriter(S3DataWriter):
+    """S3DataWriter that records the object keys it writes, so they can be returned to the caller"""
+
+    def __init__(self, prefix: str, bucket: str, ak: str, sk: str, endpoint_url: str):
+        super().__init__(prefix, bucket=bucket, ak=ak, sk=sk, endpoint_url=endpoint_url)
+        self.prefix = prefix.strip("/")
+        self.object_keys = []
+
+    def write(self, path: str, data: bytes) -> None:
+        super().write(path, data)
+        self.object_keys.append(f"{self.prefix}/{path}" if self.prefix else path)
+
+
 def init_writers(
     file_path: Optional[str] = None,
     file: Optional[UploadFile] = None,
     output_path: Optional[str] = None,
     output_image_path: Optional[str] = None,
+    image_bucket: Optional[str] = None,
+    image_prefix: str = "",
 ) -> Tuple[
     Union[S3DataWriter, FileBasedDataWriter],
     Union[S3DataWriter, FileBasedDataWriter],
@@ -92,6 +275,9 @@ def init_writers(
         file: Uploaded file object
         output_path: Output directory path
         output_image_path: Image output directory path
+        image_bucket: If set, images are written directly to this bucket (credentials
+            are looked up in the bucket_info of mineru.json) instead of output_image_path
+        image_prefix: Object key prefix for images written to image_bucket
 
     Returns:
         Tuple[writer, image_writer, file_bytes, file_extension]: Returns initialized writer tuple and file content
@@ -143,10 +329,317 @@ def init_writers(
     else:
         raise ValueError("Must provide either file or file_path")
 
+    if image_bucket:
+        # 图片直接写入调用方指定的存储桶，调用方无需再下载、转存图片
+        ak, sk, endpoint = get_s3_config(image_bucket)
+        image_writer = KeyRecordingS3DataWriter(
+            image_prefix, bucket=image_bucket, ak=ak, sk=sk, endpoint_url=endpoint
+        )
 
     return writer, image_writer, file_bytes, file_extension
 
 
+# 推理进度回调：on_pages(pages_done)
+PagesCallback = Optional[Callable[[int], None]]
+
+
+def analyze_pipeline_batch(
+    pdf_bytes_list: List[bytes],
+    lang_list: List[str],
+    parse_method: str = "auto",
+    formula_enable: bool = True,
+    table_enable: bool = True,
+    page_callbacks: Optional[List[PagesCallback]] = None,
+) -> list:
+    """
+    Run pipeline inference over several documents in one pass
+
+    Same steps as MinerU's pipeline doc_analyze: all pages of all documents are inferred together in
+    windows of ANALYZE_WINDOW_PAGES pages. After each window, page_callbacks[i] (if given) is called
+    with the number of pages of document i analyzed so far. A callback that raises ParseCancelledError
+    cancels its document: its remaining pages are dropped and the other documents carry on.
+
+    Returns:
+        list: One (model_list, images_list, pdf_doc, lang, ocr_enable) tuple per document, in input order;
+            a cancelled document gets its ParseCancelledError instead
+    """
+    all_pages = []  # (pdf_idx, img, ocr_enable, lang)
+    all_image_lists = []
+    all_pdf_docs = []
+    ocr_enabled_list = []
+    for pdf_idx, pdf_bytes in enumerate(pdf_bytes_list):
+        if parse_method == "auto":
+            ocr_enable = classify_pdf(pdf_bytes) == "ocr"
+        else:
+            ocr_enable = parse_method == "ocr"
+        ocr_enabled_list.append(ocr_enable)
+        images_list, pdf_doc = load_images_from_pdf(pdf_bytes)
+        all_image_lists.append(images_list)
+        all_pdf_docs.append(pdf_doc)
+        for img_dict in images_list:
+            all_pages.append((pdf_idx, img_dict["img_pil"], ocr_enable, lang_list[pdf_idx]))
+
+    window = max(1, ANALYZE_WINDOW_PAGES)
+    pages_done = [0] * len(pdf_bytes_list)
+    cancelled = [None] * len(pdf_bytes_list)
+    results = [None] * len(all_pages)
+    remaining = list(range(len(all_pages)))
+    while remaining:
+        window_indices, remaining = remaining[:window], remaining[window:]
+        window_results = pipeline_batch_image_analyze(
+            [all_pages[i][1:] for i in window_indices], formula_enable, table_enable
+        )
+        touched = set()
+        for i, result in zip(window_indices, window_results):
+            results[i] = result
+            pdf_idx = all_pages[i][0]
+            pages_done[pdf_idx] += 1
+            touched.add(pdf_idx)
+        if page_callbacks:
+            for pdf_idx in sorted(touched):
+                if page_callbacks[pdf_idx] is None:
+                    continue
+                try:
+                    page_callbacks[pdf_idx](pages_done[pdf_idx])
+                except ParseCancelledError as e:
+                    cancelled[pdf_idx] = e
+            # 已取消文档的剩余页面不再推理
+            remaining = [i for i in remaining if cancelled[all_pages[i][0]] is None]
+
+    infer_results = [[] for _ in pdf_bytes_list]
+    for i, (pdf_idx, img, _, _) in enumerate(all_pages):
+        if cancelled[pdf_idx] is not None:
+            continue
+        page_info = {"page_no": len(infer_results[pdf_idx]), "width": img.width, "height": img.height}
+        infer_results[pdf_idx].append({"layout_dets": results[i], "page_info": page_info})
+
+    return [
+        cancelled[pdf_idx] or analysis
+        for pdf_idx, analysis in enumerate(
+            zip(infer_results, all_image_lists, all_pdf_docs, lang_list, ocr_enabled_list)
+        )
+    ]
+
+
+class _BatchItem(NamedTuple):
+    pdf_bytes: bytes
+    lang: str
+    pages: int
+    on_pages: PagesCallback
+    future: Future
+
+
+class PipelineMicroBatcher:
+    """
+    Collect concurrent pipeline requests for a short window and run them through one inference pass
+
+    The first request of a batch waits for the window to close (or for the batch to fill up) and then
+    runs inference for every request in it; the other requests only wait for their own result. Requests
+    are only batched with others that use the same parse options.
+
+    Requests announce themselves with arrival() while their file is being prepared. The first request
+    only waits while other requests are still arriving, so a lone request starts inference at once.
+    A batch is closed when it reaches max_docs documents or max_pages pages.
+    """
+
+    def __init__(self, window_ms: int, max_docs: int, max_pages: int):
+        self.window = max(0, window_ms) / 1000.0
+        self.max_docs = max(1, max_docs)
+        self.max_pages = max(1, max_pages)
+        self._cond = threading.Condition()
+        self._pending = {}
+        self._arriving = 0
+
+    @contextmanager
+    def arrival(self):
+        """Mark a request that is about to call analyze(); pass the yielded token to analyze()"""
+        token = {"joined": False}
+        with self._cond:
+            self._arriving += 1
+        try:
+            yield token
+        finally:
+            with self._cond:
+                if not token["joined"]:
+                    self._arriving -= 1
+                    self._cond.notify_all()
+
+    def analyze(self, pdf_bytes: bytes, lang: str, parse_method: str, formula_enable: bool, table_enable: bool,
+                pages: int = 0, on_pages: PagesCallback = None, arrival: Optional[dict] = None):
+        future = Future()
+        item = _BatchItem(pdf_bytes, lang, pages, on_pages, future)
+        key = (parse_method, formula_enable, table_enable)
+        ready_batch = None
+        with self._cond:
+            if arrival is not None and not arrival["joined"]:
+                arrival["joined"] = True
+                self._arriving -= 1
+            if self.window <= 0 or self.max_docs <= 1:
+                ready_batch = [item]
+            else:
+                batch = self._pending.get(key)
+                is_leader = batch is None
+                if is_leader:
+                    batch = self._pending[key] = []
+                batch.append(item)
+                if len(batch) >= self.max_docs or sum(entry.pages for entry in batch) >= self.max_pages:
+                    del self._pending[key]
+                    ready_batch = batch
+                elif is_leader:
+                    # 只有还有请求在途时才等待窗口关闭，单个请求直接开始推理
+                    deadline = time.monotonic() + self.window
+                    while self._pending.get(key) is batch and self._arriving > 0:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    if self._pending.get(key) is batch:
+                        del self._pending[key]
+                        ready_batch = batch
+            self._cond.notify_all()
+
+        if ready_batch is not None:
+            self._run_batch(key, ready_batch)
+        return future.result()
+
+    def _run_batch(self, key, batch: List[_BatchItem]):
+        parse_method, formula_enable, table_enable = key
+        try:
+            if len(batch) > 1:
+                logger.info(
+                    f"Running batched pipeline inference for {len(batch)} documents, "
+                    f"{sum(item.pages for item in batch)} pages"
+                )
+            results = analyze_pipeline_batch(
+                [item.pdf_bytes for item in batch], [item.lang for item in batch],
+                parse_method, formula_enable, table_enable, [item.on_pages for item in batch]
+            )
+            for item, result in zip(batch, results):
+                if isinstance(result, ParseCancelledError):
+                    item.future.set_exception(result)
+                else:
+                    item.future.set_result(result)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0].future.set_exception(e)
+                return
+            # 一个文档出错不应拖累同批的其他文档，逐个重试以定位失败的文档
+            logger.warning(f"Batched inference failed ({e}), retrying {len(batch)} documents one by one")
+            for item in batch:
+                try:
+                    result = analyze_pipeline_batch(
+                        [item.pdf_bytes], [item.lang], parse_method, formula_enable, table_enable, [item.on_pages]
+                    )[0]
+                    if isinstance(result, ParseCancelledError):
+                        raise result
+                    item.future.set_result(result)
+                except Exception as single_e:
+                    item.future.set_exception(single_e)
+
+
+pipeline_batcher = PipelineMicroBatcher(BATCH_WINDOW_MS, BATCH_MAX_DOCS, BATCH_MAX_PAGES)
+
+
+def prepare_file_bytes(file_bytes: bytes, file_extension: str) -> bytes:
+    """PDF 统一经 pypdfium2 重写，图片原样返回"""
+    if file_extension in pdf_extensions:
+        return convert_pdf_bytes_to_bytes_by_pypdfium2(file_bytes, 0, None)
+    return file_bytes
+
+
+def count_pages(processed_bytes: bytes, file_extension: str) -> int:
+    """PDF 的页数，图片按 1 页计"""
+    if file_extension not in pdf_extensions:
+        return 1
+    pdf = pdfium.PdfDocument(processed_bytes)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def requested_outputs(return_layout: bool, return_content_list: bool, is_json_md_dump: bool) -> frozenset:
+    """Optional artifacts the request needs; dumping to disk needs all of them"""
+    if is_json_md_dump:
+        return ALL_OUTPUTS
+    outputs = set()
+    if return_layout:
+        outputs.add(OUTPUT_LAYOUT)
+    if return_content_list:
+        outputs.add(OUTPUT_CONTENT_LIST)
+    return frozenset(outputs)
+
+
+def project_positions(middle_json: dict) -> dict:
+    """
+    Slim projection of middle_json that keeps only what chunk positioning needs
+
+    Each page keeps its page_idx, page_size and blocks (preproc_blocks for pipeline,
+    para_blocks for VLM); each block keeps bbox, type, index and its text collapsed into
+    a single span, so consumers that read middle_json keep working unchanged.
+    """
+    pages = []
+    for page_idx, page in enumerate(middle_json.get("pdf_info", [])):
+        slim_page = {"page_idx": page.get("page_idx", page_idx), "page_size": page.get("page_size")}
+        blocks_field = "preproc_blocks" if "preproc_blocks" in page else "para_blocks"
+        slim_blocks = []
+        for block in page.get(blocks_field) or []:
+            if not block.get("bbox"):
+                continue
+            text = "".join(
+                span.get("content", "")
+                for line in block.get("lines", [])
+                for span in line.get("spans", [])
+                if isinstance(span.get("content"), str)
+            )
+            slim_blocks.append({
+                "bbox": block["bbox"],
+                "type": block.get("type", "unknown"),
+                "index": block.get("index", 0),
+                "lines": [{"spans": [{"content": text}]}],
+            })
+        slim_page[blocks_field] = slim_blocks
+        pages.append(slim_page)
+    return {
+        "pdf_info": pages,
+        "_backend": middle_json.get("_backend"),
+        "_version_name": middle_json.get("_version_name"),
+        "info_format": INFO_FORMAT_POSITIONS,
+    }
+
+
+def format_info(middle_json: dict, info_format: str) -> dict:
+    if info_format == INFO_FORMAT_POSITIONS:
+        return project_positions(middle_json)
+    return middle_json
+
+
+def build_pipeline_result(
+    analysis: tuple,
+    image_writer: Union[S3DataWriter, FileBasedDataWriter],
+    formula_enable: bool = True,
+    outputs: frozenset = ALL_OUTPUTS,
+):
+    """
+    Turn one document's analysis output into model_json, middle_json, content_list and markdown
+
+    model_json and content_list are only built when listed in outputs and are None otherwise.
+    """
+    model_list, images_list, pdf_doc, _lang, _ocr_enable = analysis
+
+    # result_to_middle_json modifies model_list in place, so the layout copy is taken first
+    model_json = json.loads(json.dumps(model_list)) if OUTPUT_LAYOUT in outputs else None
+    
+    middle_json = pipeline_result_to_middle_json(model_list, images_list, pdf_doc, image_writer, _lang, _ocr_enable, formula_enable)
+    
+    md_content = pipeline_union_make(middle_json["pdf_info"], MakeMode.MM_MD, "images")
+    content_list = None
+    if OUTPUT_CONTENT_LIST in outputs:
+        content_list = pipeline_union_make(middle_json["pdf_info"], MakeMode.CONTENT_LIST, "images")
+    
+    return model_json, middle_json, content_list, md_content, middle_json["pdf_info"]
+
+
 def process_file_pipeline(
     file_bytes: bytes,
     file_extension: str,
@@ -155,30 +648,25 @@ def process_file_pipeline(
     lang: str = "ch",
     formula_enable: bool = True,
     table_enable: bool = True,
+    progress: ProgressCallback = None,
+    outputs: frozenset = ALL_OUTPUTS,
 ):
     """Pipeline 模式处理函数"""
-    processed_bytes = file_bytes
-    if file_extension in pdf_extensions:
-        processed_bytes = convert_pdf_bytes_to_bytes_by_pypdfium2(file_bytes, 0, None)
-    
-    infer_results, all_image_lists, all_pdf_docs, lang_list, ocr_enabled_list = pipeline_doc_analyze(
-        [processed_bytes], [lang], parse_method, formula_enable, table_enable
+    # 并发到达的请求由微批处理器合并为一次模型推理，每完成一个页窗口上报一次进度
+    with pipeline_batcher.arrival() as arrival:
+        processed_bytes = prepare_file_bytes(file_bytes, file_extension)
+        pages_total = count_pages(processed_bytes, file_extension)
+        report_progress(progress, STAGE_ANALYZING, 0, pages_total)
+        analysis = pipeline_batcher.analyze(
+            processed_bytes, lang, parse_method, formula_enable, table_enable, pages_total,
+            lambda pages_done: report_progress(progress, STAGE_ANALYZING, pages_done, pages_total),
+            arrival
+        )
+    report_progress(progress, STAGE_BUILDING, pages_total, pages_total)
+    model_json, middle_json, content_list, md_content, pdf_info = build_pipeline_result(
+        analysis, image_writer, formula_enable, outputs
     )
-    
-    model_list = infer_results[0]
-    images_list = all_image_lists[0]
-    pdf_doc = all_pdf_docs[0]
-    _lang = lang_list[0]
-    _ocr_enable = ocr_enabled_list[0]
-
-    model_json = json.loads(json.dumps(model_list)) # deepcopy
-    
-    middle_json = pipeline_result_to_middle_json(model_list, images_list, pdf_doc, image_writer, _lang, _ocr_enable, formula_enable)
-    
-    md_content = pipeline_union_make(middle_json["pdf_info"], MakeMode.MM_MD, "images")
-    content_list = pipeline_union_make(middle_json["pdf_info"], MakeMode.CONTENT_LIST, "images")
-    
-    return model_json, middle_json, content_list, md_content, processed_bytes, middle_json["pdf_info"]
+    return model_json, middle_json, content_list, md_content, processed_bytes, pdf_info
 
 
 def process_file_vlm(
@@ -187,6 +675,8 @@ def process_file_vlm(
     image_writer: Union[S3DataWriter, FileBasedDataWriter],
     backend: str = "transformers",
     server_url: Optional[str] = None,
+    progress: ProgressCallback = None,
+    outputs: frozenset = ALL_OUTPUTS,
 ):
     """VLM 模式处理函数"""
     logger.info(f"Starting VLM processing with backend: {backend}")
@@ -197,8 +687,10 @@ def process_file_vlm(
     if file_extension in pdf_extensions:
         processed_bytes = convert_pdf_bytes_to_bytes_by_pypdfium2(file_bytes, 0, None)
         logger.info("PDF converted to bytes for VLM processing")
+    pages_total = count_pages(processed_bytes, file_extension)
     
     # 使用 VLM 后端进行解析
+    report_progress(progress, STAGE_ANALYZING, 0, pages_total)
     logger.info(f"Calling vlm_doc_analyze with backend={backend}, server_url={server_url}")
     middle_json, infer_result = vlm_doc_analyze(
         processed_bytes, 
@@ -207,20 +699,25 @@ def process_file_vlm(
         server_url=server_url
     )
     logger.info("VLM document analysis completed successfully")
+    report_progress(progress, STAGE_BUILDING, pages_total, pages_total)
     
     pdf_info = middle_json["pdf_info"]
     
     # 生成 markdown 和内容列表
     logger.info("Generating markdown and content list from VLM results")
     md_content = vlm_union_make(pdf_info, MakeMode.MM_MD, "images")
-    content_list = vlm_union_make(pdf_info, MakeMode.CONTENT_LIST, "images")
+    content_list = None
+    if OUTPUT_CONTENT_LIST in outputs:
+        content_list = vlm_union_make(pdf_info, MakeMode.CONTENT_LIST, "images")
     logger.info("Markdown and content list generation completed")
     
     # 构造类似于 pipeline 的 model_json 格式
-    model_json = {
-        "model_output": infer_result,
-        "backend": backend
-    }
+    model_json = None
+    if OUTPUT_LAYOUT in outputs:
+        model_json = {
+            "model_output": infer_result,
+            "backend": backend
+        }
     
     logger.info(f"VLM processing completed successfully with backend: {backend}")
     return model_json, middle_json, content_list, md_content, processed_bytes, pdf_info
@@ -232,6 +729,257 @@ def encode_image(image_path: str) -> str:
         return b64encode(f.read()).decode()
 
 
+def build_result_zip(data: dict, image_paths: list) -> str:
+    """
+    将解析结果打包为 zip 文件，返回临时文件路径
+
+    zip 内包含 result.json（不含图片的解析结果）和 images/ 目录下的原始图片。
+    图片本身已压缩，使用 ZIP_STORED 直接存储，避免 base64 膨胀和重复压缩。
+    """
+    fd, zip_path = tempfile.mkstemp(prefix="mineru_result_", suffix=".zip")
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("result.json", json.dumps(data, ensure_ascii=False), compress_type=zipfile.ZIP_DEFLATED)
+            for image_path in image_paths:
+                zf.write(image_path, f"images/{os.path.basename(image_path)}", compress_type=zipfile.ZIP_STORED)
+    except Exception:
+        os.remove(zip_path)
+        raise
+    return zip_path
+
+
+class ParseRequestError(Exception):
+    """Invalid parse request, reported to the client with the given HTTP status code and optional error code"""
+
+    def __init__(self, message: str, status_code: int = 400, error_code: Optional[str] = None):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+        self.error_code = error_code
+
+    def to_response(self) -> JSONResponse:
+        return error_response(self.message, self.status_code, self.error_code)
+
+
+def error_response(message: str, status_code: int, error_code: Optional[str] = None) -> JSONResponse:
+    content = {"error": message}
+    headers = None
+    if error_code:
+        content["code"] = error_code
+        headers = {ERROR_CODE_HEADER: error_code}
+    return JSONResponse(content=content, status_code=status_code, headers=headers)
+
+
+def validate_parse_request(
+    backend: str, server_url: Optional[str], response_format: str, info_format: str = INFO_FORMAT_FULL
+) -> Optional[str]:
+    """
+    Validate request options shared by /file_parse and /jobs
+
+    Returns:
+        The server_url to use (resolved from the environment for vlm-sglang-client if not given)
+
+    Raises:
+        ParseRequestError: If the options are invalid or the SGLang server is unreachable
+    """
+    if response_format not in ("json", "zip"):
+        raise ParseRequestError(f"Unsupported response_format: {response_format}. Supported: ['json', 'zip']")
+
+    if info_format not in INFO_FORMATS:
+        raise ParseRequestError(f"Unsupported info_format: {info_format}. Supported: {list(INFO_FORMATS)}")
+
+    # 验证后端类型
+    supported_backends = ["pipeline", "vlm-transformers", "vlm-sglang-engine", "vlm-sglang-client"]
+    if backend not in supported_backends:
+        raise ParseRequestError(f"Unsupported backend: {backend}. Supported: {supported_backends}")
+
+    # 对于 vlm-sglang-client，server_url 是必需的
+    if backend == "vlm-sglang-client":
+        # 检查是否提供了 server_url，如果没有则尝试使用环境变量或默认值
+        if not server_url:
+            server_url = os.environ.get("SGLANG_SERVER_URL", os.environ.get("MINERU_VLM_SERVER_URL"))
+            
+            # 如果仍然没有，尝试使用默认的本地地址
+            if not server_url:
+                default_url = "http://localhost:30000"
+                logger.info(f"No server_url provided, attempting to use default: {default_url}")
+                
+                # 先检查默认地址是否可用
+                is_default_healthy, _ = sglang_health.is_healthy(default_url, timeout=3)
+                if is_default_healthy:
+                    server_url = default_url
+                    logger.info(f"Using default SGLang server at: {default_url}")
+                else:
+                    # 提供详细的错误信息和解决方案
+                    error_msg = """server_url is required for vlm-sglang-client backend.
+
+解决方案:
+1. 设置环境变量: export SGLANG_SERVER_URL=http://localhost:30000
+2. 在请求中指定参数: -F "server_url=http://localhost:30000"
+3. 确保SGLang服务正在运行: curl http://localhost:30000/health
+
+如果使用Docker完整版，SGLang服务应该自动在30000端口启动。"""
+                    raise ParseRequestError(error_msg)
+        
+        # 验证 server_url 格式
+        if not validate_server_url(server_url):
+            raise ParseRequestError(
+                f"Invalid server_url format: {server_url}. Please provide a valid URL (e.g., http://localhost:30000)"
+            )
+        
+        # 检查 SGLang 服务器健康状态（使用缓存的状态，过期时才探测 /health）
+        is_healthy, health_msg = sglang_health.is_healthy(server_url)
+        if not is_healthy:
+            logger.warning(f"SGLang server health check failed: {health_msg}")
+            error_msg = f"""SGLang server is not accessible: {health_msg}
+
+故障排除:
+1. 检查SGLang服务是否运行: curl {server_url}/health  
+2. 确认端口是否正确开放
+3. 如果使用Docker，确保使用完整版镜像 (INSTALL_TYPE=all)
+4. 检查防火墙设置
+
+服务器地址: {server_url}"""
+            raise ParseRequestError(error_msg, status_code=503, error_code=ERROR_SGLANG_UNAVAILABLE)
+        logger.debug(f"SGLang server health check passed: {health_msg}")
+
+    return server_url
+
+
+def run_file_parse(
+    file: Optional[UploadFile] = None,
+    file_path: Optional[str] = None,
+    backend: str = "pipeline",
+    parse_method: str = "auto",
+    lang: str = "ch",
+    formula_enable: bool = True,
+    table_enable: bool = True,
+    server_url: Optional[str] = None,
+    is_json_md_dump: bool = False,
+    output_dir: str = "output",
+    return_layout: bool = False,
+    return_info: bool = False,
+    return_content_list: bool = False,
+    return_images: bool = False,
+    image_bucket: Optional[str] = None,
+    image_prefix: str = "",
+    info_format: str = INFO_FORMAT_FULL,
+    progress: ProgressCallback = None,
+) -> Tuple[dict, list, str]:
+    """
+    Parse one file and build the result data (without image payloads)
+
+    Returns:
+        Tuple[data, image_paths, file_name]: image_paths are the local images to return when
+        return_images is set; the caller decides whether to embed them as base64 or pack them in a zip.
+        progress, if given, is called as progress(stage, pages_done, pages_total) when the parse advances
+
+    Raises:
+        ParseRequestError: If the file name or type is invalid
+    """
+    # Get PDF filename
+    if file_path:
+        file_name = os.path.basename(file_path)
+    elif file and file.filename:
+        file_name = os.path.basename(file.filename)
+    else:
+        raise ParseRequestError("Could not determine filename.")
+    
+    file_name = file_name.split(".")[0]
+    output_path = f"{output_dir}/{file_name}"
+    output_image_path = f"{output_path}/images"
+
+    # Initialize readers/writers and get PDF content
+    report_progress(progress, STAGE_LOADING)
+    writer, image_writer, file_bytes, file_extension = init_writers(
+        file_path=file_path,
+        file=file,
+        output_path=output_path,
+        output_image_path=output_image_path,
+        image_bucket=image_bucket,
+        image_prefix=image_prefix,
+    )
+
+    if file_extension not in pdf_extensions + image_extensions:
+        raise ParseRequestError(f"File type {file_extension} is not supported.")
+
+    # Only build the optional artifacts this request needs
+    outputs = requested_outputs(return_layout, return_content_list, is_json_md_dump)
+
+    # Process file based on backend
+    if backend == "pipeline":
+        model_json, middle_json, content_list, md_content, processed_bytes, pdf_info = process_file_pipeline(
+            file_bytes, file_extension, image_writer, parse_method, lang, formula_enable, table_enable, progress,
+            outputs
+        )
+    else:
+        # VLM backends
+        vlm_backend = backend[4:] if backend.startswith("vlm-") else backend
+        try:
+            model_json, middle_json, content_list, md_content, processed_bytes, pdf_info = process_file_vlm(
+                file_bytes, file_extension, image_writer, vlm_backend, server_url, progress, outputs
+            )
+        except Exception as e:
+            # 真实请求的结果即为 SGLang 服务的健康信号
+            if backend == "vlm-sglang-client" and is_connection_error(e):
+                sglang_health.record_failure(server_url, e)
+            raise
+        if backend == "vlm-sglang-client":
+            sglang_health.record_success(server_url)
+
+    # If results need to be saved
+    if is_json_md_dump:
+        writer.write_string(
+            f"{file_name}_content_list.json", json.dumps(content_list, indent=4, ensure_ascii=False)
+        )
+        writer.write_string(f"{file_name}.md", str(md_content))
+        writer.write_string(
+            f"{file_name}_middle.json", json.dumps(middle_json, indent=4, ensure_ascii=False)
+        )
+        writer.write_string(
+            f"{file_name}_model.json",
+            json.dumps(model_json, indent=4, ensure_ascii=False),
+        )
+        # Save visualization results (only for pipeline backend)
+        if backend == "pipeline" and not isinstance(writer, S3DataWriter):
+            draw_layout_bbox(pdf_info, processed_bytes, output_path, f"{file_name}_layout.pdf")
+            draw_span_bbox(pdf_info, processed_bytes, output_path, f"{file_name}_span.pdf")
+
+    # Build return data
+    data = {}
+    if return_layout:
+        data["layout"] = model_json
+    if return_info:
+        data["info"] = format_info(middle_json, info_format)
+    if return_content_list:
+        data["content_list"] = content_list
+    image_paths = []
+    if return_images and not image_bucket:
+        if not isinstance(image_writer, S3DataWriter):
+            image_paths = glob(f"{output_image_path}/*.jpg")
+        else:
+            logger.warning("return_images is not supported for S3 storage yet.")
+            data["images"] = {}
+
+    if isinstance(image_writer, KeyRecordingS3DataWriter):
+        data["image_bucket"] = image_bucket
+        data["image_keys"] = image_writer.object_keys
+
+    data["md_content"] = md_content  # md_content is always returned
+    data["backend"] = backend  # 返回使用的后端信息
+    return data, image_paths, file_name
+
+
+def embed_images(data: dict, image_paths: list) -> dict:
+    """Embed images into the result data as base64 data URLs"""
+    data["images"] = {
+        os.path.basename(image_path): f"data:image/jpeg;base64,{encode_image(image_path)}"
+        for image_path in image_paths
+    }
+    return data
+
+
 @app.post(
     "/file_parse",
     tags=["projects"],
@@ -252,6 +1000,10 @@ def file_parse(
     return_info: bool = Form(False),
     return_content_list: bool = Form(False),
     return_images: bool = Form(False),
+    response_format: str = Form("json"),
+    image_bucket: Optional[str] = Form(None),
+    image_prefix: str = Form(""),
+    info_format: str = Form(INFO_FORMAT_FULL),
 ):
     """
     Execute the process of converting PDF to JSON and MD, outputting MD and JSON files
@@ -278,7 +1030,17 @@ def file_parse(
         return_layout: Whether to return parsed PDF layout. Default to False
         return_info: Whether to return parsed PDF info. Default to False
         return_content_list: Whether to return parsed PDF content list. Default to False
-        return_images: Whether to return images as base64. Default to False
+        return_images: Whether to return images. Default to False
+        response_format: json or zip. With json, images are embedded as base64 in the
+            JSON body. With zip, the response is a zip stream containing result.json
+            and the raw images under images/. Default to json
+        image_bucket: If set, images are written directly to this S3/MinIO bucket and
+            only their object keys are returned (image_keys), instead of the image data.
+            Credentials for the bucket are read from bucket_info in mineru.json
+        image_prefix: Object key prefix for images written to image_bucket. Default to
+            the bucket root
+        info_format: full or positions. With positions, info only keeps each block's
+            bbox, type, page and text instead of the whole middle_json. Default to full
     """
     try:
         if (file is None and file_path is None) or (
@@ -289,164 +1051,471 @@ def file_parse(
                 status_code=400,
             )
 
-        # 验证后端类型
-        supported_backends = ["pipeline", "vlm-transformers", "vlm-sglang-engine", "vlm-sglang-client"]
-        if backend not in supported_backends:
-            return JSONResponse(
-                content={"error": f"Unsupported backend: {backend}. Supported: {supported_backends}"},
-                status_code=400,
+        server_url = validate_parse_request(backend, server_url, response_format, info_format)
+        data, image_paths, file_name = run_file_parse(
+            file=file,
+            file_path=file_path,
+            backend=backend,
+            parse_method=parse_method,
+            lang=lang,
+            formula_enable=formula_enable,
+            table_enable=table_enable,
+            server_url=server_url,
+            is_json_md_dump=is_json_md_dump,
+            output_dir=output_dir,
+            return_layout=return_layout,
+            return_info=return_info,
+            return_content_list=return_content_list,
+            return_images=return_images,
+            image_bucket=image_bucket,
+            image_prefix=image_prefix,
+            info_format=info_format,
+        )
+
+        if response_format == "zip":
+            # 图片以二进制形式打包，由 FileResponse 从磁盘流式发送，发送完成后删除临时文件
+            zip_path = build_result_zip(data, image_paths)
+            return FileResponse(
+                zip_path,
+                media_type="application/zip",
+                filename=f"{file_name}.zip",
+                background=BackgroundTask(os.remove, zip_path),
             )
 
-        # 对于 vlm-sglang-client，server_url 是必需的
-        if backend == "vlm-sglang-client":
-            # 检查是否提供了 server_url，如果没有则尝试使用环境变量或默认值
-            if not server_url:
-                server_url = os.environ.get("SGLANG_SERVER_URL", os.environ.get("MINERU_VLM_SERVER_URL"))
-                
-                # 如果仍然没有，尝试使用默认的本地地址
-                if not server_url:
-                    default_url = "http://localhost:30000"
-                    logger.info(f"No server_url provided, attempting to use default: {default_url}")
-                    
-                    # 先检查默认地址是否可用
-                    is_default_healthy, _ = check_sglang_server_health(default_url, timeout=3)
-                    if is_default_healthy:
-                        server_url = default_url
-                        logger.info(f"Using default SGLang server at: {default_url}")
-                    else:
-                        # 提供详细的错误信息和解决方案
-                        error_msg = """server_url is required for vlm-sglang-client backend.
+        if return_images and "images" not in data:
+            embed_images(data, image_paths)
 
-解决方案:
-1. 设置环境变量: export SGLANG_SERVER_URL=http://localhost:30000
-2. 在请求中指定参数: -F "server_url=http://localhost:30000"
-3. 确保SGLang服务正在运行: curl http://localhost:30000/health
+        return JSONResponse(data, status_code=200)
 
-如果使用Docker完整版，SGLang服务应该自动在30000端口启动。"""
-                        
-                        return JSONResponse(
-                            content={"error": error_msg},
-                            status_code=400,
-                        )
-            
-            # 验证 server_url 格式
-            if not validate_server_url(server_url):
-                return JSONResponse(
-                    content={"error": f"Invalid server_url format: {server_url}. Please provide a valid URL (e.g., http://localhost:30000)"},
-                    status_code=400,
-                )
-            
-            # 检查 SGLang 服务器健康状态
-            logger.info(f"Checking SGLang server health at: {server_url}")
-            is_healthy, health_msg = check_sglang_server_health(server_url)
-            if not is_healthy:
-                logger.warning(f"SGLang server health check failed: {health_msg}")
-                error_msg = f"""SGLang server is not accessible: {health_msg}
+    except ParseRequestError as e:
+        return e.to_response()
+    except Exception as e:
+        logger.exception(e)
+        return JSONResponse(content={"error": str(e)}, status_code=500)
 
-故障排除:
-1. 检查SGLang服务是否运行: curl {server_url}/health  
-2. 确认端口是否正确开放
-3. 如果使用Docker，确保使用完整版镜像 (INSTALL_TYPE=all)
-4. 检查防火墙设置
+@app.post(
+    "/file_parse_batch",
+    tags=["projects"],
+    summary="Parse several small files in one request (pipeline backend)",
+)
+def file_parse_batch(
+    files: List[UploadFile],
+    parse_method: str = Form("auto"),
+    lang: str = Form("ch"),
+    formula_enable: bool = Form(True),
+    table_enable: bool = Form(True),
+    output_dir: str = Form("output"),
+    return_info: bool = Form(False),
+    return_content_list: bool = Form(False),
+    return_images: bool = Form(False),
+    info_format: str = Form(INFO_FORMAT_FULL),
+):
+    """
+    Parse several files with batched pipeline inference and split the results back per file.
 
-服务器地址: {server_url}"""
-                
-                return JSONResponse(
-                    content={"error": error_msg},
-                    status_code=503,
-                )
-            logger.info(f"SGLang server health check passed: {health_msg}")
+    At most BATCH_MAX_DOCS files are accepted per request (413 otherwise). Files are read and
+    inferred in groups of at most BATCH_MAX_PAGES pages, so memory stays bounded like a micro-batch.
 
-        # Get PDF filename
-        if file_path:
-            file_name = os.path.basename(file_path)
-        elif file and file.filename:
-            file_name = os.path.basename(file.filename)
-        else:
-             return JSONResponse(
-                content={"error": "Could not determine filename."},
-                status_code=400,
-            )
-        
-        file_name = file_name.split(".")[0]
-        output_path = f"{output_dir}/{file_name}"
-        output_image_path = f"{output_path}/images"
+    Args:
+        files: The PDF or image files to be parsed
+        parse_method, lang, formula_enable, table_enable: Same as /file_parse, applied to every file
+        output_dir: Output directory; images of each file go to {output_dir}/{file_name}/images
+        return_info: Whether to return parsed PDF info for each file. Default to False
+        return_content_list: Whether to return parsed content list for each file. Default to False
+        return_images: Whether to return images (base64) for each file. Default to False
+        info_format: full or positions, same as /file_parse
 
-        # Initialize readers/writers and get PDF content
-        writer, image_writer, file_bytes, file_extension = init_writers(
-            file_path=file_path,
-            file=file,
-            output_path=output_path,
-            output_image_path=output_image_path,
+    Returns:
+        {"results": [...]} in the same order as files. Each entry has file_name and either
+        md_content (plus the requested fields) or error.
+    """
+    if not files:
+        return JSONResponse(content={"error": "Must provide at least one file"}, status_code=400)
+    if len(files) > BATCH_MAX_DOCS:
+        return JSONResponse(
+            content={"error": f"Too many files ({len(files)}), at most {BATCH_MAX_DOCS} per request"},
+            status_code=413,
+        )
+    if info_format not in INFO_FORMATS:
+        return JSONResponse(
+            content={"error": f"Unsupported info_format: {info_format}. Supported: {list(INFO_FORMATS)}"},
+            status_code=400,
         )
+    outputs = requested_outputs(False, return_content_list, False)
 
-        if file_extension not in pdf_extensions + image_extensions:
-            return JSONResponse(
-                content={"error": f"File type {file_extension} is not supported."},
-                status_code=400,
-            )
+    results = [None] * len(files)
+    group = []  # (index, processed_bytes, image_writer, image_dir)
+    group_pages = 0
+
+    def run_group():
+        logger.info(f"Batch parsing {len(group)} files ({group_pages} pages) in one inference pass")
+        analyses = analyze_pipeline_batch(
+            [item[1] for item in group], [lang] * len(group), parse_method, formula_enable, table_enable
+        )
+        for (index, _, image_writer, image_dir), analysis in zip(group, analyses):
+            entry = results[index]
+            try:
+                _, middle_json, content_list, md_content, _ = build_pipeline_result(
+                    analysis, image_writer, formula_enable, outputs
+                )
+            except Exception as e:
+                logger.exception(e)
+                entry["error"] = str(e)
+                continue
+            if return_info:
+                entry["info"] = format_info(middle_json, info_format)
+            if return_content_list:
+                entry["content_list"] = content_list
+            if return_images:
+                embed_images(entry, glob(f"{image_dir}/*.jpg"))
+            entry["md_content"] = md_content
+            entry["backend"] = "pipeline"
 
-        # Process file based on backend
-        if backend == "pipeline":
-            model_json, middle_json, content_list, md_content, processed_bytes, pdf_info = process_file_pipeline(
-                file_bytes, file_extension, image_writer, parse_method, lang, formula_enable, table_enable
+    try:
+        for index, upload in enumerate(files):
+            file_name = os.path.basename(upload.filename) if upload.filename else f"file_{index}"
+            file_extension = os.path.splitext(file_name)[1]
+            if file_extension not in pdf_extensions + image_extensions:
+                results[index] = {"file_name": file_name, "error": f"File type {file_extension} is not supported."}
+                continue
+
+            output_path = f"{output_dir}/{file_name.split('.')[0]}"
+            _, image_writer, file_bytes, file_extension = init_writers(
+                file=upload, output_path=output_path, output_image_path=f"{output_path}/images"
             )
-        else:
-            # VLM backends
-            vlm_backend = backend[4:] if backend.startswith("vlm-") else backend
-            model_json, middle_json, content_list, md_content, processed_bytes, pdf_info = process_file_vlm(
-                file_bytes, file_extension, image_writer, vlm_backend, server_url
+            try:
+                processed_bytes = prepare_file_bytes(file_bytes, file_extension)
+                pages = count_pages(processed_bytes, file_extension)
+            except Exception as e:
+                results[index] = {"file_name": file_name, "error": str(e)}
+                continue
+            del file_bytes
+            results[index] = {"file_name": file_name}
+
+            # 当前组再加入该文件会超出页数上限时先推理当前组，释放其页面后再读取后续文件
+            if group and group_pages + pages > BATCH_MAX_PAGES:
+                run_group()
+                group, group_pages = [], 0
+            group.append((index, processed_bytes, image_writer, f"{output_path}/images"))
+            group_pages += pages
+
+        if group:
+            run_group()
+
+        return JSONResponse({"results": results}, status_code=200)
+
+    except Exception as e:
+        logger.exception(e)
+        return JSONResponse(content={"error": str(e)}, status_code=500)
+
+
+class ParseJobManager:
+    """
+    In-process registry of asynchronous parse jobs
+
+    Jobs run on a bounded thread pool. Results are written to disk under job_root and kept
+    for result_ttl seconds after the job finishes; expired jobs are purged lazily on access.
+    Deleting a running job only flags it: its progress callback raises ParseCancelledError at the
+    next page window, and the job keeps counting toward max_pending until its worker exits.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, result_ttl: int, job_root: str):
+        self.max_pending = max(1, max_pending)
+        self.result_ttl = result_ttl
+        self.job_root = job_root
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="mineru-job")
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    @staticmethod
+    def describe(job: dict) -> dict:
+        return {
+            key: job[key]
+            for key in (
+                "job_id", "status", "stage", "pages_done", "pages_total",
+                "created_at", "started_at", "updated_at", "finished_at", "error",
             )
+        }
+
+    def submit(self, params: dict, response_format: str, upload: Optional[UploadFile] = None) -> dict:
+        self.purge_expired()
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if job["status"] in (JOB_QUEUED, JOB_RUNNING))
+        if pending >= self.max_pending:
+            raise ParseRequestError(f"Too many pending jobs ({pending}), please retry later", status_code=429)
+
+        job_id = uuid.uuid4().hex
+        job_dir = os.path.join(self.job_root, job_id)
+        os.makedirs(job_dir, exist_ok=True)
+        params = dict(params)
+        if upload is not None:
+            # 上传的文件先落盘，工作线程按本地路径解析，请求线程无需等待推理
+            file_name = os.path.basename(upload.filename) if upload.filename else "upload.pdf"
+            input_path = os.path.join(job_dir, file_name)
+            with open(input_path, "wb") as f:
+                shutil.copyfileobj(upload.file, f, 1024 * 1024)
+            params["file_path"] = input_path
+
+        job = {
+            "job_id": job_id,
+            "status": JOB_QUEUED,
+            "stage": None,
+            "pages_done": 0,
+            "pages_total": 0,
+            "version": 0,
+            "created_at": time.time(),
+            "started_at": None,
+            "updated_at": None,
+            "finished_at": None,
+            "error": None,
+            "error_status": None,
+            "error_code": None,
+            "job_dir": job_dir,
+            "result_path": None,
+            "media_type": None,
+            "params": params,
+            "response_format": response_format,
+            "cancel_requested": False,
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+        self._executor.submit(self._run, job)
+        logger.info(f"Parse job {job_id} queued ({pending + 1} pending)")
+        return job
+
+    def _run(self, job: dict):
+        with self._lock:
+            if job["status"] == JOB_CANCELLED:
+                return
+            job["status"] = JOB_RUNNING
+            job["started_at"] = time.time()
+            job["version"] += 1
+
+        def progress(stage, pages_done, pages_total):
+            if job["cancel_requested"]:
+                raise ParseCancelledError(f"Job {job['job_id']} was cancelled")
+            self._update_progress(job, stage, pages_done, pages_total)
+
+        result_path = None
+        media_type = None
+        error = None
+        error_status = None
+        error_code = None
+        cancelled = False
+        try:
+            data, image_paths, _ = run_file_parse(progress=progress, **job["params"])
+            report_progress(progress, STAGE_PACKAGING, job["pages_total"], job["pages_total"])
+            if job["response_format"] == "zip":
+                result_path = os.path.join(job["job_dir"], "result.zip")
+                shutil.move(build_result_zip(data, image_paths), result_path)
+                media_type = "application/zip"
+            else:
+                if job["params"].get("return_images") and "images" not in data:
+                    embed_images(data, image_paths)
+                result_path = os.path.join(job["job_dir"], "result.json")
+                with open(result_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False)
+                media_type = "application/json"
+        except ParseCancelledError:
+            cancelled = True
+        except ParseRequestError as e:
+            error, error_status, error_code = e.message, e.status_code, e.error_code
+        except Exception as e:
+            logger.exception(e)
+            error, error_status = str(e), 500
+
+        input_path = job["params"].get("file_path", "")
+        if input_path.startswith(job["job_dir"]) and os.path.exists(input_path):
+            os.remove(input_path)
 
-        # If results need to be saved
-        if is_json_md_dump:
-            writer.write_string(
-                f"{file_name}_content_list.json", json.dumps(content_list, indent=4, ensure_ascii=False)
+        with self._lock:
+            cancelled = cancelled or job["cancel_requested"]
+            if cancelled:
+                status = JOB_CANCELLED
+            else:
+                status = JOB_FAILED if error else JOB_DONE
+            job.update(
+                status=status,
+                finished_at=time.time(),
+                error=error,
+                error_status=error_status,
+                error_code=error_code,
+                result_path=result_path,
+                media_type=media_type,
+                updated_at=time.time(),
+                version=job["version"] + 1,
             )
-            writer.write_string(f"{file_name}.md", str(md_content))
-            writer.write_string(
-                f"{file_name}_middle.json", json.dumps(middle_json, indent=4, ensure_ascii=False)
+            if cancelled:
+                # 任务在运行期间被删除，工作线程退出后才从任务表中移除，结果无人领取
+                self._jobs.pop(job["job_id"], None)
+        if cancelled:
+            shutil.rmtree(job["job_dir"], ignore_errors=True)
+        logger.info(f"Parse job {job['job_id']} {job['status']}")
+
+    def _update_progress(self, job: dict, stage: str, pages_done: int, pages_total: int):
+        with self._lock:
+            job.update(
+                stage=stage,
+                pages_done=pages_done,
+                pages_total=pages_total or job["pages_total"],
+                updated_at=time.time(),
+                version=job["version"] + 1,
             )
-            writer.write_string(
-                f"{file_name}_model.json",
-                json.dumps(model_json, indent=4, ensure_ascii=False),
+        logger.info(f"Parse job {job['job_id']}: {stage} {pages_done}/{pages_total} pages")
+
+    def get(self, job_id: str) -> Optional[dict]:
+        self.purge_expired()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def delete(self, job_id: str) -> bool:
+        """
+        Cancel a queued job or drop a finished one
+
+        A running job stays registered with cancel_requested set; its worker stops at the next
+        progress report and removes it on exit.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return False
+            if job["cancel_requested"]:
+                return True
+            if job["status"] == JOB_RUNNING:
+                job["cancel_requested"] = True
+                job["version"] += 1
+                return True
+            del self._jobs[job_id]
+            if job["status"] == JOB_QUEUED:
+                job["status"] = JOB_CANCELLED
+                job["version"] += 1
+        shutil.rmtree(job["job_dir"], ignore_errors=True)
+        return True
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock:
+            expired = [
+                self._jobs.pop(job_id)
+                for job_id, job in list(self._jobs.items())
+                if job["finished_at"] and now - job["finished_at"] > self.result_ttl
+            ]
+        for job in expired:
+            shutil.rmtree(job["job_dir"], ignore_errors=True)
+
+
+job_manager = ParseJobManager(JOB_WORKERS, JOB_MAX_PENDING, JOB_RESULT_TTL, JOB_DIR)
+
+
+@app.post(
+    "/jobs",
+    tags=["jobs"],
+    summary="Submit an asynchronous parse job",
+)
+def submit_job(
+    file: Optional[UploadFile] = None,
+    file_path: Optional[str] = Form(None),
+    backend: str = Form("pipeline"),
+    parse_method: str = Form("auto"),
+    lang: str = Form("ch"),
+    formula_enable: bool = Form(True),
+    table_enable: bool = Form(True),
+    server_url: Optional[str] = Form(None),
+    is_json_md_dump: bool = Form(False),
+    output_dir: str = Form("output"),
+    return_layout: bool = Form(False),
+    return_info: bool = Form(False),
+    return_content_list: bool = Form(False),
+    return_images: bool = Form(False),
+    response_format: str = Form("json"),
+    image_bucket: Optional[str] = Form(None),
+    image_prefix: str = Form(""),
+    info_format: str = Form(INFO_FORMAT_FULL),
+):
+    """
+    Accept the same parameters as /file_parse, queue the parse and return immediately
+    with 202 and a job_id. Poll GET /jobs/{job_id} for the status and fetch the output
+    (same body as /file_parse) from GET /jobs/{job_id}/result.
+    """
+    try:
+        if (file is None and file_path is None) or (
+            file is not None and file_path is not None
+        ):
+            return JSONResponse(
+                content={"error": "Must provide either file or file_path"},
+                status_code=400,
             )
-            # Save visualization results (only for pipeline backend)
-            if backend == "pipeline" and not isinstance(writer, S3DataWriter):
-                draw_layout_bbox(pdf_info, processed_bytes, output_path, f"{file_name}_layout.pdf")
-                draw_span_bbox(pdf_info, processed_bytes, output_path, f"{file_name}_span.pdf")
-
-        # Build return data
-        data = {}
-        if return_layout:
-            data["layout"] = model_json
-        if return_info:
-            data["info"] = middle_json
-        if return_content_list:
-            data["content_list"] = content_list
-        if return_images:
-            if not isinstance(image_writer, S3DataWriter):
-                image_paths = glob(f"{output_image_path}/*.jpg")
-                data["images"] = {
-                    os.path.basename(
-                        image_path
-                    ): f"data:image/jpeg;base64,{encode_image(image_path)}"
-                    for image_path in image_paths
-                }
-            else:
-                logger.warning("return_images is not supported for S3 storage yet.")
-                data["images"] = {}
-                
-        data["md_content"] = md_content  # md_content is always returned
-        data["backend"] = backend  # 返回使用的后端信息
 
-        return JSONResponse(data, status_code=200)
+        server_url = validate_parse_request(backend, server_url, response_format, info_format)
+        params = dict(
+            file_path=file_path,
+            backend=backend,
+            parse_method=parse_method,
+            lang=lang,
+            formula_enable=formula_enable,
+            table_enable=table_enable,
+            server_url=server_url,
+            is_json_md_dump=is_json_md_dump,
+            output_dir=output_dir,
+            return_layout=return_layout,
+            return_info=return_info,
+            return_content_list=return_content_list,
+            return_images=return_images,
+            image_bucket=image_bucket,
+            image_prefix=image_prefix,
+            info_format=info_format,
+        )
+        job = job_manager.submit(params, response_format, upload=file)
+        return JSONResponse(ParseJobManager.describe(job), status_code=202)
 
+    except ParseRequestError as e:
+        return e.to_response()
     except Exception as e:
         logger.exception(e)
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
 
+@app.get("/jobs/{job_id}", tags=["jobs"], summary="Get the status of a parse job")
+async def get_job(job_id: str, wait: float = 0):
+    """
+    Return the job status, including the current stage (loading, analyzing, building,
+    packaging) and pages_done/pages_total. With wait > 0 the request is held (long poll)
+    until the job makes progress or finishes, or wait seconds (at most 60) have passed.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return JSONResponse(content={"error": f"Job not found or expired: {job_id}"}, status_code=404)
+
+    version = job["version"]
+    deadline = time.monotonic() + min(max(wait, 0), JOB_MAX_WAIT)
+    while (job["status"] not in JOB_FINISHED_STATES and job["version"] == version
+           and time.monotonic() < deadline):
+        await asyncio.sleep(JOB_POLL_STEP)
+    return JSONResponse(ParseJobManager.describe(job))
+
+
+@app.get("/jobs/{job_id}/result", tags=["jobs"], summary="Download the result of a finished parse job")
+def get_job_result(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        return JSONResponse(content={"error": f"Job not found or expired: {job_id}"}, status_code=404)
+    if job["status"] == JOB_FAILED:
+        return error_response(job["error"], job["error_status"] or 500, job["error_code"])
+    if job["status"] != JOB_DONE:
+        return JSONResponse(
+            content={"error": f"Job is not finished: {job['status']}", "status": job["status"]},
+            status_code=409,
+        )
+    return FileResponse(job["result_path"], media_type=job["media_type"])
+
+
+@app.delete("/jobs/{job_id}", tags=["jobs"], summary="Cancel a queued job or delete a finished job")
+def delete_job(job_id: str):
+    if not job_manager.delete(job_id):
+        return JSONResponse(content={"error": f"Job not found or expired: {job_id}"}, status_code=404)
+    return JSONResponse({"job_id": job_id, "deleted": True})
+
+
 if __name__ == "__main__":
     # os.environ['MINERU_MODEL_SOURCE'] = "modelscope"
     uvicorn.run(app, host="0.0.0.0", port=8888)
@@ -24,7 +24,7 @@ echo ""
 echo "📦 安装 Python 依赖..."
 
 # 安装 Python 依赖（使用引号避免 zsh 问题）
-pip3 install "mineru[core]" fastapi uvicorn python-multipart
+pip3 install "mineru[core]>=2.1.0,<2.2" fastapi uvicorn python-multipart
 
 if [ $? -eq 0 ]; then
     echo "✅ Python 依赖安装成功"